@@ -1,186 +1,154 @@
 # app.py
+import re
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-from modules.load_data import load_people, load_companies, save_people
-import sqlite3
+from modules.load_data import people_snapshot, load_companies, save_people
+from modules.db import from_epoch, init_db
+from modules.call_logs import client_history, import_legacy_logs, search_notes
+from modules.filters import filter_index
+from modules.company_links import company_links
+from modules.company_search import company_search
+from modules.map_clusters import map_clusters, viewport
+from modules.spatial import spatial_index
+from modules.paging import paged_table
+from modules.profiling import PERF_LOG, stage, start_rerun
+from modules.recency import STALE_DAYS, recency_index
+from modules.rollups import weekly_contacts
+from modules.write_behind import write_behind
 
 # from datetime import datetime
 
-from datetime import datetime
-
-
-LOG_FILE = "logs.csv"
-
-
-def init_db():
-    conn = sqlite3.connect("crm.db")
-    cursor = conn.cursor()
-
-    # Table to store client status and last contacted date
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS client_status (
-        client_id TEXT PRIMARY KEY,
-        status TEXT DEFAULT 'open',
-        last_contacted TEXT
-    )
-    """
-    )
-
-    # Table to store log notes
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        client_id TEXT,
-        note TEXT,
-        timestamp TEXT
-    )
-    """
-    )
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS industry_overrides (
-            client_id TEXT PRIMARY KEY,
-            overridden_industry TEXT
-        )
-    """
-    )
-
-    conn.commit()
-    conn.close()
+from datetime import timedelta
 
 
 init_db()
 
 
-def load_logs():
-    try:
-        return pd.read_csv(LOG_FILE)
-    except FileNotFoundError:
-        return pd.DataFrame(
-            columns=["Client ID", "Date", "Note"]
-        )  # Manually add the columns as headers on the csv file
+@st.cache_resource
+def import_legacy_logs_once():
+    # Once per server process, not on every rerun
+    return import_legacy_logs()
 
 
-def save_log_entry(client_id, note, date):
-    logs = load_logs()
-    new_entry = {"Client ID": client_id, "Date": date, "Note": note}
-    logs = pd.concat([logs, pd.DataFrame([new_entry])], ignore_index=True)
-    logs.to_csv(LOG_FILE, index=False)
+import_legacy_logs_once()
 
 
-def get_recent_contact_metrics(filtered_client_ids, days=7):
-    # logs = load_logs()
-    # if logs.empty or not filtered_client_ids:
-    #     return 0
-
-    # Convert to datetime
-    # logs["Date"] = pd.to_datetime(logs["Date"], errors="coerce")
-    filtered_client_ids["Last Contacted"] = pd.to_datetime(
-        filtered_client_ids["Last Contacted"], errors="coerce"
-    )
-    # Filter logs to only relevant client IDs
-    # logs = logs[logs["Client ID"].isin(filtered_client_ids)]
-
-    # Get latest contact date per client
-    latest_contact = (
-        filtered_client_ids.groupby("Client ID")["Last Contacted"].max().reset_index()
-    )
-    # filtered_client_ids.get('Last Contacted', 'N/A')
-    # Filter based on recent days
-    cutoff = pd.Timestamp.today() - pd.Timedelta(days=days)
-    recent_contacts = latest_contact[latest_contact["Last Contacted"] >= cutoff]
-
-    return len(recent_contacts)
-
+def track_write(label, ticket):
+    # Writes are committed by a background thread; keep the ticket so a
+    # failure can still be reported on a later rerun
+    st.session_state.setdefault("write_tickets", []).append((label, ticket))
 
-def get_latest_contact_dates(filtered_client_ids):
-    # logs = load_logs()
-    # if logs.empty:
-    #     return pd.DataFrame(columns=["Client ID", "Last Contacted"])
 
-    # logs["Date"] = pd.to_datetime(logs["Date"], errors="coerce")
-    # latest = logs.groupby("Client ID")["Date"].max().reset_index()
-    # latest.rename(columns={"Date": "Last Contacted"}, inplace=True)
+def show_write_errors():
+    tickets = st.session_state.get("write_tickets", [])
+    for label, ticket in tickets:
+        if ticket.failed():
+            st.error(f"{label} was not saved: {ticket.error}")
+    st.session_state["write_tickets"] = [
+        (label, ticket) for label, ticket in tickets if not ticket.done()
+    ]
 
-    filtered_client_ids["Last Contacted"] = pd.to_datetime(
-        filtered_client_ids["Last Contacted"], errors="coerce"
-    )
 
-    # Get latest contact date per client
-    latest = (
-        filtered_client_ids.groupby("Client ID")["Last Contacted"].max().reset_index()
-    )
-    return latest
-
-
-def update_status(client_id, new_status):
-    conn = sqlite3.connect("crm.db")
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO client_status (client_id, status)
-        VALUES (?, ?)
-        ON CONFLICT(client_id) DO UPDATE SET status=excluded.status
-    """,
-        (client_id, new_status),
+def locate(companies, text):
+    # "lat, lon" coordinates, else the location of the best matching company
+    match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*", text)
+    if match:
+        return float(match[1]), float(match[2])
+    for position in company_search(companies).search(text):
+        row = companies.iloc[position]
+        if pd.notna(row["Latitude"]) and pd.notna(row["Longitude"]):
+            return row["Latitude"], row["Longitude"]
+    return None
+
+
+def parse_territories(text):
+    # One territory per line, "Name: lat, lon; lat, lon; lat, lon"; returns
+    # ({name: [(lat, lon), ...]}, lines that could not be read)
+    territories, bad = {}, []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        name, _, points = line.partition(":")
+        try:
+            vertices = [
+                tuple(float(v) for v in point.split(","))
+                for point in points.split(";")
+                if point.strip()
+            ]
+        except ValueError:
+            vertices = []
+        if name.strip() and len(vertices) >= 3 and all(len(v) == 2 for v in vertices):
+            territories[name.strip()] = vertices
+        else:
+            bad.append(line.strip())
+    return territories, bad
+
+
+def show_paged_table(key, frame, positions=None, add_columns=None):
+    # Sorting, paging and column selection happen on the server; only the
+    # rows of the current page are sent to the browser
+    table = paged_table(frame)
+    all_columns = list(frame.columns)
+
+    sort_col, order_col, size_col, page_col = st.columns([3, 1, 1, 1])
+    with sort_col:
+        sort = st.selectbox("Sort by", ["(as listed)"] + all_columns, key=f"{key}_sort")
+    with order_col:
+        descending = st.checkbox("Descending", key=f"{key}_desc")
+    with size_col:
+        page_size = st.selectbox(
+            "Rows per page", [25, 50, 100, 250], index=1, key=f"{key}_size"
+        )
+    with page_col:
+        page = st.number_input("Page", min_value=1, value=1, key=f"{key}_page")
+    columns = st.multiselect(
+        "Columns", all_columns, default=all_columns, key=f"{key}_columns"
     )
-    conn.commit()
-    conn.close()
-
 
-def log_call(client_id, note):
-    conn = sqlite3.connect("crm.db")
-    cursor = conn.cursor()
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    cursor.execute(
-        "INSERT INTO logs (client_id, note, timestamp) VALUES (?, ?, ?)",
-        (client_id, note, timestamp),
+    rows, total, pages = table.page(
+        positions,
+        sort=None if sort == "(as listed)" else sort,
+        ascending=not descending,
+        page=page - 1,
+        page_size=page_size,
     )
-
-    cursor.execute(
-        """
-        INSERT INTO client_status (client_id, last_contacted)
-        VALUES (?, ?)
-        ON CONFLICT(client_id) DO UPDATE SET last_contacted=excluded.last_contacted
-    """,
-        (client_id, timestamp),
+    if add_columns is not None:
+        rows = add_columns(rows)
+    # Columns added for display only are always kept
+    rows = rows[(columns or all_columns) + list(rows.columns.difference(all_columns))]
+    st.dataframe(rows, use_container_width=True)
+
+    first = min(page, pages) - 1
+    st.caption(
+        f"Rows {first * page_size + 1 if total else 0:,}-"
+        f"{min((first + 1) * page_size, total):,} of {total:,}, page {first + 1} of {pages}"
     )
 
-    conn.commit()
-    conn.close()
-
-
-def get_status_and_logs():
-    conn = sqlite3.connect("crm.db")
-    status_df = pd.read_sql_query("SELECT * FROM client_status", conn)
-    logs_df = pd.read_sql_query("SELECT * FROM logs", conn)
-    conn.close()
 
-    # Rename columns to prevent conflict
-    status_df.rename(
-        columns={
-            "status": "Status",
-            "last_contacted": "Last Contacted",
-            "client_id": "Client ID",
-        },
-        inplace=True,
+def show_debug_panel(perf, record):
+    st.sidebar.markdown(f"**Rerun:** {record['total_ms']:,.0f} ms")
+    st.sidebar.dataframe(
+        pd.DataFrame(record["stages"]).set_index("stage"), use_container_width=True
     )
-
-    # logs_df.rename(
-    #     columns={"note": "Call Note", "timestamp": "Call Timestamp"}, inplace=True
-    # )
-
-    return status_df, logs_df
+    st.sidebar.caption(f"Reruns are appended to {PERF_LOG} while this panel is on")
+    if st.sidebar.button("Profile next rerun"):
+        st.session_state["profile_rerun"] = True
+        st.rerun()
+    if perf.profile is not None:
+        st.sidebar.caption(f"Profile saved to {perf.dump_profile()}")
+        with st.sidebar.expander("cProfile, top functions by cumulative time"):
+            st.code(perf.profile_text(), language="text")
 
 
-def show_companies_tab(companies):
+def show_companies_tab(companies, people):
     st.title("🏢 Companies")
 
+    # People rows per company, from the same matching the Clients tab uses
+    with stage("company_links", rows=len(people)):
+        links = company_links(people, companies)
+
     # Sidebar or top-level filters
     industries = sorted(companies["Industry"].dropna().unique())
     selected_industries = st.multiselect(
@@ -198,17 +166,91 @@ def show_companies_tab(companies):
     )
 
     # Apply filters
-    filtered_df = companies[
-        companies["Industry"].isin(selected_industries)
-        & companies["Revenue"].between(revenue_range[0], revenue_range[1])
-    ]
-
-    if keyword:
-        filtered_df = filtered_df[
-            companies["Company Name"].str.contains(keyword, case=False)
-            | companies["Address"].str.contains(keyword, case=False)
+    with stage("filters") as timing:
+        filtered_df = companies[
+            companies["Industry"].isin(selected_industries)
+            & companies["Revenue"].between(revenue_range[0], revenue_range[1])
         ]
 
+        if keyword:
+            # Indexed substring search, best matches first
+            matches = companies.index[company_search(companies).search(keyword)]
+            filtered_df = filtered_df.loc[matches[matches.isin(filtered_df.index)]]
+        timing.rows = len(filtered_df)
+
+    # Area filter: a lat/lon box, or named territory polygons
+    with st.expander("🗺️ Filter by area"):
+        area_mode = st.radio(
+            "Area", ["Anywhere", "Box", "Territories"], horizontal=True, key="area_mode"
+        )
+        if area_mode == "Box":
+            lat, lon = companies["Latitude"].dropna(), companies["Longitude"].dropna()
+            south_col, north_col, west_col, east_col = st.columns(4)
+            area = (
+                south_col.number_input(
+                    "South", -90.0, 90.0, float(lat.min()) if len(lat) else -90.0
+                ),
+                north_col.number_input(
+                    "North", -90.0, 90.0, float(lat.max()) if len(lat) else 90.0
+                ),
+                west_col.number_input(
+                    "West", -180.0, 180.0, float(lon.min()) if len(lon) else -180.0
+                ),
+                east_col.number_input(
+                    "East", -180.0, 180.0, float(lon.max()) if len(lon) else 180.0
+                ),
+            )
+            st.caption("West greater than East spans the antimeridian.")
+        elif area_mode == "Territories":
+            area = st.text_area(
+                "One territory per line: 'Name: lat, lon; lat, lon; lat, lon'",
+                key="territories",
+            )
+        else:
+            area = None
+
+    if area_mode == "Box":
+        inside = companies.index[spatial_index(companies).in_box(*area)]
+        filtered_df = filtered_df[filtered_df.index.isin(inside)]
+    elif area_mode == "Territories":
+        territories, bad = parse_territories(area)
+        if bad:
+            st.warning(f"Could not read territories: {'; '.join(bad)}")
+        if territories:
+            # Where territories overlap, the first one listed wins
+            assigned = spatial_index(companies).assign_territories(territories)
+            territory = pd.Series(assigned, index=companies.index)[filtered_df.index]
+            filtered_df = filtered_df.assign(Territory=territory)[territory.notna()]
+
+    # Location filter: a company (first search match) or "lat, lon"
+    with st.expander("📍 Filter by location"):
+        near = st.text_input("Near company or 'lat, lon'", key="near")
+        near_mode = st.radio(
+            "Show", ["Within radius", "Nearest"], horizontal=True, key="near_mode"
+        )
+        if near_mode == "Within radius":
+            near_size = st.number_input("Miles", 1.0, 5000.0, 25.0, step=5.0)
+        else:
+            near_size = st.number_input("Companies", 1, 1000, 10)
+
+    anchor = locate(companies, near) if near.strip() else None
+    if near.strip() and anchor is None:
+        st.warning(f"No company or coordinates found for '{near}'.")
+    elif anchor is not None:
+        index = spatial_index(companies)
+        if near_mode == "Within radius":
+            positions, miles = index.within(*anchor, near_size)
+            nearby = companies.index[positions]
+            keep = nearby.isin(filtered_df.index)
+        else:
+            allowed = companies.index.isin(filtered_df.index)
+            positions, miles = index.nearest(*anchor, int(near_size), allowed=allowed)
+            nearby = companies.index[positions]
+            keep = np.ones(len(nearby), dtype=bool)
+        filtered_df = filtered_df.loc[nearby[keep]].assign(
+            **{"Distance (mi)": miles[keep].round(1)}
+        )
+
     # selected_industry = st.selectbox(
     #     "Filter companies on map by industry", companies["Industry"].unique()
     # )
@@ -228,53 +270,117 @@ def show_companies_tab(companies):
     #     st.map(map_df.rename(columns={"Latitude": "lat", "Longitude": "lon"}))
 
     st.subheader("📍 Company Locations")
-    map_df = filtered_df.dropna(subset=["Latitude", "Longitude"])
-
-    fig1 = px.scatter_mapbox(
-        map_df,
-        lat="Latitude",
-        lon="Longitude",
-        hover_name="Company Name",
-        hover_data={
-            "Industry": True,
-            "Revenue": ":,.2f",
-            "Address": True,
-            "Latitude": False,  # Hide lat
-            "Longitude": False,
-        },
-        color="Industry",
-        size_max=10,
-        zoom=1,
-        height=500,
-    )
+    zoom = st.slider("Map zoom", min_value=1, max_value=14, value=1, key="map_zoom")
+
+    # Clusters are computed once per filter combination; small sets are sent
+    # whole, larger ones only for the visible area, as clusters until few
+    # enough companies remain
+    with stage("map") as timing:
+        clusters = map_clusters(
+            companies,
+            (
+                tuple(selected_industries),
+                revenue_range,
+                keyword,
+                area_mode,
+                area,
+                near,
+                near_mode,
+                near_size,
+            ),
+            filtered_df,
+        )
+        center = clusters.center()
+        view = clusters.view(zoom, bbox=viewport(center, zoom))
+        map_df = view["data"]
+
+        if view["clustered"]:
+            fig1 = px.scatter_mapbox(
+                map_df,
+                lat="Latitude",
+                lon="Longitude",
+                size="Companies",
+                hover_data={
+                    "Companies": True,
+                    "Industry": True,
+                    "Revenue": ":,.2f",
+                    "Latitude": False,
+                    "Longitude": False,
+                },
+                color="Industry",
+                size_max=30,
+                zoom=zoom,
+                center={"lat": center[0], "lon": center[1]},
+                height=500,
+            )
+            st.caption(
+                f"{len(clusters):,} companies in {len(map_df):,} clusters, "
+                "zoom in to see individual companies."
+            )
+        else:
+            fig1 = px.scatter_mapbox(
+                map_df,
+                lat="Latitude",
+                lon="Longitude",
+                hover_name="Company Name",
+                hover_data={
+                    "Industry": True,
+                    "Revenue": ":,.2f",
+                    "Address": True,
+                    "Latitude": False,  # Hide lat
+                    "Longitude": False,
+                },
+                color="Industry",
+                size_max=10,
+                zoom=zoom,
+                center={"lat": center[0], "lon": center[1]},
+                height=500,
+            )
 
-    fig1.update_layout(
-        mapbox_style="open-street-map", margin={"r": 0, "t": 0, "l": 0, "b": 0}
-    )
+        fig1.update_layout(
+            mapbox_style="open-street-map", margin={"r": 0, "t": 0, "l": 0, "b": 0}
+        )
 
-    st.plotly_chart(fig1, use_container_width=True)
+        st.plotly_chart(fig1, use_container_width=True)
+        timing.rows = len(map_df)
 
     # Revenue by industry
     st.subheader("Revenue by Industry")
-    rev_by_industry = (
-        filtered_df.groupby("Industry")["Revenue"]
-        .sum()
-        .reset_index()
-        .sort_values(by="Revenue", ascending=False)
-    )
-    fig = px.bar(
-        rev_by_industry, x="Industry", y="Revenue", title="Revenue by Industry"
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    with stage("revenue_chart"):
+        rev_by_industry = (
+            filtered_df.groupby("Industry")["Revenue"]
+            .sum()
+            .reset_index()
+            .sort_values(by="Revenue", ascending=False)
+        )
+        fig = px.bar(
+            rev_by_industry, x="Industry", y="Revenue", title="Revenue by Industry"
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
     # Company list
     st.subheader("Company List")
-    st.dataframe(filtered_df)
+
+    def add_columns(page):
+        # companies is read from CSV, its index is the row position
+        page = page.assign(Contacts=links.headcount[page.index])
+        for column in ["Territory", "Distance (mi)"]:
+            if column in filtered_df.columns:
+                page = page.join(filtered_df[column])
+        return page
+
+    with stage("table"):
+        show_paged_table(
+            "companies",
+            companies,
+            companies.index.get_indexer(filtered_df.index),
+            add_columns,
+        )
 
     # Optional: expand for company details
 
 
-def show_clients_tab(people):
+def show_clients_tab(people, companies, industry_revenue):
 
     # if st.button("🔄 Refresh"):
     #     st.experimental_rerun()
@@ -284,50 +390,79 @@ def show_clients_tab(people):
     with col_title:
         st.title("CRM - Clients Dashboard")
 
+    # Row positions per industry/status, built once per loaded frame
+    with stage("filter_index", rows=len(people)):
+        index = filter_index(people)
+        totals = index.summary()
+
     with col_metric1:
-        st.metric("Total Clients", len(people))
+        st.metric("Total Clients", totals["clients"])
 
     with col_metric2:
-        st.metric("Total Unique Companies", people["Company"].nunique())
+        st.metric("Total Unique Companies", totals["companies"])
 
     # Filters
     st.sidebar.header("Filters")
     industry = st.sidebar.selectbox(
         "LLM Industry",
-        ["All"] + sorted(people["LLM_Industry"].dropna().unique().tolist()),
+        ["All"] + sorted(index.values("LLM_Industry")),
     )
     status = st.sidebar.multiselect(
-        "Status", people["Status"].unique(), default=people["Status"].unique()
+        "Status",
+        index.values("Status"),
+        default=index.values("Status"),
     )
 
-    # Apply filters
-    filtered = people.copy()
-    if industry != "All":
-        filtered = filtered[filtered["LLM_Industry"] == industry]
-    if status:
-        filtered = filtered[filtered["Status"].isin(status)]
+    # Apply filters, counts are memoized per filter combination
+    with stage("filters") as timing:
+        filtered, summary = index.select(
+            people, None if industry == "All" else industry, status
+        )
+        timing.rows = len(filtered)
+
+    # Each row's Companies sheet entry, matched once per loaded frame
+    with stage("company_links", rows=len(people)):
+        links = company_links(people, companies)
+
+    def add_revenue(rows):
+        # Only for the rows on screen; the row index is the position in people
+        rows = rows.assign(
+            **{"Company Revenue": links.lookup(rows.index, ["Revenue"])["Revenue"]}
+        )
+        if "Total Industry Revenue" in rows.columns:
+            return rows
+        return rows.assign(
+            **{"Total Industry Revenue": rows["LLM_Industry"].map(industry_revenue)}
+        )
 
     # Metrics
     met1, met2 = st.columns(2)
     with met1:
-        st.metric("\U0001f9d1\u200d\U0001f4bc Filtered Clients", len(filtered))
+        st.metric("\U0001f9d1\u200d\U0001f4bc Filtered Clients", summary["clients"])
     with met2:
-        st.metric("\U0001f3e2 Unique Filtered Companies", filtered["Company"].nunique())
+        st.metric("\U0001f3e2 Unique Filtered Companies", summary["companies"])
 
-    filtered_client_ids = filtered["Client ID"].unique().tolist()
     met5, met6 = st.columns(2)
 
+    # Latest contacts are parsed and sorted once per loaded frame
+    with stage("contact_metrics"):
+        recency = recency_index(people)
+        contacted = recency.counts(summary["rows"], windows=(7, 30))
+
     with met5:
-        st.metric(
-            "👥 Contacted in last 7 days",
-            get_recent_contact_metrics(filtered, 7),
-        )
+        st.metric("👥 Contacted in last 7 days", contacted[7])
 
     with met6:
-        st.metric(
-            "📆 Contacted in last 30 days",
-            get_recent_contact_metrics(filtered, 30),
+        st.metric("📆 Contacted in last 30 days", contacted[30])
+
+    with st.expander("🕰️ Contact Recency"):
+        st.bar_chart(recency.buckets(summary["rows"]))
+        stale_days = st.number_input(
+            "Not contacted in (days)", min_value=1, value=STALE_DAYS, key="stale_days"
         )
+        stale = recency.stale(summary["rows"], days=stale_days)
+        st.caption(f"{len(stale):,} stale clients, never contacted first")
+        show_paged_table("stale", people, stale, add_revenue)
 
     # Simulate row selection with a selectbox to choose a client
     # st.subheader("\U0001f9d1\u200d\U0001f4bc Select a Client for Action")
@@ -406,9 +541,23 @@ def show_clients_tab(people):
         options=filtered["Client ID"].unique(),
         key="client_select",
     )
+    show_write_errors()
+    writes = write_behind()
+    # What any session queued for the client and is not committed yet
+    pending = writes.pending(selected_client)
 
     if selected_client:
-        person_info = filtered[filtered["Client ID"] == selected_client].iloc[0]
+        person_info = add_revenue(
+            filtered[filtered["Client ID"] == selected_client].iloc[:1]
+        ).iloc[0]
+        if pending["status"] is not None:
+            person_info["Status"] = pending["status"]
+        if pending["industry"] is not None:
+            person_info["LLM_Industry"] = pending["industry"]
+        if pending["notes"]:
+            person_info["Last Contacted"] = from_epoch(
+                [max(ts for ts, _ in pending["notes"])]
+            ).iloc[0]
 
         col1, col2 = st.columns(2)
 
@@ -416,6 +565,14 @@ def show_clients_tab(people):
             st.markdown(f"**Name:** {person_info['Name']}")
             st.markdown(f"**Company:** {person_info['Company']}")
             st.markdown(f"**Job Title:** {person_info['Title']}")
+            company = links.lookup([person_info.name], ["Address", "Revenue"]).iloc[0]
+            if pd.notna(company["Address"]):
+                company_id = links.company_id[person_info.name]
+                st.markdown(f"**Company Address:** {company['Address']}")
+                st.markdown(
+                    f"**Company Revenue:** ${company['Revenue']:,.2f}M, "
+                    f"{links.headcount[company_id]} contacts there"
+                )
 
         with col2:
             st.markdown(f"**Current Status:** {person_info.get('Status', 'open')}")
@@ -443,7 +600,9 @@ def show_clients_tab(people):
             ]
             new_status = st.selectbox("Select new status", status_options)
             if st.button("\U00002757 Update Status"):
-                update_status(selected_client, new_status)
+                track_write(
+                    "Status update", writes.update_status(selected_client, new_status)
+                )
                 st.success(f"Updated status to: {new_status}")
 
         # 🏷️ Industry Override (Right Column)
@@ -455,14 +614,11 @@ def show_clients_tab(people):
 
             if st.button("💾 Save Industry Override"):
                 try:
-                    conn = sqlite3.connect("crm.db")
-                    conn.execute(
-                        "REPLACE INTO industry_overrides (client_id, overridden_industry) VALUES (?, ?)",
-                        (selected_client, new_industry),
+                    track_write(
+                        "Industry override",
+                        writes.save_industry_override(selected_client, new_industry),
                     )
-                    conn.commit()
-                    conn.close()
-                    st.success("Industry override saved for {person_info['Name']}")
+                    st.success(f"Industry override saved for {person_info['Name']}")
 
                 except Exception as e:
                     st.error(f"Error saving industry override: {e}")
@@ -488,22 +644,69 @@ def show_clients_tab(people):
         note = st.text_area("Add a note", height=100)
         if st.button("📌 Save Note"):
             if note.strip():
-                log_call(selected_client, note)
+                track_write("Note", writes.log_call(selected_client, note))
+                # Back to the newest page, where the note now is
+                st.session_state.pop(f"history_{selected_client}", None)
                 st.success("Note logged and last contacted updated.")
             else:
                 st.warning("Please enter a note before saving.")
 
     # --- Show log history ---
     st.markdown("### 📚 Communication History")
-    history = logs_df[logs_df["Client ID"] == selected_client]
+    # Cursors of the pages visited so far; None is the newest page
+    cursors = st.session_state.setdefault(f"history_{selected_client}", [None])
+    history, older = client_history(selected_client, before=cursors[-1])
+    if cursors[-1] is None and pending["notes"]:
+        # Queued notes go on top of the newest page until they are committed
+        queued = pending["notes"][::-1]
+        history = pd.concat(
+            [
+                pd.DataFrame(
+                    {
+                        "Call Timestamp": from_epoch([ts for ts, _ in queued]),
+                        "Call Note": [note for _, note in queued],
+                    }
+                ),
+                history,
+            ],
+            ignore_index=True,
+        )
     if not history.empty:
         st.dataframe(
-            history.sort_values("Call Timestamp", ascending=False),
+            history[["Call Timestamp", "Call Note"]],
             use_container_width=True,
+            hide_index=True,
         )
+        newer_col, older_col = st.columns(2)
+        if newer_col.button("⬅️ Newer", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        if older_col.button("Older ➡️", disabled=older is None):
+            cursors.append(older)
+            st.rerun()
     else:
         st.info("No interaction logs yet for this client.")
 
+    # --- Search all notes ---
+    with st.expander("🔎 Search Call Notes"):
+        search_text = st.text_input(
+            'Search notes ("exact phrase", renew* for prefixes)', key="notes_search"
+        )
+        search_dates = st.date_input("Call date range", value=(), key="notes_dates")
+        if search_text.strip():
+            since = search_dates[0] if len(search_dates) > 0 else None
+            until = (
+                search_dates[1] + timedelta(days=1) if len(search_dates) > 1 else None
+            )
+            results = search_notes(search_text, since=since, until=until)
+            if results.empty:
+                st.info("No notes match this search.")
+            else:
+                st.dataframe(
+                    results[["Call Timestamp", "Client ID", "Snippet"]],
+                    use_container_width=True,
+                )
+
     # st.subheader("\U0001f6e0\U0000fe0f Actions")
 
     # st.subheader("📞 Log Call / Note")
@@ -552,156 +755,172 @@ def show_clients_tab(people):
     #             st.dataframe(client_logs.sort_values(by="Date", ascending=False))
 
     # Charts
-    if filtered.empty:
-        st.warning("⚠️ No results match the current filter.")
-    else:
-        status_counts = filtered["Status"].value_counts().reset_index()
-        status_counts.columns = ["Status", "Count"]
-
-    box1, box2 = st.columns(2)
-
-    with box1:
-        chart_type = st.selectbox(
-            "📊 Select Chart Type for Client Status",
-            options=["Bar Chart", "Donut Pie Chart"],
-            index=0,
-        )
-
-    bar, lin = st.columns(2)
+    with stage("charts"):
+        if filtered.empty:
+            st.warning("⚠️ No results match the current filter.")
+        else:
+            status_counts = summary["status_counts"].reset_index()
+            status_counts.columns = ["Status", "Count"]
+
+        box1, box2 = st.columns(2)
+
+        with box1:
+            chart_type = st.selectbox(
+                "📊 Select Chart Type for Client Status",
+                options=["Bar Chart", "Donut Pie Chart"],
+                index=0,
+            )
 
-    if filtered.empty:
-        st.warning("⚠️ No results match the current filter.")
-    else:
-        with bar:
-            if chart_type == "Bar Chart":
-                fig_bar = px.bar(
-                    status_counts,
-                    x="Count",
-                    y="Status",
-                    orientation="h",
+        bar, lin = st.columns(2)
+
+        if filtered.empty:
+            st.warning("⚠️ No results match the current filter.")
+        else:
+            with bar:
+                if chart_type == "Bar Chart":
+                    fig_bar = px.bar(
+                        status_counts,
+                        x="Count",
+                        y="Status",
+                        orientation="h",
+                        color="Status",
+                        text="Count",
+                        color_discrete_sequence=px.colors.qualitative.Safe,
+                        title="📊 Client Status Overview (Bar)",
+                    )
+                    fig_bar.update_layout(yaxis_title="", xaxis_title="Clients")
+                    st.plotly_chart(fig_bar, use_container_width=True)
+
+                elif chart_type == "Donut Pie Chart":
+                    fig_pie = px.pie(
+                        status_counts,
+                        names="Status",
+                        values="Count",
+                        hole=0.4,
+                        color_discrete_sequence=px.colors.qualitative.Safe,
+                        title="🧭 Client Status Distribution (Donut)",
+                    )
+                    st.plotly_chart(fig_pie, use_container_width=True)
+
+        # fig_status_pie = px.pie(
+        #     status_counts,
+        #     values="Count",
+        #     names="Status",
+        #     title="🧭 Client Status Distribution",
+        #     hole=0.4,  # for donut style
+        # )
+
+        # st.plotly_chart(fig_status_pie, use_container_width=True)
+
+        # Merge latest contact info
+        if filtered.empty:
+            st.warning("⚠️ No results match the current filter.")
+        else:
+            # Every logged contact, pre-aggregated per week in crm.db
+            trend_df = weekly_contacts(
+                statuses=status, industry=None if industry == "All" else industry
+            )
+            with lin:
+                fig_trend = px.line(
+                    trend_df,
+                    x="Week",
+                    y="Contacts",
                     color="Status",
-                    text="Count",
-                    color_discrete_sequence=px.colors.qualitative.Safe,
-                    title="📊 Client Status Overview (Bar)",
-                )
-                fig_bar.update_layout(yaxis_title="", xaxis_title="Clients")
-                st.plotly_chart(fig_bar, use_container_width=True)
-
-            elif chart_type == "Donut Pie Chart":
-                fig_pie = px.pie(
-                    status_counts,
-                    names="Status",
-                    values="Count",
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Safe,
-                    title="🧭 Client Status Distribution (Donut)",
+                    markers=True,
+                    title="📅 Weekly Contacts by Status",
                 )
-                st.plotly_chart(fig_pie, use_container_width=True)
-
-    # fig_status_pie = px.pie(
-    #     status_counts,
-    #     values="Count",
-    #     names="Status",
-    #     title="🧭 Client Status Distribution",
-    #     hole=0.4,  # for donut style
-    # )
-
-    # st.plotly_chart(fig_status_pie, use_container_width=True)
 
-    # Merge latest contact info
-    latest_contacts_df = get_latest_contact_dates(filtered)
-    if filtered.empty:
-        st.warning("⚠️ No results match the current filter.")
-    else:
-        # filtered = filtered.merge(latest_contacts_df, on="Client ID", how="left")
-        trend_df = (
-            filtered.dropna(subset=["Last Contacted"])
-            .groupby([pd.Grouper(key="Last Contacted", freq="W-MON"), "Status"])
-            .size()
-            .reset_index(name="Count")
-            .sort_values("Last Contacted")
-        )
-        with lin:
-            fig_trend = px.line(
-                trend_df,
-                x="Last Contacted",
-                y="Count",
-                color="Status",
-                markers=True,
-                title="📅 Weekly Contacted Clients by Status",
+                fig_trend.update_layout(xaxis_title="Week", yaxis_title="Contacts")
+                st.plotly_chart(fig_trend, use_container_width=True)
+
+        if filtered.empty:
+            st.warning("⚠️ No results match the current filter.")
+        else:
+            personnel_counts = summary["company_counts"].reset_index()
+            personnel_counts.columns = ["Company", "Count"]
+
+            fig = px.bar(
+                personnel_counts,
+                x="Count",
+                y="Company",
+                orientation="h",
+                title="Personnel per Company",
             )
-
-            fig_trend.update_layout(xaxis_title="Week", yaxis_title="Client Count")
-            st.plotly_chart(fig_trend, use_container_width=True)
-
-    if filtered.empty:
-        st.warning("⚠️ No results match the current filter.")
-    else:
-        personnel_counts = filtered["Company"].value_counts().reset_index()
-        personnel_counts.columns = ["Company", "Count"]
-
-        fig = px.bar(
-            personnel_counts,
-            x="Count",
-            y="Company",
-            orientation="h",
-            title="Personnel per Company",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True)
 
     # Table
     st.subheader("Client List")
     if filtered.empty:
         st.warning("⚠️ No results match the current filter.")
     else:
-        st.dataframe(filtered, use_container_width=True)
+        with stage("table"):
+            show_paged_table("clients", people, summary["rows"], add_revenue)
 
 
-st.set_page_config(layout="wide")
+def main():
+    # Load data
+    with stage("load_people") as timing:
+        # Shared by every session; a write anywhere publishes a new version
+        people = people_snapshot().people
+        timing.rows = len(people)
+    with stage("load_companies") as timing:
+        companies = load_companies()  # Your companies dataset
+        timing.rows = len(companies)
 
-# st.info("App reloaded successfully at: " + str(datetime.now()))
+    # Added to the filtered rows only, so `people` stays the shared snapshot frame
+    with stage("industry_revenue", rows=len(companies)):
+        industry_revenue = companies.groupby("Industry")["Revenue"].sum().round(2)
 
+    if "Industry" in people.columns:
+        people = people.drop(columns=["Industry"])
 
-# Load data
-people, logs_df = load_people()
-companies = load_companies()  # Your companies dataset
+    # people.columns
 
-industry_revenue = companies.groupby("Industry")["Revenue"].sum().reset_index().round(2)
-industry_revenue.rename(columns={"Revenue": "Total Industry Revenue"}, inplace=True)
+    # Drop existing columns if present
+    # for col in ["Status", "Last Contacted"]:
+    #     if col in people.columns:
+    #         people.drop(columns=col, inplace=True)
 
-if "Total Industry Revenue" not in people.columns:
-    people = people.merge(
-        industry_revenue, how="left", left_on="LLM_Industry", right_on="Industry"
-    ).drop(columns=["Industry"])
+    # status_df, logs_df = get_status_and_logs()
+    # people = people.merge(status_df, on="Client ID", how="left")
 
-if "Industry" in people.columns:
-    people = people.drop(columns=["Industry"])
+    tab = st.sidebar.radio("Navigate", ["Clients", "Companies"])
+    # if tab == "Companies":
+    #     show_companies_tab()
 
-# people.columns
+    # Clear and isolate page layout
+    st.markdown("---")
+    st.markdown("<style>body {overflow-x: hidden;}</style>", unsafe_allow_html=True)
 
-# Drop existing columns if present
-# for col in ["Status", "Last Contacted"]:
-#     if col in people.columns:
-#         people.drop(columns=col, inplace=True)
+    if tab == "Clients":
+        # st.markdown("## Clients")
+        with stage("clients"):
+            show_clients_tab(people, companies, industry_revenue)
+        st.markdown("<div style='height:200px;'></div>", unsafe_allow_html=True)
 
+    elif tab == "Companies":
+        # st.markdown("## Companies")
+        with stage("companies"):
+            show_companies_tab(companies, people)
+        st.markdown("<div style='height:200px;'></div>", unsafe_allow_html=True)
 
-# status_df, logs_df = get_status_and_logs()
-# people = people.merge(status_df, on="Client ID", how="left")
 
-tab = st.sidebar.radio("Navigate", ["Clients", "Companies"])
-# if tab == "Companies":
-#     show_companies_tab()
+st.set_page_config(layout="wide")
 
-# Clear and isolate page layout
-st.markdown("---")
-st.markdown("<style>body {overflow-x: hidden;}</style>", unsafe_allow_html=True)
+# Stage timings of this rerun; "Profile next rerun" in the debug panel asks
+# for a cProfile capture of the following one. Reruns are logged while the
+# panel is open, otherwise only a sample of them.
+perf = start_rerun(
+    profile=st.session_state.pop("profile_rerun", False),
+    log=st.session_state.get("debug_perf", False),
+)
 
-if tab == "Clients":
-    # st.markdown("## Clients")
-    show_clients_tab(people)
-    st.markdown("<div style='height:200px;'></div>", unsafe_allow_html=True)
+# st.info("App reloaded successfully at: " + str(datetime.now()))
 
-elif tab == "Companies":
-    # st.markdown("## Companies")
-    show_companies_tab(companies)
-    st.markdown("<div style='height:200px;'></div>", unsafe_allow_html=True)
+# Logged even when the run stops early: st.rerun(), st.stop() or an error
+try:
+    main()
+finally:
+    perf_record = perf.finish()
+if st.sidebar.checkbox("🐞 Debug timings", key="debug_perf"):
+    show_debug_panel(perf, perf_record)
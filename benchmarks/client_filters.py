@@ -0,0 +1,75 @@
+"""Cost of one Clients-tab filter change: copy + masks vs the filter index.
+
+    python -m benchmarks.client_filters --clients 1000000
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.memory_keys import make_people
+from modules.filters import ClientFilterIndex
+
+FILTERS = [
+    (None, []),
+    ("Energy", []),
+    (None, ["won", "lost"]),
+    ("Healthcare", ["open", "contacted", "engaged"]),
+]
+
+
+def legacy_filter(people, industry, status):
+    # What show_clients_tab did on every rerun
+    filtered = people.copy()
+    if industry is not None:
+        filtered = filtered[filtered["LLM_Industry"] == industry]
+    if status:
+        filtered = filtered[filtered["Status"].isin(status)]
+    filtered["Company"].nunique()
+    filtered["Status"].value_counts().loc[lambda c: c > 0]
+    filtered["Company"].value_counts().loc[lambda c: c > 0]
+    return filtered
+
+
+def ms(func):
+    start = time.perf_counter()
+    func()
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    people = make_people(args.clients)
+    for col in ["Status", "LLM_Industry", "Company"]:
+        people[col] = people[col].astype("category")
+
+    start = time.perf_counter()
+    index = ClientFilterIndex(people)
+    build_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    results = []
+    for industry, status in FILTERS:
+        results.append(
+            {
+                "industry": industry,
+                "status": status,
+                "legacy_ms": ms(lambda: legacy_filter(people, industry, status)),
+                "index_first_ms": ms(lambda: index.select(people, industry, status)),
+                "index_repeat_ms": ms(lambda: index.select(people, industry, status)),
+                "counts_repeat_ms": ms(lambda: index.summary(industry, status)),
+            }
+        )
+
+    print(
+        json.dumps(
+            {"clients": args.clients, "index_build_ms": build_ms, "filters": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
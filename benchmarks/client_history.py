@@ -0,0 +1,103 @@
+"""One client's call history as the logs table grows: filtering the loaded logs vs keyset pages.
+
+    python -m benchmarks.client_history --notes 100000 1000000 3000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.call_logs import client_history, insert_logs
+from modules.db import connection, from_epoch, init_db, transaction
+
+CLIENTS = 50_000
+
+
+def add_logs(db_path, n, rng, chunk=200_000):
+    start = 1_704_067_200  # 2024-01-01
+    for offset in range(0, n, chunk):
+        size = min(chunk, n - offset)
+        rows = pd.DataFrame(
+            {
+                "client_id": [
+                    f"Client {i} @ Bench" for i in rng.integers(0, CLIENTS, size)
+                ],
+                "note": "called, left a voicemail",
+                "timestamp": start + rng.integers(0, 365 * 86400, size),
+            }
+        )
+        with transaction(db_path) as conn:
+            insert_logs(conn, rows)
+
+
+def avg_ms(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return round((time.perf_counter() - start) * 1000 / len(items), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--notes", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    clients = [f"Client {i} @ Bench" for i in rng.integers(0, CLIENTS, args.queries)]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        init_db(db_path)
+        total = 0
+        for n in sorted(args.notes):
+            add_logs(db_path, n - total, rng)
+            total = n
+
+            # What the dashboard did: the whole table in memory, filtered per client
+            start = time.perf_counter()
+            with connection(db_path) as conn:
+                logs = pd.read_sql_query("SELECT * FROM logs", conn)
+            logs["timestamp"] = from_epoch(logs["timestamp"])
+            load_ms = round((time.perf_counter() - start) * 1000, 1)
+
+            def global_filter(client):
+                logs[logs["client_id"] == client].sort_values(
+                    "timestamp", ascending=False
+                )
+
+            def first_page(client):
+                client_history(client, db_path=db_path)
+
+            # An older page, starting after each client's five newest notes
+            cursors = {
+                c: client_history(c, limit=5, db_path=db_path)[1] for c in clients
+            }
+
+            def next_page(client):
+                client_history(client, before=cursors[client], db_path=db_path)
+
+            results.append(
+                {
+                    "notes": n,
+                    "load_all_logs_ms": load_ms,
+                    "filter_loaded_logs_ms": avg_ms(global_filter, clients),
+                    "history_first_page_ms": avg_ms(first_page, clients),
+                    "history_next_page_ms": avg_ms(next_page, clients),
+                }
+            )
+            del logs
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""People -> Companies matching at scale: exact names vs normalized keys with a fuzzy fallback.
+
+Synthetic people (benchmarks/synthetic.py) have a share of their Company
+cells re-typed: upper case, another legal suffix, "&" for "and", a comma,
+the suffix run into the name, or a letter dropped. Another share names
+companies that are not in the Companies sheet at all and must stay unmatched.
+
+    python -m benchmarks.company_links --people 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import company_names, make_companies, make_people, sizes
+from modules.company_links import CompanyLinks, company_links
+from modules.db import init_db
+
+VARIANTS = ["upper", "suffix", "ampersand", "comma", "glued", "typo"]
+
+
+def retype(names, rng):
+    """``names`` written the way people type them, one variant per name."""
+    kind = rng.integers(0, len(VARIANTS), len(names))
+    typed = names.copy()
+    # "Smith-Jones 12 LLC" -> "SMITH-JONES 12 LLC"
+    at = kind == 0
+    typed[at] = names[at].str.upper()
+    # -> "Smith-Jones 12 Inc."
+    at = kind == 1
+    typed[at] = names[at].str.replace(r" (LLC|Ltd|Inc|PLC)$", " Inc.", regex=True)
+    # "Smith-Jones 12 and Sons" -> "Smith-Jones 12 & Sons"
+    at = kind == 2
+    typed[at] = names[at].str.replace(" and ", " & ", regex=False)
+    # -> "Smith-Jones 12, LLC"
+    at = kind == 3
+    typed[at] = names[at].str.replace(r" (\w+)$", r", \1", regex=True)
+    # -> "Smith-Jones 12LLC"
+    at = kind == 4
+    typed[at] = names[at].str.replace(r" (LLC|Ltd|Inc|PLC)$", r"\1", regex=True)
+    # -> "Smth-Jones 12 LLC"
+    at = np.flatnonzero(kind == 5)
+    cut = rng.integers(1, 4, len(at))
+    typed.iloc[at] = [n[:c] + n[c + 1 :] for n, c in zip(names.iloc[at], cut)]
+    return typed, np.array(VARIANTS)[kind]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=1_000_000)
+    parser.add_argument("--retyped", type=float, default=0.05)
+    parser.add_argument("--unknown", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_companies = sizes(args.people)["companies"]
+    companies = make_companies(n_companies).rename(
+        columns={"Revenue (in Millions)": "Revenue"}
+    )
+    people = make_people(0, args.people, companies["Company Name"])
+    truth = people["Company"].map(
+        pd.Series(np.arange(n_companies), index=companies["Company Name"])
+    )
+
+    picked = rng.choice(args.people, int(args.people * args.retyped), replace=False)
+    typed, variant = retype(people["Company"].iloc[picked], rng)
+    people.loc[people.index[picked], "Company"] = typed.to_numpy()
+    variants = pd.Series("as listed", index=people.index)
+    variants.iloc[picked] = variant
+
+    # Companies past the end of the sheet, named like the ones in it
+    unknown = rng.choice(args.people, int(args.people * args.unknown), replace=False)
+    extra = company_names(n_companies + len(unknown)).iloc[n_companies:]
+    people.loc[people.index[unknown], "Company"] = extra.to_numpy()
+    truth.iloc[unknown] = -1
+    variants.iloc[unknown] = "unknown"
+    truth = truth.to_numpy()
+    people["Company"] = people["Company"].astype("category")
+
+    start = time.perf_counter()
+    exact = people["Company"].astype(object).isin(set(companies["Company Name"]))
+    exact_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "crm.db")
+        init_db(db_path)
+        start = time.perf_counter()
+        links = CompanyLinks(people, companies, db_path)
+        cold_seconds = time.perf_counter() - start
+
+        # A reload: a new people frame, the fuzzy matches come from crm.db
+        start = time.perf_counter()
+        CompanyLinks(people.copy(), companies, db_path)
+        stored_seconds = time.perf_counter() - start
+
+        company_links(people, companies, db_path)
+        start = time.perf_counter()
+        company_links(people, companies, db_path)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+    page = rng.choice(args.people, 50, replace=False)
+    start = time.perf_counter()
+    links.lookup(page, ["Revenue", "Address"])
+    page_ms = (time.perf_counter() - start) * 1000
+
+    found = links.company_id
+    linked = found >= 0
+    per_variant = {
+        name: round(float((found[at] == truth[at]).mean()), 4)
+        for name, at in variants.groupby(variants).indices.items()
+    }
+    print(
+        json.dumps(
+            {
+                "people": args.people,
+                "companies": n_companies,
+                "distinct_names": len(links.names),
+                "fuzzy_names": int((links.names["match"] == "fuzzy").sum()),
+                "exact_name_seconds": round(exact_seconds, 2),
+                "exact_name_linked": round(float(exact.mean()), 4),
+                "cold_seconds": round(cold_seconds, 2),
+                "stored_fuzzy_seconds": round(stored_seconds, 2),
+                "cached_ms": round(cached_ms, 3),
+                "page_lookup_ms": round(page_ms, 3),
+                "linked": round(float(linked.mean()), 4),
+                "precision": round(float((found[linked] == truth[linked]).mean()), 4),
+                "recall": round(
+                    float((found[truth >= 0] == truth[truth >= 0]).mean()), 4
+                ),
+                "correct_by_variant": per_variant,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Keyword search latency: str.contains scans vs the FTS5 trigram index.
+
+    python -m benchmarks.company_search --companies 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.company_search import search_companies, sync_index
+
+KEYWORDS = ["Company 4711", "Maple", "Springfield", "ab"]
+STREETS = ["Main St.", "Maple Ave.", "Oak Rd.", "River Rd.", "3rd St.", "Park Blvd."]
+CITIES = ["Santa Rosa", "Springfield", "Guerneville", "Fairview", "Riverside"]
+
+
+def make_companies(n, seed=0):
+    rng = np.random.default_rng(seed)
+    streets = np.array(STREETS)[rng.integers(0, len(STREETS), n)]
+    cities = np.array(CITIES)[rng.integers(0, len(CITIES), n)]
+    numbers = rng.integers(1, 20000, n).astype(str)
+    return pd.DataFrame(
+        {
+            "Company Name": [
+                f"Company {i} {'LLC' if i % 3 else 'Ltd'}" for i in range(n)
+            ],
+            "Address": pd.Series(numbers) + " " + streets + ", " + cities,
+        }
+    )
+
+
+def best_ms(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=1_000_000)
+    parser.add_argument("--appended", type=int, default=1000)
+    args = parser.parse_args()
+
+    companies = make_companies(args.companies + args.appended)
+    base = companies.iloc[: args.companies]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "crm.db")
+        start = time.perf_counter()
+        sync_index(base, db_path)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        slot, appended = sync_index(companies, db_path)
+        append_seconds = time.perf_counter() - start
+
+        queries = []
+        for keyword in KEYWORDS:
+            scan_ms, mask = best_ms(
+                lambda: companies["Company Name"].str.contains(keyword, case=False)
+                | companies["Address"].str.contains(keyword, case=False)
+            )
+            index_ms, positions = best_ms(
+                lambda: search_companies(keyword, db_path=db_path, slot=slot)
+            )
+            top_ms, _ = best_ms(
+                lambda: search_companies(keyword, limit=20, db_path=db_path, slot=slot)
+            )
+            queries.append(
+                {
+                    "keyword": keyword,
+                    "matches": len(positions),
+                    "scan_ms": scan_ms,
+                    "index_ms": index_ms,
+                    "index_top20_ms": top_ms,
+                    "same_rows": set(positions) == set(np.flatnonzero(mask)),
+                }
+            )
+
+    print(
+        json.dumps(
+            {
+                "companies": len(companies),
+                "build_seconds": round(build_seconds, 2),
+                "appended_rows": appended,
+                "append_seconds": round(append_seconds, 3),
+                "queries": queries,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Writes/second with N simulated dashboard sessions writing to crm.db at once.
+
+Compares the pooled WAL connections in modules.db with the previous
+behaviour (a fresh default-journal connection per write):
+
+    python -m benchmarks.db_concurrency --sessions 1 4 16 --writes 200
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from modules import db
+
+
+def legacy_update_status(client_id, new_status, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        INSERT INTO client_status (client_id, status) VALUES (?, ?)
+        ON CONFLICT(client_id) DO UPDATE SET status=excluded.status
+        """,
+        (client_id, new_status),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_log_call(client_id, note, db_path):
+    conn = sqlite3.connect(db_path)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute(
+        "INSERT INTO logs (client_id, note, timestamp) VALUES (?, ?, ?)",
+        (client_id, note, timestamp),
+    )
+    conn.execute(
+        """
+        INSERT INTO client_status (client_id, last_contacted) VALUES (?, ?)
+        ON CONFLICT(client_id) DO UPDATE SET last_contacted=excluded.last_contacted
+        """,
+        (client_id, timestamp),
+    )
+    conn.commit()
+    conn.close()
+
+
+MODES = {
+    "legacy": (legacy_update_status, legacy_log_call),
+    "pooled": (db.update_status, db.log_call),
+}
+
+
+def run(mode, sessions, writes, db_path):
+    update_status, log_call = MODES[mode]
+    errors = []
+
+    def session(n):
+        for i in range(writes):
+            client_id = f"Client {n}-{i % 50} @ Bench"
+            try:
+                if i % 2:
+                    update_status(client_id, "contacted", db_path=db_path)
+                else:
+                    log_call(client_id, f"note {i}", db_path=db_path)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = sessions * writes
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "writes": total,
+        "seconds": round(elapsed, 3),
+        "writes_per_second": round((total - len(errors)) / elapsed, 1),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    results = []
+    for mode in MODES:
+        for sessions in args.sessions:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = os.path.join(tmp, "crm.db")
+                db.init_db(db_path)
+                if mode == "legacy":
+                    # Back to the rollback journal the app used before
+                    db.close_all()
+                    conn = sqlite3.connect(db_path)
+                    conn.execute("PRAGMA journal_mode=DELETE")
+                    conn.close()
+                results.append(run(mode, sessions, args.writes, db_path))
+                db.close_all()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""People dedup at scale: full resolution, an incremental batch, precision and recall.
+
+Synthetic people (benchmarks/synthetic.py) get a share of planted
+duplicates: the same person with a different email casing, a reformatted
+phone number and a legal suffix or "&" in the company name, some with a
+one-letter typo in the first name.
+
+    python -m benchmarks.entity_resolution --people 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import client_ids, make_companies, make_people, sizes
+from modules.db import connection, init_db
+from modules.entity_resolution import update_clusters
+
+
+def _phone_variant(phones, rng):
+    fmt = rng.integers(0, 3, len(phones))
+    return np.where(
+        fmt == 0,
+        "001-" + phones.str[:3] + "-" + phones.str[3:6] + "-" + phones.str[6:],
+        np.where(
+            fmt == 1,
+            "(" + phones.str[:3] + ") " + phones.str[3:6] + "-" + phones.str[6:],
+            "+1." + phones.str[:3] + "." + phones.str[3:6] + "." + phones.str[6:],
+        ),
+    )
+
+
+def plant_duplicates(people, share, rng):
+    """``people`` plus re-typed copies of a random ``share`` of its rows.
+
+    As many namesakes are added too: same name, another company, their own
+    email and phone. Those must stay separate people.
+    """
+    picked = rng.choice(len(people), int(len(people) * share), replace=False)
+    dups = people.iloc[picked].copy()
+    dups["Email"] = dups["Email"].str.upper()
+    dups["Phone Number"] = _phone_variant(dups["Phone Number"], rng)
+    dups["Company"] = (
+        dups["Company"].str.replace(" and ", " & ", regex=False) + ", Inc."
+    )
+    typo = rng.random(len(dups)) < 0.3
+    names = dups.loc[typo, "Name"]
+    dups.loc[typo, "Name"] = names.str[0] + names.str[1:].str.replace("a", "e", n=1)
+    dups["Client ID"] = client_ids(dups)
+    truth = pd.Series(people["Client ID"].to_numpy()[picked], index=dups["Client ID"])
+
+    namesakes = people.iloc[rng.choice(len(people), len(picked), replace=False)]
+    namesakes = namesakes.assign(
+        Company=people["Company"].to_numpy()[rng.integers(0, len(people), len(picked))],
+        Email=namesakes["Name"].str.replace(" ", ".") + "@elsewhere.com",
+        **{"Phone Number": rng.integers(2 * 10**9, 10**10, len(picked)).astype(str)},
+    )
+    namesakes["Client ID"] = client_ids(namesakes)
+    people = pd.concat([people, dups, namesakes], ignore_index=True)
+    return people.drop_duplicates("Client ID"), truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=1_000_000)
+    parser.add_argument("--share", type=float, default=0.02)
+    parser.add_argument("--batch", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    companies = make_companies(sizes(args.people)["companies"])["Company Name"]
+    people = make_people(0, args.people, companies)
+    people["Client ID"] = client_ids(people)
+    people, truth = plant_duplicates(people, args.share, rng)
+    people = people.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    # The last rows arrive later, as an incremental load
+    batch = int(len(people) * args.batch)
+    first = people.iloc[:-batch]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "crm.db")
+        init_db(db_path)
+        with connection(db_path) as conn:
+            start = time.perf_counter()
+            update_clusters(conn, first)
+            full_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            canonical = update_clusters(conn, people)
+            incremental_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            update_clusters(conn, people)
+            unchanged_seconds = time.perf_counter() - start
+
+    # Pairs put together vs planted (duplicate, original) pairs
+    found = pd.Series(canonical.to_numpy(), index=people["Client ID"])
+    found = found[found.index != found.to_numpy()]
+    found_pairs = set(zip(found.index, found))
+    # Either copy may be the one kept, whichever came first
+    true_pairs = set(truth.items()) | {(b, a) for a, b in truth.items()}
+    hits = len(found_pairs & true_pairs)
+
+    print(
+        json.dumps(
+            {
+                "people": len(people),
+                "planted_duplicates": len(truth),
+                "planted_namesakes": len(truth),
+                "full_seconds": round(full_seconds, 1),
+                "incremental_rows": batch,
+                "incremental_seconds": round(incremental_seconds, 1),
+                "unchanged_seconds": round(unchanged_seconds, 2),
+                "merged": len(found_pairs),
+                "precision": round(hits / max(len(found_pairs), 1), 4),
+                "recall": round(hits / max(len(truth), 1), 4),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Full and incremental geocoding runs against the offline stub backend.
+
+    python -m benchmarks.geocode --companies 2000 --added 10 --latency 0.01
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.stub_geocoder import StubGeocoder
+from modules.geocoding import geocode_companies
+
+
+def make_companies(n, offset=0):
+    ids = range(offset, offset + n)
+    return pd.DataFrame(
+        {
+            "Company Name": [f"Company {i}" for i in ids],
+            "Address": [f"{i} Main St., Springfield, {i % 50:02d}" for i in ids],
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=2000)
+    parser.add_argument("--added", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "crm.db")
+        csv_path = os.path.join(tmp, "companies_geocoded.csv")
+        companies = make_companies(args.companies)
+
+        for run, frame in [
+            ("full", companies),
+            (
+                "incremental",
+                pd.concat([companies, make_companies(args.added, args.companies)]),
+            ),
+        ]:
+            backend = StubGeocoder(
+                latency=args.latency, rate=args.rate, failure_rate=0.01
+            )
+            start = time.perf_counter()
+            geocoded = geocode_companies(
+                frame,
+                previous_path=csv_path,
+                db_path=db_path,
+                backend=backend,
+                max_workers=args.workers,
+            )
+            elapsed = time.perf_counter() - start
+            geocoded.to_csv(csv_path, index=False)
+            results[run] = {
+                "companies": len(frame),
+                "provider_calls": backend.calls,
+                "seconds": round(elapsed, 3),
+                "addresses_per_second": round(len(frame) / elapsed, 1),
+            }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Throughput of the batch industry classifier against the local OpenAI stub.
+
+python -m benchmarks.llm_classify --people 5000 --unique 800 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.stub_openai import StubOpenAI
+from modules.llm_industry import classify_titles, make_client
+
+
+def make_titles(people, unique, seed=0):
+    rng = random.Random(seed)
+    base = [f"Job Title {i}" for i in range(unique)]
+    # Same title with different spacing/casing, as it shows up in the sheet
+    variants = [lambda t: t, str.upper, lambda t: f"  {t.lower()} "]
+    return [rng.choice(variants)(rng.choice(base)) for _ in range(people)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=5000)
+    parser.add_argument("--unique", type=int, default=800)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rps", type=float, default=200)
+    args = parser.parse_args()
+
+    titles = make_titles(args.people, args.unique)
+    with tempfile.TemporaryDirectory() as tmp, StubOpenAI(
+        latency=args.latency, failure_rate=args.failure_rate
+    ) as stub:
+        checkpoint = os.path.join(tmp, "checkpoint.jsonl")
+        client = make_client(base_url=stub.base_url, api_key="stub")
+        start = time.perf_counter()
+        results = classify_titles(
+            titles,
+            client=client,
+            max_workers=args.workers,
+            requests_per_second=args.rps,
+            checkpoint_path=checkpoint,
+        )
+        elapsed = time.perf_counter() - start
+
+        # A second run should be served entirely from the checkpoint
+        requests_before = stub.requests
+        classify_titles(titles, client=client, checkpoint_path=checkpoint)
+        resumed_requests = stub.requests - requests_before
+
+    print(
+        json.dumps(
+            {
+                "titles": len(titles),
+                "unique_titles": len(results),
+                "requests": requests_before,
+                "seconds": round(elapsed, 3),
+                "titles_per_second": round(len(titles) / elapsed, 1),
+                "unique_titles_per_second": round(len(results) / elapsed, 1),
+                "requests_after_resume": resumed_requests,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Throughput of bulk call-log loads and single appends into the logs table.
+
+    python -m benchmarks.log_ingest --rows 1000000 --format jsonl
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.call_logs import append_log, bulk_load
+from modules.db import init_db
+
+
+def write_export(path, rows, fmt, clients=50_000, seed=0, chunk=200_000):
+    # Written in chunks so generating a multi-million-row export stays small
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01").value // 10**9
+    with open(path, "w", encoding="utf-8") as f:
+        for offset in range(0, rows, chunk):
+            n = min(chunk, rows - offset)
+            df = pd.DataFrame(
+                {
+                    "Client ID": [
+                        f"Client {i} @ Company {i % 997}"
+                        for i in rng.integers(0, clients, n)
+                    ],
+                    "Date": pd.to_datetime(
+                        start + rng.integers(0, 365 * 86400, n), unit="s"
+                    ).strftime("%Y-%m-%d %H:%M:%S"),
+                    "Note": [f"call note {i}" for i in range(offset, offset + n)],
+                }
+            )
+            if fmt == "jsonl":
+                df.to_json(f, orient="records", lines=True)
+            else:
+                df.to_csv(f, index=False, header=offset == 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--appends", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "crm.db")
+        export = os.path.join(tmp, f"export.{args.format}")
+        write_export(export, args.rows, args.format)
+        init_db(db_path)
+
+        start = time.perf_counter()
+        loaded = bulk_load(export, db_path=db_path, chunksize=args.chunksize)
+        bulk_seconds = time.perf_counter() - start
+
+        # Single appends on top of the loaded table should not slow down
+        start = time.perf_counter()
+        for i in range(args.appends):
+            append_log(f"Client {i} @ Company {i % 997}", "note", db_path=db_path)
+        append_seconds = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "format": args.format,
+                "rows_loaded": loaded,
+                "bulk_seconds": round(bulk_seconds, 3),
+                "bulk_rows_per_second": round(loaded / bulk_seconds, 1),
+                "appends": args.appends,
+                "append_ms": round(append_seconds / args.appends * 1000, 4),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
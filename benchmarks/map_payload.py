@@ -0,0 +1,120 @@
+"""Plotly payload and build time for the company map: every point vs grid clusters.
+
+    python -m benchmarks.map_payload --companies 50000 200000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from modules.map_clusters import MapClusters, viewport
+
+INDUSTRIES = ["Technology", "Healthcare", "Education", "Finance", "Retail", "Energy"]
+# Rough population centres so points cluster the way real addresses do
+CITIES = [(38.44, -122.71), (34.05, -118.24), (40.71, -74.0), (41.88, -87.63)]
+
+
+def make_companies(n, seed=0):
+    rng = np.random.default_rng(seed)
+    city = np.array(CITIES)[rng.integers(0, len(CITIES), n)]
+    return pd.DataFrame(
+        {
+            "Company Name": [f"Company {i}" for i in range(n)],
+            "Address": [f"{i} Main St." for i in range(n)],
+            "Revenue": rng.uniform(1, 500, n).round(2),
+            "Industry": np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), n)],
+            "Latitude": city[:, 0] + rng.normal(0, 0.3, n),
+            "Longitude": city[:, 1] + rng.normal(0, 0.3, n),
+        }
+    )
+
+
+def figure(df, clustered, zoom, center):
+    if clustered:
+        return px.scatter_mapbox(
+            df,
+            lat="Latitude",
+            lon="Longitude",
+            size="Companies",
+            color="Industry",
+            hover_data={"Companies": True, "Revenue": ":,.2f"},
+            zoom=zoom,
+            center={"lat": center[0], "lon": center[1]},
+        )
+    return px.scatter_mapbox(
+        df,
+        lat="Latitude",
+        lon="Longitude",
+        hover_name="Company Name",
+        hover_data={"Industry": True, "Revenue": ":,.2f", "Address": True},
+        color="Industry",
+        zoom=zoom,
+        center={"lat": center[0], "lon": center[1]},
+    )
+
+
+def measure(build):
+    start = time.perf_counter()
+    payload = build().to_json()
+    return round((time.perf_counter() - start) * 1000, 1), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--zooms", type=int, nargs="+", default=[1, 5, 9, 13])
+    args = parser.parse_args()
+
+    results = []
+    for n in args.companies:
+        companies = make_companies(n)
+        center = CITIES[0]
+        full_ms, full_bytes = measure(lambda: figure(companies, False, 1, center))
+
+        start = time.perf_counter()
+        clusters = MapClusters(companies)
+        views = {}
+        for zoom in args.zooms:
+            views[zoom] = clusters.view(zoom, bbox=viewport(center, zoom))
+        cold_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        start = time.perf_counter()
+        for zoom in args.zooms:
+            clusters.view(zoom, bbox=viewport(center, zoom))
+        warm_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        per_zoom = []
+        for zoom, view in views.items():
+            ms, size = measure(
+                lambda: figure(view["data"], view["clustered"], zoom, center)
+            )
+            per_zoom.append(
+                {
+                    "zoom": zoom,
+                    "clustered": view["clustered"],
+                    "markers": len(view["data"]),
+                    "figure_ms": ms,
+                    "payload_bytes": size,
+                }
+            )
+
+        results.append(
+            {
+                "companies": n,
+                "all_points_figure_ms": full_ms,
+                "all_points_payload_bytes": full_bytes,
+                "cluster_first_views_ms": cold_ms,
+                "cluster_cached_views_ms": warm_ms,
+                "views": per_zoom,
+            }
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
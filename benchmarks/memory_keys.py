@@ -0,0 +1,111 @@
+"""Memory and merge/filter cost of string Client IDs vs integer keys + categoricals.
+
+Reports bytes per million clients for the legacy layout ("Name @ Company"
+string IDs, object Status/LLM_Industry/Company) and the keyed layout load_people
+now produces: the same Client ID strings, which writes and the client picker
+still use, plus an int32 Client Key and categorical columns.
+
+    python -m benchmarks.memory_keys --clients 1000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ["open", "contacted", "engaged", "negotiation", "won", "lost", "on hold"]
+INDUSTRIES = ["Technology", "Healthcare", "Education", "Finance", "Retail", "Energy"]
+
+
+def make_people(n, companies=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    company = np.array([f"Company {i}-{i * 7 % 1000}" for i in range(companies)])
+    people = pd.DataFrame(
+        {
+            "Name": [f"Person {i}" for i in range(n)],
+            "Company": company[rng.integers(0, companies, n)],
+            "Status": np.array(STATUSES, dtype=object)[rng.integers(0, 7, n)],
+            "LLM_Industry": np.array(INDUSTRIES, dtype=object)[rng.integers(0, 6, n)],
+        }
+    )
+    people["Client ID"] = people["Name"] + " @ " + people["Company"]
+    return people
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy = make_people(args.clients)
+    keyed = legacy.copy()
+    keyed["Client Key"] = np.arange(1, len(keyed) + 1, dtype="int32")
+    for col in ["Status", "LLM_Industry", "Company"]:
+        keyed[col] = keyed[col].astype("category")
+
+    scale = 1_000_000 / args.clients
+    columns = ["Company", "Status", "LLM_Industry"]
+    memory = {
+        "legacy_mb_per_million": {
+            col: round(legacy[col].memory_usage(deep=True) * scale / 2**20, 1)
+            for col in ["Client ID"] + columns
+        },
+        "keyed_mb_per_million": {
+            col: round(keyed[col].memory_usage(deep=True) * scale / 2**20, 1)
+            for col in ["Client ID", "Client Key"] + columns
+        },
+    }
+    memory["saved_mb_per_million"] = round(
+        sum(memory["legacy_mb_per_million"].values())
+        - sum(memory["keyed_mb_per_million"].values()),
+        1,
+    )
+
+    # A status table covering 10% of clients, merged the way load_people does
+    sample = np.random.default_rng(1).choice(args.clients, args.clients // 10)
+    status_by_id = pd.DataFrame(
+        {"Client ID": legacy["Client ID"].to_numpy()[sample], "Client Status": "won"}
+    ).drop_duplicates("Client ID")
+    status_by_key = pd.DataFrame(
+        {"Client Key": keyed["Client Key"].to_numpy()[sample], "Client Status": "won"}
+    ).drop_duplicates("Client Key")
+
+    timings_ms = {
+        "merge_on_string_id": timed(
+            lambda: legacy.merge(status_by_id, on="Client ID", how="left")
+        ),
+        "merge_on_int_key": timed(
+            lambda: keyed.merge(status_by_key, on="Client Key", how="left")
+        ),
+        "isin_object_status": timed(
+            lambda: legacy["Status"].isin(["won", "lost"]).sum()
+        ),
+        "isin_categorical_status": timed(
+            lambda: keyed["Status"].isin(["won", "lost"]).sum()
+        ),
+        "eq_object_industry": timed(lambda: (legacy["LLM_Industry"] == "Energy").sum()),
+        "eq_categorical_industry": timed(
+            lambda: (keyed["LLM_Industry"] == "Energy").sum()
+        ),
+    }
+
+    print(
+        json.dumps(
+            {"clients": args.clients, **memory, "timings_ms": timings_ms}, indent=2
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Call-note search over a synthetic corpus: logs_fts queries vs LIKE scans.
+
+    python -m benchmarks.notes_search --notes 2000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.call_logs import insert_logs, search_notes
+from modules.db import connection, init_db, transaction
+
+# Domain words the queries look for, placed mid-table in a Zipf-distributed
+# vocabulary of made-up filler words, so each one shows up in a few percent
+# of notes like real terms do rather than in every other note.
+WORDS = (
+    "pricing quote contract renewal renewing upgrade budget approval procurement "
+    "legal review decision champion onboarding invoice discount pilot expansion "
+    "churn risk competitor integration security questionnaire kickoff roadmap"
+).split()
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "pe", "du", "ga", "zo"]
+
+
+def make_vocabulary(size=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    filler = set()
+    while len(filler) < size:
+        n = rng.integers(2, 5)
+        filler.add("".join(rng.choice(SYLLABLES, n)))
+    filler = sorted(filler)
+    rng.shuffle(filler)
+    vocabulary = np.array(filler[:40] + WORDS + filler[40:])
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1) ** 1.07
+    return vocabulary, weights / weights.sum()
+
+
+QUERIES = [
+    ("term", "procurement", {}),
+    ("phrase", '"renewal contract"', {}),
+    ("prefix", "integ*", {}),
+    ("term_last_month", "renewal", {"since": "2024-12-01", "until": "2025-01-01"}),
+    ("term_recent_first", "churn risk", {"order": "recent"}),
+]
+
+
+def fill_logs(db_path, notes, clients=50_000, seed=0, chunk=200_000):
+    rng = np.random.default_rng(seed)
+    words, weights = make_vocabulary(seed=seed)
+    start = 1_704_067_200  # 2024-01-01
+    for offset in range(0, notes, chunk):
+        n = min(chunk, notes - offset)
+        lengths = rng.integers(6, 20, n)
+        picks = rng.choice(words, lengths.sum(), p=weights)
+        text = np.split(picks, np.cumsum(lengths)[:-1])
+        rows = pd.DataFrame(
+            {
+                "client_id": [
+                    f"Client {i} @ Bench" for i in rng.integers(0, clients, n)
+                ],
+                "note": [" ".join(t) for t in text],
+                "timestamp": start + rng.integers(0, 365 * 86400, n),
+            }
+        )
+        with transaction(db_path) as conn:
+            insert_logs(conn, rows)
+
+
+def best_ms(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=2_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "crm.db")
+        init_db(db_path)
+        start = time.perf_counter()
+        fill_logs(db_path, args.notes)
+        ingest_seconds = time.perf_counter() - start
+
+        results = []
+        for name, text, kwargs in QUERIES:
+            fts_ms, found = best_ms(
+                lambda: search_notes(text, limit=args.limit, db_path=db_path, **kwargs)
+            )
+            # What a search without the index costs: a scan of every note
+            word = text.strip('"*').split()[0]
+            with connection(db_path) as conn:
+                scan_ms, _ = best_ms(
+                    lambda: conn.execute(
+                        "SELECT id FROM logs WHERE note LIKE ? LIMIT ?",
+                        (f"%{word}%", args.limit),
+                    ).fetchall(),
+                    repeat=1,
+                )
+                like_all_ms, _ = best_ms(
+                    lambda: conn.execute(
+                        "SELECT COUNT(*) FROM logs WHERE note LIKE ?", (f"%{word}%",)
+                    ).fetchall(),
+                    repeat=1,
+                )
+            results.append(
+                {
+                    "query": name,
+                    "text": text,
+                    "rows": len(found),
+                    "fts_ms": fts_ms,
+                    "like_first_rows_ms": scan_ms,
+                    "like_full_scan_ms": like_all_ms,
+                }
+            )
+
+    print(
+        json.dumps(
+            {
+                "notes": args.notes,
+                "ingest_seconds": round(ingest_seconds, 2),
+                "ingest_rows_per_second": round(args.notes / ingest_seconds, 1),
+                "queries": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Per-rerun table payload and fetch time: whole frame vs one server-side page.
+
+Payload is the Arrow IPC size of what st.dataframe would serialize.
+
+    python -m benchmarks.paged_tables --clients 100000 1000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from benchmarks.memory_keys import make_people
+from modules.paging import PagedTable
+
+
+def arrow_bytes(df):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def ms(func):
+    start = time.perf_counter()
+    result = func()
+    return round((time.perf_counter() - start) * 1000, 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    for n in args.clients:
+        people = make_people(n)
+        for col in ["Status", "LLM_Industry", "Company"]:
+            people[col] = people[col].astype("category")
+        # A status filter keeping about 40% of the rows
+        positions = np.flatnonzero(people["Status"].isin(["won", "lost", "open"]))
+
+        full_ms, full_bytes = ms(lambda: arrow_bytes(people.iloc[positions]))
+
+        table = PagedTable(people)
+
+        def fetch():
+            return table.page(
+                positions, sort="Name", page=10, page_size=args.page_size
+            )[0]
+
+        first_ms, _ = ms(fetch)
+        repeat_ms, page = ms(fetch)
+        unsorted_ms, _ = ms(
+            lambda: table.page(positions, page=10, page_size=args.page_size)[0]
+        )
+
+        results.append(
+            {
+                "clients": n,
+                "filtered_rows": len(positions),
+                "whole_frame_ms": full_ms,
+                "whole_frame_bytes": full_bytes,
+                "page_sorted_first_ms": first_ms,
+                "page_sorted_repeat_ms": repeat_ms,
+                "page_unsorted_ms": unsorted_ms,
+                "page_bytes": arrow_bytes(page),
+            }
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Memory against concurrent sessions: one shared people snapshot vs a copy per session.
+
+Each mode runs in a fresh interpreter inside a synthetic dataset
+(benchmarks/synthetic.py). Sessions are threads that load the people frame
+and apply a Clients-tab filter, then hold on to both like a live session.
+
+    python -m benchmarks.shared_store --people 200000 --sessions 1 5 10 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import generate
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def sessions(mode, count):
+    """Runs inside the dataset directory, prints one JSON line."""
+    from modules.db import update_status
+    from modules.filters import filter_index
+    from modules.load_data import PEOPLE_PATH, PeopleStore, people_snapshot
+
+    # Warm the Arrow snapshot file so both modes read the same source
+    PeopleStore(PEOPLE_PATH).get()
+    baseline = rss_mb()
+
+    held = []
+
+    def session():
+        if mode == "shared":
+            people = people_snapshot().people
+        else:
+            people = PeopleStore(PEOPLE_PATH).get().people
+        filtered, _ = filter_index(people).select(people, "Technology", ["open"])
+        held.append((people, filtered))
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = {
+        "mode": mode,
+        "sessions": count,
+        "load_seconds": round(time.perf_counter() - start, 2),
+        "rss_mb": round(rss_mb() - baseline, 1),
+    }
+
+    if mode == "shared":
+        # One session's write, picked up by the next snapshot read
+        people = held[0][0]
+        before = rss_mb()
+        update_status(people["Client ID"].iloc[0], "won")
+        start = time.perf_counter()
+        snapshot = people_snapshot()
+        result["publish_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["publish_rss_mb"] = round(rss_mb() - before, 1)
+        start = time.perf_counter()
+        people.copy()
+        result["deep_copy_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["version"] = snapshot.version
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=200_000)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument(
+        "--data-dir", default=os.path.join(tempfile.gettempdir(), "crm-bench")
+    )
+    parser.add_argument("--run", nargs=2, metavar=("MODE", "SESSIONS"))
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(sessions(args.run[0], int(args.run[1]))))
+        return
+
+    path = os.path.join(args.data_dir, f"crm-{args.people}")
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        generate(path, args.people)
+
+    results = []
+    for mode in ["per_session", "shared"]:
+        for count in args.sessions:
+            with tempfile.TemporaryDirectory() as scratch:
+                shutil.copytree(path, scratch, dirs_exist_ok=True)
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.shared_store"]
+                    + ["--run", mode, str(count)],
+                    cwd=scratch,
+                    env={**os.environ, "PYTHONPATH": REPO},
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(json.dumps({"people": args.people, "runs": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Radius, nearest, box and territory queries: brute-force haversine vs the spatial index.
+
+    python -m benchmarks.spatial --points 1000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.spatial import SpatialIndex, haversine_miles
+
+# Query anchors, (lat, lon)
+ANCHORS = [(38.44, -122.71), (40.71, -74.0), (41.88, -87.63), (29.76, -95.37)]
+TERRITORY = [(36.0, -124.0), (42.0, -124.0), (42.0, -118.0), (36.0, -118.0)]
+
+
+def make_points(n, seed=0):
+    # Half spread across the continental US, half around a few metro areas
+    rng = np.random.default_rng(seed)
+    metro = np.array(ANCHORS)[rng.integers(0, len(ANCHORS), n // 2)]
+    return pd.DataFrame(
+        {
+            "Latitude": np.concatenate(
+                [
+                    rng.uniform(25, 49, n - n // 2),
+                    metro[:, 0] + rng.normal(0, 0.5, n // 2),
+                ]
+            ),
+            "Longitude": np.concatenate(
+                [
+                    rng.uniform(-125, -67, n - n // 2),
+                    metro[:, 1] + rng.normal(0, 0.5, n // 2),
+                ]
+            ),
+        }
+    )
+
+
+def avg_ms(func, items):
+    start = time.perf_counter()
+    for item in items:
+        result = func(*item)
+    return round((time.perf_counter() - start) * 1000 / len(items), 3), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--miles", type=float, default=25.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    points = make_points(args.points)
+    lat = points["Latitude"].to_numpy()
+    lon = points["Longitude"].to_numpy()
+
+    start = time.perf_counter()
+    index = SpatialIndex(points)
+    build_seconds = time.perf_counter() - start
+
+    def brute_radius(a, b):
+        return np.flatnonzero(haversine_miles(lat, lon, a, b) <= args.miles)
+
+    def brute_nearest(a, b):
+        return np.argsort(haversine_miles(lat, lon, a, b))[: args.k]
+
+    def brute_box(a, b):
+        return np.flatnonzero(
+            (lat >= a - 1) & (lat <= a + 1) & (lon >= b - 1) & (lon <= b + 1)
+        )
+
+    queries = {}
+    for name, brute, indexed in [
+        ("radius", brute_radius, lambda a, b: index.within(a, b, args.miles)[0]),
+        ("nearest", brute_nearest, lambda a, b: index.nearest(a, b, args.k)[0]),
+        ("box", brute_box, lambda a, b: index.in_box(a - 1, a + 1, b - 1, b + 1)),
+    ]:
+        brute_ms, expected = avg_ms(brute, ANCHORS)
+        index_ms, found = avg_ms(indexed, ANCHORS)
+        queries[name] = {
+            "brute_force_ms": brute_ms,
+            "index_ms": index_ms,
+            "rows": len(found),
+            "same_rows": set(found) == set(expected),
+        }
+
+    start = time.perf_counter()
+    assigned = index.assign_territories({"NorCal": TERRITORY})
+    territory_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    print(
+        json.dumps(
+            {
+                "points": args.points,
+                "build_seconds": round(build_seconds, 3),
+                "queries": queries,
+                "territory_assign_ms": territory_ms,
+                "territory_rows": int((assigned == "NorCal").sum()),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
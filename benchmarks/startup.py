@@ -0,0 +1,68 @@
+"""Startup-time benchmark for the dashboard.
+
+Each measurement runs in a fresh interpreter so nothing is cached between
+them. Run from the repository root:
+
+    python -m benchmarks.startup --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import json
+import time
+t0 = time.perf_counter()
+import modules.load_data
+t1 = time.perf_counter()
+modules.load_data.load_people()
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_load": t2 - t1}))
+"""
+
+RENDER_SNIPPET = """
+import json
+import time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120)
+t1 = time.perf_counter()
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+assert not at.exception, at.exception
+print(json.dumps({"streamlit_import": t1 - t0, "first_render": t2 - t1, "rerun": t3 - t2}))
+"""
+
+
+def _run(snippet):
+    out = subprocess.run(
+        [sys.executable, "-c", snippet], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-render", action="store_true", help="skip app.py")
+    args = parser.parse_args()
+
+    samples = [_run(IMPORT_SNIPPET) for _ in range(args.repeat)]
+    if not args.no_render:
+        renders = [_run(RENDER_SNIPPET) for _ in range(args.repeat)]
+        samples = [{**a, **b} for a, b in zip(samples, renders)]
+
+    results = {
+        key: round(statistics.median(s[key] for s in samples) * 1000, 2)
+        for key in samples[0]
+    }
+    print(json.dumps({"median_ms": results, "repeat": args.repeat}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Offline geocoder backend for modules.geocoding.
+
+Resolves any address to a deterministic point inside the continental US after
+an optional delay. Addresses containing "nowhere" are not found, and
+``failure_rate`` makes a share of calls raise a retryable error.
+"""
+
+import random
+import threading
+import time
+import zlib
+
+
+class StubGeocoderError(Exception):
+    pass
+
+
+class StubGeocoder:
+    name = "stub"
+    retry_on = (StubGeocoderError,)
+
+    def __init__(self, latency=0.0, rate=1000.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.rate = rate
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def geocode(self, address):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise StubGeocoderError("temporarily unavailable")
+        if "nowhere" in address:
+            return None
+        h = zlib.crc32(address.encode())
+        return 25 + (h % 2400) / 100, -124 + (h // 2400 % 5700) / 100
@@ -0,0 +1,103 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Answers every ``POST /v1/chat/completions`` with an industry picked from the
+prompt text, after an optional delay, and can fail a share of requests with
+HTTP 429 to exercise retries. Use it as a context manager and point the
+OpenAI client at ``stub.base_url``:
+
+    with StubOpenAI(latency=0.05) as stub:
+        client = make_client(base_url=stub.base_url)
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INDUSTRIES = [
+    "Technology",
+    "Healthcare",
+    "Education",
+    "Transportation",
+    "Finance",
+    "Construction",
+    "Retail",
+    "Hospitality",
+    "Energy",
+    "Manufacturing",
+]
+
+
+class StubOpenAI:
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests += 1
+                    fail = stub._random.random() < stub.failure_rate
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if fail:
+                    self._reply(429, {"error": {"message": "rate limited"}})
+                    return
+
+                prompt = body["messages"][-1]["content"]
+                industry = INDUSTRIES[zlib.crc32(prompt.encode()) % len(INDUSTRIES)]
+                self._reply(
+                    200,
+                    {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "finish_reason": "stop",
+                                "message": {"role": "assistant", "content": industry},
+                            }
+                        ],
+                    },
+                )
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,184 @@
+"""CRM hot paths timed on synthetic datasets, written as JSON to compare commits.
+
+Datasets come from benchmarks/synthetic.py and are kept in --data-dir, so
+later runs at the same size reuse them. Each size is measured in a fresh
+interpreter running inside its dataset directory.
+
+    python -m benchmarks.suite --people 10000 100000 1000000 --output after.json
+    python -m benchmarks.suite --compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import END, INDUSTRIES, generate
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYWORDS = ["smith", "Garcia-Lee", "River Rd", "Denver", "Holdings"]
+
+
+def ms(func):
+    start = time.perf_counter()
+    result = func()
+    return round((time.perf_counter() - start) * 1000, 2), result
+
+
+def per_second(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return round(len(items) / (time.perf_counter() - start), 1)
+
+
+def measure(writes):
+    """Time every hot path against the dataset in the working directory."""
+    # Imported here: the modules resolve crm.db and data/ against the cwd
+    from modules.company_search import company_search
+    from modules.db import log_call, update_status
+    from modules.filters import filter_index
+    from modules.load_data import load_companies, load_people
+    from modules.recency import recency_index
+    from modules.rollups import weekly_contacts
+
+    results = {}
+    results["load_people_cold_ms"], (people, _) = ms(load_people)
+    results["load_people_warm_ms"], _ = ms(load_people)
+    results["load_companies_cold_ms"], companies = ms(load_companies)
+    results["load_companies_warm_ms"], _ = ms(load_companies)
+
+    results["filter_index_build_ms"], index = ms(lambda: filter_index(people))
+    statuses = list(index.values("Status"))[:3]
+    results["filter_new_ms"], (_, summary) = ms(
+        lambda: index.select(people, INDUSTRIES[0], statuses)
+    )
+    results["filter_repeat_ms"], _ = ms(
+        lambda: index.select(people, INDUSTRIES[0], statuses)
+    )
+
+    results["recency_index_build_ms"], recency = ms(lambda: recency_index(people))
+    results["recent_contacts_ms"], _ = ms(
+        lambda: recency.counts(summary["rows"], windows=(7, 30), now=END)
+    )
+    results["weekly_trend_ms"], _ = ms(
+        lambda: weekly_contacts(statuses=statuses, industry=INDUSTRIES[0])
+    )
+
+    rng = np.random.default_rng(0)
+    clients = people["Client ID"].to_numpy()[rng.integers(0, len(people), writes)]
+    results["log_call_per_s"] = per_second(
+        lambda c: log_call(c, "benchmark note"), clients
+    )
+    results["update_status_per_s"] = per_second(
+        lambda c: update_status(c, "engaged"), clients
+    )
+    results["load_people_after_writes_ms"], _ = ms(load_people)
+
+    results["company_search_build_ms"], search = ms(lambda: company_search(companies))
+    results["company_search_ms"] = round(
+        sum(ms(lambda: search.search(k))[0] for k in KEYWORDS) / len(KEYWORDS), 2
+    )
+    results["company_search_cached_ms"] = round(
+        sum(ms(lambda: search.search(k))[0] for k in KEYWORDS) / len(KEYWORDS), 3
+    )
+    return results
+
+
+def run(data_dir, people, writes):
+    path = os.path.join(data_dir, f"crm-{people}")
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        generate(path, people)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    # The writes below change the dataset, measure a scratch copy of it
+    with tempfile.TemporaryDirectory() as scratch:
+        shutil.copytree(path, scratch, dirs_exist_ok=True)
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--measure", str(writes)],
+            cwd=scratch,
+            env={**os.environ, "PYTHONPATH": REPO},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    results = json.loads(out.stdout.strip().splitlines()[-1])
+    return {"dataset": manifest, "results": results}
+
+
+def _git_commit():
+    out = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=REPO,
+        capture_output=True,
+        text=True,
+    )
+    return out.stdout.strip() or None
+
+
+def compare(before_path, after_path):
+    # after / before per metric; for *_per_s higher is better, else lower
+    with open(before_path) as f:
+        before = {r["dataset"]["people"]: r["results"] for r in json.load(f)["runs"]}
+    with open(after_path) as f:
+        after = {r["dataset"]["people"]: r["results"] for r in json.load(f)["runs"]}
+    return {
+        people: {
+            metric: {
+                "before": before[people][metric],
+                "after": value,
+                "ratio": (
+                    round(value / before[people][metric], 2)
+                    if before[people][metric]
+                    else None
+                ),
+            }
+            for metric, value in after[people].items()
+            if metric in before[people]
+        }
+        for people in sorted(set(before) & set(after))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument(
+        "--data-dir", default=os.path.join(tempfile.gettempdir(), "crm-bench")
+    )
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--measure", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        print(json.dumps(measure(args.measure)))
+        return
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        return
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "runs": [run(args.data_dir, n, args.writes) for n in args.people],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Deterministic synthetic CRM dataset: people and companies sheets plus a filled crm.db.
+
+The output directory mirrors the repository layout (data/*.csv, crm.db), so
+the app and the benchmark suite can run from inside it. The same seed and
+sizes always produce the same files.
+
+    python -m benchmarks.synthetic /tmp/crm-100k --people 100000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.call_logs import insert_logs
+from modules.db import init_db, transaction
+
+# Dates are generated backwards from a fixed day, not from today
+END = pd.Timestamp("2025-06-01")
+CHUNK = 500_000
+
+FIRST = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+    "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph",
+    "Jessica", "Thomas", "Sarah", "Carlos", "Karen", "Daniel", "Lisa", "Ana", "Wei",
+]  # fmt: skip
+LAST = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+    "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Chen", "Nguyen",
+]  # fmt: skip
+TITLES = [
+    "Account Manager", "Engineer", "Nurse", "Teacher", "Analyst", "Director",
+    "Consultant", "Accountant", "Sales Lead", "Operations Manager", "Counsellor",
+]  # fmt: skip
+INDUSTRIES = [
+    "Technology", "Healthcare", "Education", "Finance", "Retail", "Energy",
+    "Manufacturing", "Construction", "Hospitality", "Transportation",
+]  # fmt: skip
+STATUSES = ["open", "contacted", "engaged", "negotiation", "won", "lost", "on hold"]
+SUFFIXES = ["LLC", "Ltd", "Inc", "Group", "PLC", "and Sons"]
+STREETS = ["Main St.", "Maple Ave.", "Oak Rd.", "River Rd.", "3rd St.", "Park Blvd."]
+# (city, state, zip, lat, lon), points are scattered around these
+CITIES = [
+    ("Santa Rosa", "California", "95404", 38.44, -122.71),
+    ("Los Angeles", "California", "90012", 34.05, -118.24),
+    ("New York", "New York", "10007", 40.71, -74.0),
+    ("Chicago", "Illinois", "60602", 41.88, -87.63),
+    ("Houston", "Texas", "77002", 29.76, -95.37),
+    ("Denver", "Colorado", "80202", 39.74, -104.99),
+]
+NOTES = [
+    "Left a voicemail", "Discussed pricing for next quarter", "Sent the renewal quote",
+    "Intro call, interested in a pilot", "Follow up on the security questionnaire",
+    "Budget approval pending", "Asked for a product demo", "Contract sent to legal",
+    "No answer, will retry next week", "Champion moved teams, find a new contact",
+]  # fmt: skip
+
+
+def sizes(people, companies=None, logs=None, statuses=None, overrides=None):
+    """Row counts for a dataset of ``people``; the rest scale with it by default."""
+    return {
+        "people": people,
+        "companies": max(100, people // 5) if companies is None else companies,
+        "logs": people if logs is None else logs,
+        "statuses": people // 10 if statuses is None else statuses,
+        "overrides": people // 50 if overrides is None else overrides,
+    }
+
+
+def _rng(seed, table, chunk=0):
+    # One independent stream per table and chunk, so sizes and chunking of
+    # one table never shift the values of another
+    return np.random.default_rng([seed, sum(map(ord, table)), chunk])
+
+
+def skewed(rng, n, size, power):
+    # Indexes below ``size`` crowding towards 0; with power 3, half of the
+    # draws fall in the first eighth
+    return (size * rng.random(n) ** power).astype(np.int64)
+
+
+def company_names(n):
+    i = np.arange(n)
+    return (
+        pd.Series(np.array(LAST)[i % len(LAST)])
+        + "-"
+        + pd.Series(np.array(LAST)[(i // len(LAST)) % len(LAST)])
+        + " "
+        + pd.Series(i.astype(str))
+        + " "
+        + pd.Series(np.array(SUFFIXES)[i % len(SUFFIXES)])
+    )
+
+
+def make_companies(n, seed=0):
+    rng = _rng(seed, "companies")
+    city = rng.integers(0, len(CITIES), n)
+    cities = pd.DataFrame(CITIES, columns=["city", "state", "zip", "lat", "lon"]).iloc[
+        city
+    ]
+    address = (
+        pd.Series(rng.integers(1, 20000, n).astype(str))
+        + " "
+        + np.array(STREETS)[rng.integers(0, len(STREETS), n)]
+        + ", "
+        + cities["city"].to_numpy()
+        + ", "
+        + cities["state"].to_numpy()
+        + ", "
+        + cities["zip"].to_numpy()
+    )
+    names = company_names(n)
+    return pd.DataFrame(
+        {
+            "Company Name": names,
+            "Website": names.str.split(" ").str[0].str.lower() + ".com",
+            "Address": address,
+            "Revenue (in Millions)": rng.uniform(1, 500, n).round(2),
+            "Industry": np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), n)],
+            "Latitude": cities["lat"].to_numpy() + rng.normal(0, 0.3, n),
+            "Longitude": cities["lon"].to_numpy() + rng.normal(0, 0.3, n),
+        }
+    )
+
+
+def make_people(start, n, companies, seed=0, chunk=0):
+    """People rows ``start`` .. ``start + n``; names are unique by row number."""
+    rng = _rng(seed, "people", chunk)
+    i = np.arange(start, start + n)
+    first = np.array(FIRST)[rng.integers(0, len(FIRST), n)]
+    last = np.array(LAST)[rng.integers(0, len(LAST), n)]
+    name = pd.Series(first) + " " + pd.Series(last) + " " + pd.Series(i.astype(str))
+    return pd.DataFrame(
+        {
+            "Name": name,
+            "Email": name.str.replace(" ", "") + "@testemail.com",
+            "Phone Number": rng.integers(2_000_000_000, 9_999_999_999, n).astype(str),
+            # A few large accounts, many small ones
+            "Company": companies.to_numpy()[skewed(rng, n, len(companies), 2)],
+            "Title": np.array(TITLES)[rng.integers(0, len(TITLES), n)],
+            "LLM_Industry": np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), n)],
+        }
+    )
+
+
+def client_ids(people):
+    return people["Name"].str.strip() + " @ " + people["Company"].str.strip()
+
+
+def generate(out_dir, people, seed=0, **counts):
+    """Write the dataset to ``out_dir`` and return its manifest."""
+    counts = sizes(people, **counts)
+    os.makedirs(os.path.join(out_dir, "data"), exist_ok=True)
+    db_path = os.path.join(out_dir, "crm.db")
+    people_path = os.path.join(out_dir, "data", "people_industry.csv")
+    for path in (db_path, people_path):
+        if os.path.exists(path):
+            raise FileExistsError(f"{path} exists, generate into an empty directory")
+    start = time.perf_counter()
+
+    companies = make_companies(counts["companies"], seed)
+    companies.to_csv(
+        os.path.join(out_dir, "data", "companies_geocoded.csv"), index=False
+    )
+
+    ids = []
+    for chunk, offset in enumerate(range(0, counts["people"], CHUNK)):
+        rows = make_people(
+            offset,
+            min(CHUNK, counts["people"] - offset),
+            companies["Company Name"],
+            seed,
+            chunk,
+        )
+        rows.to_csv(people_path, mode="a", header=not offset, index=False)
+        ids.append(client_ids(rows).to_numpy())
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=object)
+
+    init_db(db_path)
+    rng = _rng(seed, "client_status")
+    picked = rng.choice(len(ids), min(counts["statuses"], len(ids)), replace=False)
+    with transaction(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO client_status (client_id, status) VALUES (?, ?)",
+            zip(ids[picked], np.array(STATUSES)[rng.integers(0, 7, len(picked))]),
+        )
+    rng = _rng(seed, "industry_overrides")
+    picked = rng.choice(len(ids), min(counts["overrides"], len(ids)), replace=False)
+    with transaction(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO industry_overrides (client_id, overridden_industry) "
+            "VALUES (?, ?)",
+            zip(ids[picked], np.array(INDUSTRIES)[rng.integers(0, 10, len(picked))]),
+        )
+
+    # A year of notes ending on END, a minority of clients gets most of them
+    end = int(END.timestamp())
+    active = ids[_rng(seed, "activity").permutation(len(ids))]
+    for chunk, offset in enumerate(range(0, counts["logs"] if len(ids) else 0, CHUNK)):
+        n = min(CHUNK, counts["logs"] - offset)
+        rng = _rng(seed, "logs", chunk)
+        rows = pd.DataFrame(
+            {
+                "client_id": active[skewed(rng, n, len(ids), 3)],
+                "note": np.array(NOTES)[rng.integers(0, len(NOTES), n)],
+                "timestamp": end - rng.integers(0, 365 * 86400, n),
+            }
+        )
+        with transaction(db_path) as conn:
+            insert_logs(conn, rows)
+
+    manifest = {
+        "seed": seed,
+        "end": str(END.date()),
+        **counts,
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--people", type=int, default=10_000)
+    parser.add_argument("--companies", type=int)
+    parser.add_argument("--logs", type=int)
+    parser.add_argument("--statuses", type=int)
+    parser.add_argument("--overrides", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = generate(
+        args.out_dir,
+        args.people,
+        seed=args.seed,
+        companies=args.companies,
+        logs=args.logs,
+        statuses=args.statuses,
+        overrides=args.overrides,
+    )
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Weekly contact trend: regrouping every log row vs reading the contact_weekly rollup.
+
+Also times the writes that keep the rollup current and the full backfill.
+
+    python -m benchmarks.weekly_rollup --notes 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.client_history import CLIENTS, add_logs
+from modules.db import (
+    WEEK,
+    client_keys,
+    connection,
+    init_db,
+    log_call,
+    rebuild_weekly_rollup,
+    transaction,
+    update_status,
+)
+from modules.rollups import sync_client_dims, weekly_contacts
+
+STATUSES = ["open", "won", "lost", "nurture", "disqualified"]
+INDUSTRIES = ["Technology", "Healthcare", "Education", "Finance", "Retail", "Energy"]
+
+
+def avg_ms(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return round((time.perf_counter() - start) * 1000 / len(items), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ids = [f"Client {i} @ Bench" for i in range(CLIENTS)]
+    statuses = ["open", "won", "lost"]
+    industry = "Finance"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        init_db(db_path)
+        with connection(db_path) as conn:
+            keys = client_keys(conn, ids)
+            sync_client_dims(
+                conn,
+                keys,
+                np.array(STATUSES)[rng.integers(0, len(STATUSES), CLIENTS)],
+                np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), CLIENTS)],
+            )
+
+        start = time.perf_counter()
+        add_logs(db_path, args.notes, rng)
+        load_seconds = time.perf_counter() - start
+
+        def regroup():
+            # What the chart needs without the rollup, done by SQLite itself
+            with connection(db_path) as conn:
+                return conn.execute(
+                    f"""
+                    SELECT {WEEK.format("l.timestamp")} AS week, d.status, COUNT(*)
+                    FROM logs l
+                    JOIN client_keys k ON k.legacy_id = l.client_id
+                    JOIN client_dims d ON d.client_key = k.client_key
+                    WHERE d.status IN ('open', 'won', 'lost') AND d.industry = ?
+                    GROUP BY 1, 2
+                    """,
+                    (industry,),
+                ).fetchall()
+
+        start = time.perf_counter()
+        expected = regroup()
+        regroup_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        start = time.perf_counter()
+        trend = weekly_contacts(statuses, industry, db_path=db_path)
+        rollup_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        clients = [ids[i] for i in rng.integers(0, CLIENTS, args.writes)]
+        log_ms = avg_ms(
+            lambda c: log_call(c, "quick check-in", db_path=db_path), clients
+        )
+        changes = zip(clients, np.array(STATUSES)[rng.integers(0, 5, args.writes)])
+        status_ms = avg_ms(
+            lambda change: update_status(*change, db_path=db_path), list(changes)
+        )
+
+        start = time.perf_counter()
+        with transaction(db_path) as conn:
+            rebuild_weekly_rollup(conn)
+        backfill_seconds = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "notes": args.notes,
+                "clients": CLIENTS,
+                "bulk_load_seconds": round(load_seconds, 1),
+                "regroup_logs_ms": regroup_ms,
+                "rollup_read_ms": rollup_ms,
+                "same_counts": sorted(expected)
+                == sorted(
+                    zip(
+                        trend["Week"].dt.strftime("%Y-%m-%d"),
+                        trend["Status"],
+                        trend["Contacts"],
+                    )
+                ),
+                "trend_rows": len(trend),
+                "log_call_ms": log_ms,
+                "update_status_ms": status_ms,
+                "backfill_seconds": round(backfill_seconds, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Click latency with N sessions saving at once: committing on the script thread vs the write-behind queue.
+
+Every session cycles through the three dashboard writes (status, industry
+override, note) on clients that already have contacts in the weekly rollup.
+"queued" also reports how long the last write took to become durable.
+
+    python -m benchmarks.write_behind --sessions 1 4 16 --writes 200
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.client_history import CLIENTS, add_logs
+from modules import db
+from modules.rollups import sync_client_dims
+from modules.write_behind import WriteBehind
+
+STATUSES = ["open", "contacted", "engaged", "won", "lost"]
+INDUSTRIES = ["Technology", "Healthcare", "Education", "Finance", "Retail"]
+
+
+def run(mode, sessions, writes, db_path):
+    writer = WriteBehind(db_path) if mode == "queued" else None
+    if writer is None:
+        calls = (db.update_status, db.save_industry_override, db.log_call)
+        kwargs = {"db_path": db_path}
+    else:
+        calls = (writer.update_status, writer.save_industry_override, writer.log_call)
+        kwargs = {}
+    latencies = [[] for _ in range(sessions)]
+
+    def session(n):
+        rng = np.random.default_rng(n)
+        for i in range(writes):
+            client_id = f"Client {rng.integers(0, CLIENTS)} @ Bench"
+            value = [STATUSES, INDUSTRIES, [f"note {n}-{i}"]][i % 3]
+            start = time.perf_counter()
+            calls[i % 3](client_id, value[i % len(value)], **kwargs)
+            latencies[n].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    submitted = time.perf_counter() - start
+    if writer is not None:
+        writer.close()
+    durable = time.perf_counter() - start
+
+    ms = np.concatenate(latencies) * 1000
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "writes": sessions * writes,
+        "click_p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "click_p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "all_clicks_seconds": round(submitted, 3),
+        "all_durable_seconds": round(durable, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--notes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    for mode in ["direct", "queued"]:
+        for sessions in args.sessions:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = os.path.join(tmp, "crm.db")
+                db.init_db(db_path)
+                with db.connection(db_path) as conn:
+                    keys = db.client_keys(
+                        conn, [f"Client {i} @ Bench" for i in range(CLIENTS)]
+                    )
+                    sync_client_dims(
+                        conn,
+                        keys,
+                        np.array(STATUSES)[rng.integers(0, 5, CLIENTS)],
+                        np.array(INDUSTRIES)[rng.integers(0, 5, CLIENTS)],
+                    )
+                add_logs(db_path, args.notes, rng)
+                results.append(run(mode, sessions, args.writes, db_path))
+                db.close_all()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+### Call log ingestion: single appends, legacy logs.csv import, bulk loads ###
+
+import argparse
+import hashlib
+import os
+import re
+
+import pandas as pd
+
+from modules.db import (
+    DB_PATH,
+    client_aliases,
+    connection,
+    from_epoch,
+    init_db,
+    log_call,
+    to_epoch,
+    transaction,
+)
+
+LOG_FILE = "logs.csv"
+CHUNK_SIZE = 100_000
+
+# Column names seen in exports, mapped to the logs table
+COLUMN_ALIASES = {
+    "client_id": "client_id",
+    "Client ID": "client_id",
+    "note": "note",
+    "Note": "note",
+    "Call Note": "note",
+    "timestamp": "timestamp",
+    "Date": "timestamp",
+    "Call Timestamp": "timestamp",
+}
+
+
+def append_log(client_id, note, when=None, db_path=DB_PATH):
+    """Add one note; a single indexed insert however many notes exist."""
+    timestamp = None if when is None else int(to_epoch([when]).iloc[0])
+    log_call(client_id, note, timestamp=timestamp, db_path=db_path)
+
+
+def _prepare_chunk(chunk):
+    chunk = chunk.rename(columns=COLUMN_ALIASES)
+    missing = {"client_id", "note", "timestamp"} - set(chunk.columns)
+    if missing:
+        raise ValueError(f"call log export is missing columns: {sorted(missing)}")
+
+    # Missing IDs stay missing; astype(str) would turn them into "nan"/"None"
+    client_id = chunk["client_id"]
+    client_id = client_id.where(client_id.isna(), client_id.astype(str).str.strip())
+    rows = pd.DataFrame(
+        {
+            "client_id": client_id.replace("", None),
+            "note": chunk["note"].astype(object).where(chunk["note"].notna(), None),
+            "timestamp": to_epoch(chunk["timestamp"]).to_numpy(),
+        }
+    )
+    # Rows without a usable client or date cannot be attributed
+    return rows.dropna(subset=["client_id", "timestamp"])
+
+
+def insert_logs(conn, rows):
+    """Insert a frame of client_id/note/timestamp rows in the open transaction."""
+    # Rows go through a temp table and one INSERT ... SELECT. The logs triggers
+    # then run inside a single statement; row-by-row inserts make logs_fts
+    # flush a tiny index segment per note, several times slower.
+    conn.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS logs_staging (
+            client_id TEXT, note TEXT, timestamp INTEGER
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO logs_staging (client_id, note, timestamp) VALUES (?, ?, ?)",
+        zip(rows["client_id"], rows["note"], rows["timestamp"].astype(int)),
+    )
+    conn.execute(
+        """
+        INSERT INTO logs (client_id, note, timestamp)
+        SELECT client_id, note, timestamp FROM logs_staging ORDER BY rowid
+        """
+    )
+    conn.execute("DELETE FROM logs_staging")
+
+
+def _read_chunks(path, chunksize):
+    if path.endswith((".jsonl", ".ndjson")):
+        return pd.read_json(path, lines=True, chunksize=chunksize, dtype=False)
+    return pd.read_csv(path, chunksize=chunksize)
+
+
+def _source_key(path, lines=2):
+    # A log file is known by a hash of its first lines (a CSV's header and
+    # first record), not by its path: a moved or re-cloned checkout keeps
+    # the key, and so does appending to the file
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for _ in range(lines):
+            digest.update(f.readline())
+    return digest.hexdigest()
+
+
+def _imported(db_path, source):
+    # (size, rows) recorded for the file at the last import, or None
+    with connection(db_path) as conn:
+        return conn.execute(
+            "SELECT size, rows FROM log_imports WHERE source = ?", (source,)
+        ).fetchone()
+
+
+def _record_import(conn, source, size, rows):
+    conn.execute(
+        """
+        INSERT INTO log_imports (source, size, rows) VALUES (?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET size=excluded.size, rows=excluded.rows
+        """,
+        (source, size, rows),
+    )
+
+
+def bulk_load(path, db_path=DB_PATH, chunksize=CHUNK_SIZE):
+    """Stream a CSV or JSONL export into the logs table, one transaction per chunk.
+
+    Memory use is bounded by ``chunksize``; returns the number of rows added.
+    Each chunk's transaction also records how many source rows are loaded, so
+    running this again on the same file (after a crash, or twice, wherever
+    it is stored) resumes after the last committed chunk. A file with the same
+    first rows but another size is loaded from the start.
+    """
+    size = os.path.getsize(path)
+    source = _source_key(path)
+
+    init_db(db_path)
+    seen = _imported(db_path, source)
+    done = seen[1] if seen and seen[0] == size else 0
+
+    total = 0
+    offset = 0
+    for chunk in _read_chunks(path, chunksize):
+        offset += len(chunk)
+        if offset <= done:
+            continue
+        rows = _prepare_chunk(chunk.iloc[max(done - (offset - len(chunk)), 0) :])
+        with transaction(db_path) as conn:
+            insert_logs(conn, rows)
+            _record_import(conn, source, size, offset)
+        total += len(rows)
+    return total
+
+
+def import_legacy_logs(path=LOG_FILE, db_path=DB_PATH):
+    """Move the old logs.csv notes into crm.db in one batched transaction.
+
+    The file's size and row count are recorded under a hash of its first
+    rows, so running this again (also from another checkout sharing crm.db)
+    only imports rows appended since. Returns the number of rows imported.
+    """
+    if not os.path.exists(path):
+        return 0
+    size = os.path.getsize(path)
+    source = _source_key(path)
+
+    init_db(db_path)
+    seen = _imported(db_path, source)
+    if seen and seen[0] == size:
+        return 0
+
+    # logs.csv was only ever appended to, so skip the rows imported last time
+    legacy = pd.read_csv(path)
+    rows = _prepare_chunk(legacy.iloc[seen[1] if seen else 0 :])
+    with transaction(db_path) as conn:
+        insert_logs(conn, rows)
+        _record_import(conn, source, size, len(legacy))
+    return len(rows)
+
+
+# --- Per-client history ---
+# One client's notes straight from idx_logs_client_time, newest first. Pages
+# are keyed on the last (timestamp, id) shown rather than an OFFSET, so every
+# page is a short index range scan however many notes exist, and a note
+# logged in between cannot shift rows from one page onto the next.
+HISTORY_PAGE = 20
+
+
+def client_history(client_id, before=None, limit=HISTORY_PAGE, db_path=DB_PATH):
+    """(page of notes, cursor for the next page or None) for one client.
+
+    Pass the returned cursor as ``before`` to get the following, older page.
+    Reads the database directly, so a note saved with ``log_call`` shows up
+    on the next call. Notes logged under IDs merged into this client (see
+    ``client_aliases``) are included.
+    """
+    where = "client_id = ?"
+    if before is not None:
+        where += " AND (timestamp, id) < (?, ?)"
+    page = f"""
+        SELECT * FROM (
+            SELECT id, timestamp, note FROM logs
+            WHERE {where}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        )
+    """
+
+    with connection(db_path) as conn:
+        ids = client_aliases(conn, client_id)
+        # One extra row tells whether an older page exists
+        params = []
+        for alias in ids:
+            params += [alias, *(before or ()), limit + 1]
+        # One index range scan per ID, merged; a single ID is just its scan
+        rows = conn.execute(
+            " UNION ALL ".join([page] * len(ids))
+            + " ORDER BY timestamp DESC, id DESC LIMIT ?",
+            params + [limit + 1],
+        ).fetchall()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    history = pd.DataFrame(rows, columns=["id", "Call Timestamp", "Call Note"])
+    cursor = (rows[-1][1], rows[-1][0]) if more else None
+    history["Call Timestamp"] = from_epoch(history["Call Timestamp"])
+    return history, cursor
+
+
+# --- Note search ---
+# logs_fts (see modules/db.py) indexes every note. Free text typed into the
+# dashboard is turned into an FTS5 query: "quoted words" stay a phrase, a
+# trailing * makes a prefix, and every other word is quoted so punctuation
+# can never produce an FTS5 syntax error. All terms must match.
+_QUERY_TERMS = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def notes_query(text):
+    terms = []
+    for phrase, word in _QUERY_TERMS.findall(text):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        elif word:
+            prefix = word.endswith("*")
+            word = word.rstrip("*").replace('"', "")
+            if word:
+                terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search_notes(
+    text,
+    since=None,
+    until=None,
+    client_id=None,
+    limit=100,
+    order="rank",
+    db_path=DB_PATH,
+):
+    """Call notes matching ``text``, best matches first (or newest with order="recent").
+
+    ``since``/``until`` bound the call date (``until`` is exclusive) and take
+    anything ``to_epoch`` understands. Only the matching rows are read.
+    ``client_id`` also matches the IDs merged into that client.
+    """
+    query = notes_query(text)
+    columns = ["Client ID", "Call Timestamp", "Call Note", "Snippet"]
+    if not query:
+        return pd.DataFrame(columns=columns)
+
+    where = ["logs_fts MATCH ?"]
+    params = [query]
+    if since is not None:
+        where.append("l.timestamp >= ?")
+        params.append(int(to_epoch([since]).iloc[0]))
+    if until is not None:
+        where.append("l.timestamp < ?")
+        params.append(int(to_epoch([until]).iloc[0]))
+    params.append(limit)
+
+    init_db(db_path)
+    with connection(db_path) as conn:
+        if client_id is not None:
+            ids = client_aliases(conn, client_id)
+            where.append(f"l.client_id IN ({','.join('?' * len(ids))})")
+            params[-1:-1] = ids
+        results = pd.read_sql_query(
+            f"""
+            SELECT l.client_id AS "Client ID",
+                   l.timestamp AS "Call Timestamp",
+                   l.note AS "Call Note",
+                   snippet(logs_fts, 0, '[', ']', '…', 12) AS "Snippet"
+            FROM logs_fts JOIN logs l ON l.id = logs_fts.rowid
+            WHERE {" AND ".join(where)}
+            ORDER BY {"l.timestamp DESC" if order == "recent" else "rank"}
+            LIMIT ?
+            """,
+            conn,
+            params=params,
+        )
+    results["Call Timestamp"] = from_epoch(results["Call Timestamp"])
+    return results
+
+
+if __name__ == "__main__":
+    # Run from the repository root:
+    #   python -m modules.call_logs                    (import logs.csv)
+    #   python -m modules.call_logs export.jsonl ...   (bulk load exports)
+    parser = argparse.ArgumentParser(description="Load call logs into crm.db")
+    parser.add_argument("paths", nargs="*", help="CSV/JSONL exports to bulk load")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.paths:
+        print(f"Imported {import_legacy_logs()} rows from {LOG_FILE}")
+    for path in args.paths:
+        print(f"Loaded {bulk_load(path, chunksize=args.chunksize)} rows from {path}")
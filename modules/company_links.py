@@ -0,0 +1,260 @@
+### People -> Companies sheet reconciliation: normalized key join, fuzzy fallback ###
+
+import argparse
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from modules.db import DB_PATH, init_db, transaction
+from modules.entity_resolution import normalize_company
+
+# Cosine similarity of character trigrams a fuzzy match needs ("BeanInc" vs
+# "Bean Inc" passes, two different surnames do not)
+FUZZY_SCORE = 0.75
+# ...and how far ahead of the runner-up it has to be: a name about as close
+# to two companies ("Smith 2012" vs "Smith 201" and "Smith 212") is left
+# unmatched rather than guessed
+FUZZY_MARGIN = 0.05
+# A name is only scored against companies sharing RARE_SHARED of its
+# RARE_TRIGRAMS rarest trigrams (all of them, for names with fewer); a typo
+# changes at most three, the rest still find the company
+RARE_TRIGRAMS = 8
+RARE_SHARED = 3
+# Names compared against all companies at a time, bounds the similarity
+# matrix held in memory
+FUZZY_CHUNK = 256
+# "BeanInc": a legal suffix run into the name, which the key keeps
+_GLUED_SUFFIX = r"^(.{3,}?)(?:llc|ltd|inc|plc|corp)$"
+
+_TRIGRAMS = HashingVectorizer(
+    analyzer="char_wb", ngram_range=(3, 3), n_features=2**20, alternate_sign=False
+)
+
+
+def company_key(values):
+    """Join key for company names: case, punctuation, "&"/"and", spacing and
+    a trailing LLC/Ltd/Inc do not matter."""
+    return normalize_company(values).str.replace(" ", "", regex=False)
+
+
+def _candidates(names, postings):
+    # (name rows, companies) pairs worth scoring; trigrams no company has
+    # do not count as rare
+    frequency = np.diff(postings.indptr)[names.indices]
+    rows = np.repeat(np.arange(names.shape[0]), np.diff(names.indptr))
+    keep = frequency > 0
+    rows, features, frequency = rows[keep], names.indices[keep], frequency[keep]
+    order = np.lexsort((frequency, rows))
+    rows, features = rows[order], features[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    rare = rank < RARE_TRIGRAMS
+    picked = csr_matrix(
+        (np.ones(rare.sum()), (rows[rare], features[rare])), shape=names.shape
+    )
+    shared = (picked @ postings).tocoo()
+    need = np.minimum(np.bincount(rows[rare], minlength=names.shape[0]), RARE_SHARED)
+    keep = shared.data >= need[shared.row]
+    return shared.row[keep], shared.col[keep]
+
+
+def _fuzzy(name_keys, company_keys):
+    companies = _TRIGRAMS.transform(company_keys)
+    # Trigram -> companies having it, as 0/1 so products count shared trigrams
+    postings = companies.T.tocsr()
+    postings.data = np.ones_like(postings.data)
+    best = np.full(len(name_keys), -1)
+    scores = np.zeros(len(name_keys))
+    for start in range(0, len(name_keys), FUZZY_CHUNK):
+        names = _TRIGRAMS.transform(name_keys[start : start + FUZZY_CHUNK])
+        rows, cols = _candidates(names, postings)
+        if not len(rows):
+            continue
+        # Cosine of the full trigram vectors (both are L2-normalized)
+        similarity = np.asarray(
+            names[rows].multiply(companies[cols]).sum(axis=1)
+        ).ravel()
+        # Each name's candidates by descending score; the first two are the
+        # best match and its runner-up
+        order = np.lexsort((-similarity, rows))
+        rows, cols, similarity = rows[order], cols[order], similarity[order]
+        first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        has_second = np.r_[first[1:], len(rows)] - first > 1
+        second = np.where(has_second, first + 1, first)
+        runner_up = np.where(has_second, similarity[second], 0.0)
+        hit = (similarity[first] >= FUZZY_SCORE) & (
+            similarity[first] - runner_up >= FUZZY_MARGIN
+        )
+        at = start + rows[first]
+        best[at] = np.where(hit, cols[first], -1)
+        scores[at] = similarity[first]
+    return best, scores
+
+
+def match_companies(names, companies, db_path=DB_PATH):
+    """Companies row position per name (-1 without a match), and how it matched.
+
+    ``names`` should be distinct. Exact matches on ``company_key`` come from a
+    hash join; the rest are matched by trigram similarity, and those results
+    are stored in crm.db (company_fuzzy_matches) for the next load, for as
+    long as the company keys stay the same.
+    """
+    names = pd.Series(names, dtype=object).reset_index(drop=True)
+    keys = company_key(names)
+    company_keys = company_key(companies["Company Name"])
+    # A key listed twice in the Companies sheet resolves to its first row
+    first = (company_keys.notna() & ~company_keys.duplicated()).to_numpy()
+    rows = np.flatnonzero(first)
+    key_index = pd.Index(company_keys[first])
+
+    found = key_index.get_indexer(keys)
+    position = np.where(found >= 0, rows[found], -1)
+    method = np.where(found >= 0, "exact", None).astype(object)
+
+    missing = np.flatnonzero((found < 0) & keys.notna().to_numpy())
+    if len(missing) and len(key_index):
+        fingerprint = (
+            f"{int(pd.util.hash_pandas_object(key_index, index=False).sum()):016x}"
+        )
+        wanted = keys.iloc[missing].unique()
+        init_db(db_path)
+        with transaction(db_path) as conn:
+            state = conn.execute("SELECT fingerprint FROM company_fuzzy_state")
+            state = state.fetchone()
+            if state is None or state[0] != fingerprint:
+                conn.execute("DELETE FROM company_fuzzy_matches")
+                conn.execute(
+                    "REPLACE INTO company_fuzzy_state (id, fingerprint) VALUES (1, ?)",
+                    (fingerprint,),
+                )
+            stored = dict(
+                conn.execute(
+                    "SELECT name_key, company_key FROM company_fuzzy_matches"
+                ).fetchall()
+            )
+            new = pd.Series([k for k in wanted if k not in stored], dtype=object)
+            if len(new):
+                best = key_index.get_indexer(
+                    new.str.replace(_GLUED_SUFFIX, r"\1", regex=True)
+                )
+                scores = np.where(best >= 0, 1.0, 0.0)
+                rest = np.flatnonzero(best < 0)
+                best[rest], scores[rest] = _fuzzy(
+                    new.iloc[rest].tolist(), list(key_index)
+                )
+                matched = [key_index[i] if i >= 0 else None for i in best]
+                conn.executemany(
+                    "INSERT INTO company_fuzzy_matches (name_key, company_key, score) "
+                    "VALUES (?, ?, ?)",
+                    zip(new, matched, scores.tolist()),
+                )
+                stored.update(zip(new, matched))
+
+        fuzzy = key_index.get_indexer(keys.iloc[missing].map(stored))
+        position[missing] = np.where(fuzzy >= 0, rows[fuzzy], -1)
+        method[missing[fuzzy >= 0]] = "fuzzy"
+    return position, method
+
+
+class CompanyLinks:
+    """Every people row's Companies sheet row, looked up by position.
+
+    ``company_id`` is the companies frame position of each people row's
+    company, -1 where the Company cell matched none. Matching runs once per
+    distinct company name.
+    """
+
+    def __init__(self, people, companies, db_path=DB_PATH):
+        self._companies = weakref.ref(companies)
+        # Works on the category codes when Company is categorical
+        codes, names = pd.factorize(people["Company"])
+        names = np.asarray(names, dtype=object)
+        position, method = match_companies(names, companies, db_path)
+        self.names = pd.DataFrame(
+            {"Company": names, "company_id": position, "match": method}
+        )
+        self.company_id = np.where(codes >= 0, position[codes], -1)
+        self.headcount = np.bincount(
+            self.company_id[self.company_id >= 0], minlength=len(companies)
+        )
+
+    def lookup(self, rows, columns):
+        """``columns`` of the companies frame for the people rows at positions
+        ``rows``, indexed by those positions; NaN where there is no match."""
+        rows = np.asarray(rows)
+        ids = self.company_id[rows]
+        # Only the requested rows are taken; unmatched ones are masked after
+        companies = self._companies()
+        found = companies.iloc[
+            np.maximum(ids, 0), companies.columns.get_indexer(columns)
+        ]
+        found = found.set_axis(pd.Index(rows), axis=0)
+        return found.where(pd.Series(ids >= 0, index=found.index), axis=0)
+
+    def unmatched(self):
+        """People-side company names that matched no company."""
+        return self.names.loc[self.names["company_id"] < 0, "Company"]
+
+    def unreferenced(self):
+        """Companies rows no people row points at."""
+        companies = self._companies()
+        return companies[self.headcount == 0]
+
+
+# One set of links per (people, companies) pair of live frames
+_links = {}
+_links_lock = threading.Lock()
+
+
+def company_links(people, companies, db_path=DB_PATH):
+    """The ``CompanyLinks`` of these two frames, built once while both live."""
+    key = (id(people), id(companies))
+    with _links_lock:
+        entry = _links.get(key)
+        if entry is not None and entry[0]() is people and entry[1]() is companies:
+            return entry[2]
+
+    links = CompanyLinks(people, companies, db_path)
+    with _links_lock:
+        drop = lambda _: _links.pop(key, None)
+        _links[key] = (
+            weakref.ref(people, drop),
+            weakref.ref(companies, drop),
+            links,
+        )
+    return links
+
+
+if __name__ == "__main__":
+    # Run from the repository root:
+    #   python -m modules.company_links           (report what matched)
+    #   python -m modules.company_links --rematch (redo the fuzzy matches)
+    from modules.load_data import load_companies, people_snapshot
+
+    parser = argparse.ArgumentParser(
+        description="Match People company names to the Companies sheet"
+    )
+    parser.add_argument(
+        "--rematch", action="store_true", help="forget the stored fuzzy matches"
+    )
+    args = parser.parse_args()
+
+    init_db()
+    if args.rematch:
+        with transaction() as conn:
+            conn.execute("DELETE FROM company_fuzzy_matches")
+    companies = load_companies()
+    links = CompanyLinks(people_snapshot().people, companies)
+    names = links.names
+    print(names["match"].value_counts(dropna=False).to_string())
+    fuzzy = names[names["match"] == "fuzzy"]
+    for name, company_id in zip(fuzzy["Company"], fuzzy["company_id"]):
+        print(f"  fuzzy: {name!r} -> {companies['Company Name'][company_id]!r}")
+    print(f"Company names with no match: {sorted(links.unmatched())}")
+    print(
+        "Companies no person works at: "
+        f"{sorted(links.unreferenced()['Company Name'])}"
+    )
@@ -0,0 +1,250 @@
+### Keyword search over company names and addresses (SQLite FTS5 trigram index) ###
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from modules.db import DB_PATH, connection, init_db, transaction
+
+SEARCH_COLUMNS = ["Company Name", "Address"]
+CACHE_SIZE = 256
+
+
+# Frames indexed at once. Each has a slot of rowids (slot << SLOT_BITS
+# onwards); syncing a frame that fits no slot replaces the least recently
+# used one. The tables are created by init_db (see db.MIGRATIONS).
+MAX_SLOTS = 4
+SLOT_BITS = 32
+
+
+def _row_hashes(companies):
+    return pd.util.hash_pandas_object(
+        companies[SEARCH_COLUMNS].fillna(""), index=False
+    ).to_numpy()
+
+
+def _fingerprints(hashes):
+    # Fingerprint of every prefix of the rows; order-sensitive, so a reordered
+    # file is not mistaken for an extended one
+    weights = np.arange(1, len(hashes) + 1, dtype=np.uint64)
+    return np.cumsum(hashes * weights)
+
+
+def _fingerprint(prefixes, rows):
+    return f"{int(prefixes[rows - 1]) if rows else 0:016x}"
+
+
+def _insert(conn, companies, slot, start):
+    rows = companies.iloc[start:]
+    base = (slot << SLOT_BITS) + start
+    conn.executemany(
+        "INSERT INTO company_search (rowid, name, address) VALUES (?, ?, ?)",
+        zip(
+            range(base, base + len(rows)),
+            rows["Company Name"].fillna("").astype(str),
+            rows["Address"].fillna("").astype(str),
+        ),
+    )
+
+
+def _clear(conn, slot):
+    conn.execute(
+        "DELETE FROM company_search WHERE rowid >= ? AND rowid < ?",
+        (slot << SLOT_BITS, (slot + 1) << SLOT_BITS),
+    )
+
+
+def sync_index(companies, db_path=DB_PATH):
+    """Index ``companies`` for search_companies; rowid is the row position.
+
+    Returns ``(slot, written)``: the slot to search the frame in and how many
+    rows were indexed now. A frame already indexed writes nothing, and rows
+    appended to an indexed frame are indexed on their own. Any other frame
+    takes a free slot, or the least recently used one.
+    """
+    slot, written, _ = _sync_index(companies, db_path)
+    return slot, written
+
+
+def _sync_index(companies, db_path):
+    # sync_index, plus the fingerprint the slot is recorded with
+    hashes = _row_hashes(companies)
+    prefixes = _fingerprints(hashes)
+    init_db(db_path)
+    with transaction(db_path) as conn:
+        slots = conn.execute(
+            "SELECT slot, rows, fingerprint FROM company_search_state "
+            "ORDER BY rows DESC"
+        ).fetchall()
+        # The slot holding this frame, or the longest prefix of it
+        found = next(
+            (
+                (slot, rows)
+                for slot, rows, fingerprint in slots
+                if rows <= len(hashes) and fingerprint == _fingerprint(prefixes, rows)
+            ),
+            None,
+        )
+        if found is not None:
+            slot, start = found
+        else:
+            used = {row[0] for row in slots}
+            free = [n for n in range(MAX_SLOTS) if n not in used]
+            if free:
+                slot = free[0]
+            else:
+                slot = conn.execute(
+                    "SELECT slot FROM company_search_state ORDER BY used_at LIMIT 1"
+                ).fetchone()[0]
+                _clear(conn, slot)
+            start = 0
+
+        _insert(conn, companies, slot, start)
+        conn.execute(
+            """
+            INSERT INTO company_search_state (slot, rows, fingerprint, used_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(slot) DO UPDATE SET
+                rows=excluded.rows,
+                fingerprint=excluded.fingerprint,
+                used_at=excluded.used_at
+            """,
+            (slot, len(hashes), _fingerprint(prefixes, len(hashes)), time.time()),
+        )
+    return slot, len(hashes) - start, _fingerprint(prefixes, len(hashes))
+
+
+def _like_pattern(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _rowids(conn, query, params, limit):
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    rows = conn.execute(query, params).fetchall()
+    return np.array([row[0] for row in rows], dtype=np.int64)
+
+
+def search_companies(keyword, limit=None, db_path=DB_PATH, slot=0, rows=None):
+    """Row positions of companies whose name or address contains ``keyword``.
+
+    Searches the frame ``sync_index`` put in ``slot``, its first ``rows`` rows
+    if given. Ranked in three tiers: names starting with the keyword, other
+    name matches, then address-only matches; row order within a tier.
+    """
+    keyword = keyword.strip()
+    if not keyword:
+        return np.empty(0, dtype=np.int64)
+    with connection(db_path) as conn:
+        return _search(conn, keyword, limit, slot, rows)
+
+
+def _search(conn, keyword, limit, slot, rows):
+    base = slot << SLOT_BITS
+    end = base + (1 << SLOT_BITS if rows is None else rows)
+    # A rowid range is a cheap constraint for FTS5 as well as for LIKE scans
+    in_slot = f"rowid >= {base} AND rowid < {end}"
+    match = (
+        f"SELECT rowid FROM company_search WHERE company_search MATCH ? AND {in_slot}"
+    )
+    if len(keyword) >= 3:
+        # A quoted phrase is a run of consecutive trigrams, i.e. a substring;
+        # "^" anchors it to the start of the column. Plain MATCH queries
+        # skip the bm25 pass over every hit that ORDER BY rank would need.
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        tiers = [
+            _rowids(conn, match, (f"name : ^ {phrase}",), limit),
+            _rowids(conn, match, (f"name : {phrase}",), limit),
+            _rowids(conn, match, (phrase,), limit),
+        ]
+    else:
+        # Too short for a trigram lookup, LIKE scans the table instead
+        pattern = _like_pattern(keyword)
+        query = f"""
+            SELECT rowid FROM company_search
+            WHERE (name LIKE ? ESCAPE '\\' OR address LIKE ? ESCAPE '\\')
+              AND {in_slot}
+            ORDER BY name LIKE ? ESCAPE '\\' DESC, name LIKE ? ESCAPE '\\' DESC,
+                     rowid
+        """
+        params = (f"%{pattern}%",) * 2 + (pattern + "%", f"%{pattern}%")
+        tiers = [_rowids(conn, query, params, limit)]
+
+    return pd.unique(np.concatenate(tiers))[:limit] - base
+
+
+class CompanySearch:
+    """Search over one companies frame, with results memoized per keyword.
+
+    The frame is only referenced weakly; it is indexed again if its slot was
+    handed to another frame (by this or another process) in the meantime.
+    """
+
+    def __init__(self, companies, db_path=DB_PATH):
+        self.db_path = db_path
+        self.rows = len(companies)
+        self._companies = weakref.ref(companies)
+        self.slot, _, self.fingerprint = _sync_index(companies, db_path)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, keyword):
+        key = keyword.strip().casefold()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        positions = self._search(keyword.strip())
+        with self._lock:
+            self._cache[key] = positions
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return positions
+
+    def _search(self, keyword):
+        if not keyword:
+            return np.empty(0, dtype=np.int64)
+        while True:
+            with connection(self.db_path) as conn:
+                # One read transaction: the slot cannot change hands between
+                # the check and the queries
+                with conn:
+                    conn.execute("BEGIN")
+                    held = conn.execute(
+                        "SELECT fingerprint FROM company_search_state WHERE slot = ?",
+                        (self.slot,),
+                    ).fetchone()
+                    if held is not None and held[0] == self.fingerprint:
+                        return _search(conn, keyword, None, self.slot, self.rows)
+
+            companies = self._companies()
+            if companies is None:
+                raise RuntimeError("the companies frame of this search is gone")
+            self.slot, _, self.fingerprint = _sync_index(companies, self.db_path)
+
+
+# One search per live frame; load_companies returns the same frame until the
+# CSV changes, so the index is synced once per dataset version.
+_searches = {}
+_searches_lock = threading.Lock()
+
+
+def company_search(companies, db_path=DB_PATH):
+    key = (id(companies), db_path)
+    with _searches_lock:
+        entry = _searches.get(key)
+        if entry is not None and entry[0]() is companies:
+            return entry[1]
+
+    search = CompanySearch(companies, db_path)
+    with _searches_lock:
+        _searches[key] = (
+            weakref.ref(companies, lambda _: _searches.pop(key, None)),
+            search,
+        )
+    return search
@@ -0,0 +1,739 @@
+### Data access for crm.db: pooled connections, schema and writes ###
+
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from dateutil import tz
+
+DB_PATH = "crm.db"
+POOL_SIZE = 8
+
+# WAL lets readers carry on while a rep saves a note, and with
+# synchronous=NORMAL a commit no longer waits for an fsync of the main file.
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # 16 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+]
+
+
+def connect(path=DB_PATH):
+    """Open a tuned connection that is not part of the pool."""
+    # Prepared statements are cached per connection, pooled connections
+    # therefore reuse them across calls.
+    conn = sqlite3.connect(
+        path, timeout=5.0, check_same_thread=False, cached_statements=256
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+_pools = {}
+
+
+def _pool(path):
+    # setdefault is atomic, two threads racing here end up with the same queue
+    return _pools.setdefault(path, queue.LifoQueue(maxsize=POOL_SIZE))
+
+
+@contextmanager
+def connection(path=DB_PATH):
+    """Borrow a pooled connection for the duration of the block."""
+    pool = _pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = connect(path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def transaction(path=DB_PATH):
+    """Borrow a pooled connection and commit (or roll back) when the block ends."""
+    with connection(path) as conn:
+        with conn:
+            yield conn
+
+
+def close_all():
+    for pool in _pools.values():
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# --- Schema migrations ---
+# Applied in order by init_db; PRAGMA user_version records how many have run.
+# Monday starting the local-time week of an epoch column, as 'YYYY-MM-DD'
+WEEK = "date({}, 'unixepoch', 'localtime', 'weekday 0', '-6 days')"
+
+
+def rebuild_weekly_rollup(conn):
+    """Recount contact_weekly from every row of logs (backfill)."""
+    conn.execute("DELETE FROM contact_weekly")
+    conn.execute(
+        f"""
+        INSERT INTO contact_weekly (week, status, industry, contacts)
+        SELECT {WEEK.format("l.timestamp")},
+               COALESCE(d.status, ''), COALESCE(d.industry, ''), COUNT(*)
+        FROM logs l
+        LEFT JOIN client_keys k ON k.legacy_id = l.client_id
+        LEFT JOIN client_dims d ON d.client_key = k.client_key
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def move_contacts(conn):
+    """Apply the status/industry changes staged in temp.dims_changes.
+
+    Each listed client's contacts move from its old client_dims values to the
+    new ones, reading only that client's logs through the indexes.
+    """
+    # CROSS JOIN keeps SQLite from scanning all of logs for a few clients
+    for sign, dims in [
+        (-1, "COALESCE(d.status, ''), COALESCE(d.industry, '')"),
+        (1, "c.status, c.industry"),
+    ]:
+        conn.execute(
+            f"""
+            INSERT INTO contact_weekly (week, status, industry, contacts)
+            SELECT {WEEK.format("l.timestamp")}, {dims}, {sign} * COUNT(*)
+            FROM dims_changes c
+            CROSS JOIN client_keys k ON k.client_key = c.client_key
+            CROSS JOIN logs l ON l.client_id = k.legacy_id
+            LEFT JOIN client_dims d ON d.client_key = c.client_key
+            GROUP BY 1, 2, 3
+            ON CONFLICT(week, status, industry) DO UPDATE SET
+                contacts = contacts + excluded.contacts
+            """
+        )
+    conn.execute("DELETE FROM contact_weekly WHERE contacts = 0")
+    conn.execute(
+        """
+        INSERT INTO client_dims (client_key, status, industry)
+        SELECT client_key, status, industry FROM dims_changes WHERE true
+        ON CONFLICT(client_key) DO UPDATE SET
+            status = excluded.status, industry = excluded.industry
+        """
+    )
+    conn.execute("DELETE FROM dims_changes")
+
+
+def init_dims_changes(conn):
+    conn.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS dims_changes (
+            client_key INTEGER PRIMARY KEY, status TEXT, industry TEXT
+        )
+        """
+    )
+
+
+def _stage_client_dims(conn, client_id, status=None, industry=None):
+    # One client's new status and/or industry, a value left as None is kept.
+    # move_contacts applies everything staged.
+    init_dims_changes(conn)
+    conn.execute(
+        """
+        INSERT INTO dims_changes (client_key, status, industry)
+        SELECT k.client_key,
+               COALESCE(?, d.status, ''), COALESCE(?, d.industry, '')
+        FROM client_keys k LEFT JOIN client_dims d USING (client_key)
+        WHERE k.legacy_id = ?
+        """,
+        (status, industry, client_id),
+    )
+
+
+def _migrate_logs_to_epochs(conn):
+    # Timestamps become integer Unix epochs (legacy TEXT values were written in
+    # local time) and (client_id, timestamp) gets an index for per-client reads.
+    conn.execute(
+        """
+        CREATE TABLE logs_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id TEXT NOT NULL,
+            note TEXT,
+            timestamp INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO logs_new (id, client_id, note, timestamp)
+        SELECT id, client_id, note,
+               COALESCE(CAST(strftime('%s', timestamp, 'utc') AS INTEGER), 0)
+        FROM logs
+        """
+    )
+    conn.execute("DROP TABLE logs")
+    conn.execute("ALTER TABLE logs_new RENAME TO logs")
+    conn.execute("CREATE INDEX idx_logs_client_time ON logs (client_id, timestamp)")
+
+    # Latest contact and number of contacts per client, kept current by
+    # triggers so readers never have to aggregate the logs table.
+    conn.execute(
+        """
+        CREATE TABLE client_contact (
+            client_id TEXT PRIMARY KEY,
+            last_contacted INTEGER NOT NULL,
+            contact_count INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO client_contact (client_id, last_contacted, contact_count)
+        SELECT client_id, MAX(timestamp), COUNT(*) FROM logs GROUP BY client_id
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER logs_contact_insert AFTER INSERT ON logs
+        BEGIN
+            INSERT INTO client_contact (client_id, last_contacted, contact_count)
+            VALUES (NEW.client_id, NEW.timestamp, 1)
+            ON CONFLICT(client_id) DO UPDATE SET
+                last_contacted = MAX(last_contacted, excluded.last_contacted),
+                contact_count = contact_count + 1;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER logs_contact_delete AFTER DELETE ON logs
+        BEGIN
+            UPDATE client_contact SET
+                contact_count = contact_count - 1,
+                last_contacted = COALESCE(
+                    (SELECT MAX(timestamp) FROM logs WHERE client_id = OLD.client_id),
+                    last_contacted
+                )
+            WHERE client_id = OLD.client_id;
+            DELETE FROM client_contact
+            WHERE client_id = OLD.client_id AND contact_count <= 0;
+        END
+        """
+    )
+
+
+def _add_client_keys(conn):
+    # Stable integer key per client. The legacy "Name @ Company" strings used
+    # by the other tables map onto it, and a renamed client simply gets a
+    # second legacy_id pointing at the same key (see alias_client).
+    conn.execute(
+        """
+        CREATE TABLE client_keys (
+            legacy_id TEXT PRIMARY KEY,
+            client_key INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX idx_client_keys_key ON client_keys (client_key)")
+    conn.execute(
+        """
+        INSERT INTO client_keys (legacy_id, client_key)
+        SELECT client_id, ROW_NUMBER() OVER (ORDER BY client_id)
+        FROM (
+            SELECT client_id FROM logs
+            UNION SELECT client_id FROM client_status
+            UNION SELECT client_id FROM industry_overrides
+        )
+        WHERE client_id IS NOT NULL
+        """
+    )
+
+
+def _add_notes_search(conn):
+    # Full-text index over logs.note. It is an external-content table, so the
+    # note text is stored once (in logs) and the triggers below keep the
+    # index in step with every insert, delete and note edit.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE logs_fts USING fts5(
+            note,
+            content='logs',
+            content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER logs_fts_insert AFTER INSERT ON logs
+        BEGIN
+            INSERT INTO logs_fts (rowid, note) VALUES (NEW.id, NEW.note);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER logs_fts_delete AFTER DELETE ON logs
+        BEGIN
+            INSERT INTO logs_fts (logs_fts, rowid, note)
+            VALUES ('delete', OLD.id, OLD.note);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER logs_fts_update AFTER UPDATE OF note ON logs
+        BEGIN
+            INSERT INTO logs_fts (logs_fts, rowid, note)
+            VALUES ('delete', OLD.id, OLD.note);
+            INSERT INTO logs_fts (rowid, note) VALUES (NEW.id, NEW.note);
+        END
+        """
+    )
+    conn.execute("INSERT INTO logs_fts (logs_fts) VALUES ('rebuild')")
+
+
+def _add_weekly_rollup(conn):
+    # Contacts per week, current status and current industry, so time series
+    # read a few hundred rows instead of regrouping the logs. client_dims
+    # holds each client's current status/industry ('' while unknown); the
+    # logs triggers count a note under them, and a change of either moves
+    # the client's contacts (see move_contacts).
+    conn.execute(
+        """
+        CREATE TABLE client_dims (
+            client_key INTEGER PRIMARY KEY,
+            status TEXT NOT NULL,
+            industry TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE contact_weekly (
+            week TEXT NOT NULL,
+            status TEXT NOT NULL,
+            industry TEXT NOT NULL,
+            contacts INTEGER NOT NULL,
+            PRIMARY KEY (week, status, industry)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER logs_weekly_insert AFTER INSERT ON logs
+        BEGIN
+            INSERT INTO contact_weekly (week, status, industry, contacts)
+            SELECT {WEEK.format("NEW.timestamp")},
+                   COALESCE(d.status, ''), COALESCE(d.industry, ''), 1
+            FROM (SELECT NEW.client_id AS client_id) n
+            LEFT JOIN client_keys k ON k.legacy_id = n.client_id
+            LEFT JOIN client_dims d ON d.client_key = k.client_key
+            WHERE true
+            ON CONFLICT(week, status, industry) DO UPDATE SET
+                contacts = contacts + 1;
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER logs_weekly_delete AFTER DELETE ON logs
+        BEGIN
+            UPDATE contact_weekly SET contacts = contacts - 1
+            WHERE (week, status, industry) = (
+                SELECT {WEEK.format("OLD.timestamp")},
+                       COALESCE(d.status, ''), COALESCE(d.industry, '')
+                FROM (SELECT OLD.client_id AS client_id) o
+                LEFT JOIN client_keys k ON k.legacy_id = o.client_id
+                LEFT JOIN client_dims d ON d.client_key = k.client_key
+            );
+            DELETE FROM contact_weekly
+            WHERE week = {WEEK.format("OLD.timestamp")} AND contacts <= 0;
+        END
+        """
+    )
+    rebuild_weekly_rollup(conn)
+
+
+def _add_derived_tables(conn):
+    # Caches and sync state of the offline jobs and indexes
+    conn.execute(
+        """
+        CREATE TABLE industry_cache (
+            title TEXT PRIMARY KEY,
+            industry TEXT,
+            source TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE geocode_cache (
+            address TEXT PRIMARY KEY,
+            latitude REAL,
+            longitude REAL,
+            provider TEXT,
+            updated_at TEXT
+        )
+        """
+    )
+    # Source rows of each call log file already loaded, keyed by a hash of
+    # the file's first rows (modules/call_logs.py)
+    conn.execute(
+        """
+        CREATE TABLE log_imports (
+            source TEXT PRIMARY KEY,
+            size INTEGER,
+            rows INTEGER
+        )
+        """
+    )
+    # Fingerprint of the people frame client_dims was last synced from
+    conn.execute(
+        """
+        CREATE TABLE client_dims_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            fingerprint TEXT NOT NULL
+        )
+        """
+    )
+
+    # Company keyword search (modules/company_search.py). The trigram
+    # tokenizer indexes every 3-character window, so MATCH and LIKE find
+    # substrings anywhere in a value, case-insensitively. Each indexed frame
+    # has a slot: its rows are rowids slot << 32 onwards.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE company_search
+        USING fts5(name, address, tokenize='trigram')
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE company_search_state (
+            slot INTEGER PRIMARY KEY,
+            rows INTEGER NOT NULL,
+            fingerprint TEXT NOT NULL,
+            used_at REAL NOT NULL
+        )
+        """
+    )
+
+    # Duplicate people (modules/entity_resolution.py)
+    conn.execute(
+        """
+        CREATE TABLE person_clusters (
+            client_id TEXT PRIMARY KEY,
+            canonical_id TEXT NOT NULL,
+            score REAL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE person_clusters_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            fingerprint TEXT NOT NULL
+        )
+        """
+    )
+
+    # People -> Companies fuzzy matches (modules/company_links.py)
+    conn.execute(
+        """
+        CREATE TABLE company_fuzzy_matches (
+            name_key TEXT PRIMARY KEY,
+            company_key TEXT,
+            score REAL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE company_fuzzy_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            fingerprint TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _add_client_changes(conn):
+    # Client keys whose status or industry override may have changed, in
+    # commit order, so a reader that remembers the last seq it saw rereads
+    # only those clients (see PeopleStore in modules/load_data.py). A
+    # client_keys row is logged when it (re)maps an ID that has a status or
+    # an override, e.g. a merged duplicate.
+    conn.execute(
+        """
+        CREATE TABLE client_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_key INTEGER NOT NULL
+        )
+        """
+    )
+    for table in ["client_status", "industry_overrides"]:
+        for event, row in [("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")]:
+            conn.execute(
+                f"""
+                CREATE TRIGGER {table}_changes_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO client_changes (client_key)
+                    SELECT client_key FROM client_keys
+                    WHERE legacy_id = {row}.client_id;
+                END
+                """
+            )
+    has_values = """
+        EXISTS (SELECT 1 FROM client_status WHERE client_id = {0}.legacy_id)
+        OR EXISTS (SELECT 1 FROM industry_overrides WHERE client_id = {0}.legacy_id)
+    """
+    conn.execute(
+        f"""
+        CREATE TRIGGER client_keys_changes_insert AFTER INSERT ON client_keys
+        WHEN {has_values.format("NEW")}
+        BEGIN
+            INSERT INTO client_changes (client_key) VALUES (NEW.client_key);
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER client_keys_changes_update AFTER UPDATE ON client_keys
+        WHEN {has_values.format("NEW")}
+        BEGIN
+            INSERT INTO client_changes (client_key)
+            VALUES (OLD.client_key), (NEW.client_key);
+        END
+        """
+    )
+
+
+MIGRATIONS = [
+    _migrate_logs_to_epochs,
+    _add_client_keys,
+    _add_notes_search,
+    _add_weekly_rollup,
+    _add_derived_tables,
+    _add_client_changes,
+]
+
+
+def init_db(db_path=DB_PATH):
+    with connection(db_path) as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == len(MIGRATIONS):
+            return
+
+        with conn:
+            # Take the write lock first so two sessions cannot both migrate
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+
+            # Table to store client status and last contacted date
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS client_status (
+                client_id TEXT PRIMARY KEY,
+                status TEXT DEFAULT 'open',
+                last_contacted TEXT
+            )
+            """
+            )
+
+            # Table to store log notes
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_id TEXT,
+                note TEXT,
+                timestamp TEXT
+            )
+            """
+            )
+
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS industry_overrides (
+                    client_id TEXT PRIMARY KEY,
+                    overridden_industry TEXT
+                )
+            """
+            )
+
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, migrate in enumerate(MIGRATIONS[version:], start=version + 1):
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+
+
+def to_epoch(values):
+    """Datetimes (naive ones are taken as local time) as integer epochs.
+
+    Unparseable values come back as missing.
+    """
+    stamps = pd.to_datetime(pd.Series(values), errors="coerce")
+    if stamps.dt.tz is None:
+        stamps = stamps.dt.tz_localize(
+            tz.tzlocal(), ambiguous="NaT", nonexistent="shift_forward"
+        )
+    seconds = (stamps - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+    return seconds.astype("Int64")
+
+
+def from_epoch(values):
+    """Integer epochs from crm.db as naive local datetimes."""
+    return (
+        pd.to_datetime(pd.Series(values), unit="s", utc=True)
+        .dt.tz_convert(tz.tzlocal())
+        .dt.tz_localize(None)
+    )
+
+
+# --- Client keys ---
+def _lookup_keys(conn, legacy_ids):
+    if len(legacy_ids) > 5000:
+        # Cheaper to read the whole mapping than to page through IN lists
+        rows = conn.execute("SELECT legacy_id, client_key FROM client_keys")
+        return dict(rows.fetchall())
+    found = {}
+    for start in range(0, len(legacy_ids), 500):
+        chunk = legacy_ids[start : start + 500]
+        rows = conn.execute(
+            "SELECT legacy_id, client_key FROM client_keys "
+            f"WHERE legacy_id IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        found.update(rows.fetchall())
+    return found
+
+
+def client_keys(conn, legacy_ids):
+    """Integer client keys for legacy Client ID strings, as an int32 array.
+
+    Strings seen for the first time get the next free key.
+    """
+    legacy_ids = pd.Series(legacy_ids, dtype=object)
+    unique = list(legacy_ids.dropna().unique())
+    mapping = _lookup_keys(conn, unique)
+
+    missing = [i for i in unique if i not in mapping]
+    if missing:
+        with conn:
+            # Serialize key assignment between sessions
+            conn.execute("BEGIN IMMEDIATE")
+            start = conn.execute(
+                "SELECT COALESCE(MAX(client_key), 0) FROM client_keys"
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT OR IGNORE INTO client_keys (legacy_id, client_key) "
+                "VALUES (?, ?)",
+                zip(missing, range(start + 1, start + 1 + len(missing))),
+            )
+        mapping.update(_lookup_keys(conn, missing))
+
+    # -1 marks rows without an ID (no name or company)
+    return legacy_ids.map(mapping).fillna(-1).to_numpy(dtype="int32")
+
+
+def client_aliases(conn, client_id):
+    """Every Client ID string of the client ``client_id`` belongs to, itself
+    first; merged duplicates and renames share one client key."""
+    rows = conn.execute(
+        """
+        SELECT a.legacy_id FROM client_keys k
+        JOIN client_keys a ON a.client_key = k.client_key
+        WHERE k.legacy_id = ? AND a.legacy_id != k.legacy_id
+        ORDER BY a.legacy_id
+        """,
+        (client_id,),
+    ).fetchall()
+    return [client_id] + [row[0] for row in rows]
+
+
+def alias_clients(conn, pairs):
+    """Point each (old_id, new_id) pair's new ID at the old ID's client key."""
+    conn.executemany(
+        """
+        INSERT INTO client_keys (legacy_id, client_key)
+        SELECT ?, client_key FROM client_keys WHERE legacy_id = ?
+        ON CONFLICT(legacy_id) DO UPDATE SET client_key=excluded.client_key
+        """,
+        ((new_id, old_id) for old_id, new_id in pairs),
+    )
+
+
+def alias_client(old_id, new_id, db_path=DB_PATH):
+    """Point a new Client ID string at an existing client's key (renames)."""
+    with transaction(db_path) as conn:
+        alias_clients(conn, [(old_id, new_id)])
+
+
+def apply_writes(conn, statuses=None, overrides=None, notes=()):
+    """Write a batch of changes inside the caller's transaction.
+
+    ``statuses`` and ``overrides`` map Client IDs to their new status or
+    industry, ``notes`` holds (client_id, note, timestamp) rows. The weekly
+    rollup is moved once for every client whose status or industry changed.
+    """
+    statuses = statuses or {}
+    overrides = overrides or {}
+    if statuses:
+        conn.executemany(
+            """
+            INSERT INTO client_status (client_id, status)
+            VALUES (?, ?)
+            ON CONFLICT(client_id) DO UPDATE SET status=excluded.status
+            """,
+            statuses.items(),
+        )
+    if overrides:
+        conn.executemany(
+            "REPLACE INTO industry_overrides (client_id, overridden_industry) VALUES (?, ?)",
+            overrides.items(),
+        )
+    # client_contact is updated by the logs_contact_insert trigger
+    if notes:
+        conn.executemany(
+            "INSERT INTO logs (client_id, note, timestamp) VALUES (?, ?, ?)", notes
+        )
+    for client_id in statuses.keys() | overrides.keys():
+        _stage_client_dims(
+            conn, client_id, statuses.get(client_id), overrides.get(client_id)
+        )
+    if statuses or overrides:
+        move_contacts(conn)
+
+
+def update_status(client_id, new_status, db_path=DB_PATH):
+    with transaction(db_path) as conn:
+        apply_writes(conn, statuses={client_id: new_status})
+
+
+def log_call(client_id, note, timestamp=None, db_path=DB_PATH):
+    # timestamp is an epoch in seconds, defaults to now
+    if timestamp is None:
+        timestamp = int(time.time())
+
+    with transaction(db_path) as conn:
+        apply_writes(conn, notes=[(client_id, note, timestamp)])
+
+
+def save_industry_override(client_id, industry, db_path=DB_PATH):
+    with transaction(db_path) as conn:
+        apply_writes(conn, overrides={client_id: industry})
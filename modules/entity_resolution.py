@@ -0,0 +1,362 @@
+### People entity resolution: normalized keys, blocking, pair scoring, cluster map ###
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from modules.db import (
+    alias_clients,
+    client_keys,
+    connection,
+    init_db,
+    rebuild_weekly_rollup,
+    transaction,
+)
+
+# A blocking value shared by more rows than this (a switchboard number, a
+# very common name) says little about who is who and is not paired on
+MAX_BLOCK = 50
+# Pair score = weighted name and company similarity plus a shared email or
+# phone; pairs at or above MATCH_SCORE are the same person
+WEIGHTS = {"name": 0.45, "company": 0.35, "contact": 0.2}
+MATCH_SCORE = 0.8
+
+_SUFFIXES = r"( (llc|l l c|ltd|limited|inc|incorporated|corp|corporation|co|plc))+$"
+_EXTENSION = r"(?i)\s*(x|ext\.?)\s*\d+\s*$"
+
+# Built on first use by _trigram_vectorizer
+_trigrams = None
+
+
+# --- Normalization ---
+# Arrow compute kernels do the string work in C++, a million rows take
+# about a second per column rather than ten through pandas .str.
+def _text(values):
+    return pa.array(pd.Series(values).astype("string"))
+
+
+def _clean(values):
+    # Case, accents, "&" and punctuation never tell two people apart
+    text = pc.utf8_normalize(_text(values), "NFKD")
+    text = pc.replace_substring_regex(text, r"[^\x00-\x7f]", "")
+    text = pc.utf8_lower(text)
+    text = pc.replace_substring(text, "&", " and ")
+    text = pc.replace_substring_regex(text, r"[^a-z0-9]+", " ")
+    return pc.utf8_trim_whitespace(text)
+
+
+def _blank_to_na(text):
+    return pc.if_else(pc.equal(text, ""), pa.scalar(None, pa.string()), text)
+
+
+def _per_value(normalize, values):
+    # Normalize each distinct value once; companies repeat a lot
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    normalized = normalize(uniques)
+    return pc.take(normalized, pa.array(codes, mask=codes < 0))
+
+
+def _normalize_company(values):
+    return _blank_to_na(pc.replace_substring_regex(_clean(values), _SUFFIXES, ""))
+
+
+def _normalize_phone(values):
+    text = pc.replace_substring_regex(_text(values), _EXTENSION, "")
+    digits = pc.replace_substring_regex(text, r"\D", "")
+    digits = pc.replace_substring_regex(digits, r"^.*(.{10})$", r"\1")
+    return pc.if_else(
+        pc.greater_equal(pc.utf8_length(digits), 7),
+        digits,
+        pa.scalar(None, pa.string()),
+    )
+
+
+def _normalize_email(values):
+    text = pc.utf8_lower(pc.utf8_trim_whitespace(_text(values)))
+    return pc.if_else(pc.match_substring(text, "@"), text, pa.scalar(None, pa.string()))
+
+
+def normalize_name(values):
+    return _blank_to_na(_clean(values)).to_pandas()
+
+
+def normalize_company(values):
+    """Company names without case, punctuation or a trailing LLC/Ltd/Inc."""
+    return _per_value(_normalize_company, values).to_pandas()
+
+
+def normalize_email(values):
+    return _normalize_email(values).to_pandas()
+
+
+def normalize_phone(values):
+    """001-580-334-4312, +1 580.334.4312 x12 and 5803344312 all give 5803344312.
+
+    The last ten digits once any extension is cut off; None below seven.
+    """
+    return _normalize_phone(values).to_pandas()
+
+
+def match_keys(people):
+    """Normalized name, company, email and phone per row of ``people``."""
+    return pa.table(
+        {
+            "name": _blank_to_na(_clean(people["Name"])),
+            "company": _per_value(_normalize_company, people["Company"]),
+            "email": _normalize_email(people["Email"]),
+            "phone": _normalize_phone(people["Phone Number"]),
+        }
+    ).to_pandas()
+
+
+# --- Candidate pairs and scores ---
+def _blocks(keys):
+    name = _text(keys["name"])
+    last_name = pc.replace_substring_regex(name, r"^.* ", "")
+    return [
+        keys["email"],
+        keys["phone"],
+        keys["name"],
+        # Catches first-name typos and nicknames within one company
+        pc.binary_join_element_wise(_text(keys["company"]), last_name, "|"),
+    ]
+
+
+def candidate_pairs(keys, new=None):
+    """(left, right) row positions sharing at least one blocking key, left < right.
+
+    Only blocks of 2 to MAX_BLOCK rows are paired, so the pair count grows
+    with the number of rows rather than its square. With ``new``, a boolean
+    mask, only pairs involving at least one new row are returned.
+    """
+    n = len(keys)
+    found = []
+    for block in _blocks(keys):
+        codes = pd.factorize(pd.Series(block), use_na_sentinel=True)[0]
+        sizes = np.bincount(codes[codes >= 0])
+        keep = codes >= 0
+        keep[keep] = (sizes[codes[keep]] > 1) & (sizes[codes[keep]] <= MAX_BLOCK)
+        if new is not None:
+            touched = np.zeros(len(sizes), dtype=bool)
+            touched[codes[keep & new]] = True
+            keep[keep] = touched[codes[keep]]
+        rows = pd.DataFrame({"key": codes[keep], "row": np.flatnonzero(keep)})
+        pairs = rows.merge(rows, on="key")
+        left, right = pairs["row_x"].to_numpy(), pairs["row_y"].to_numpy()
+        keep = left < right
+        if new is not None:
+            keep &= new[left] | new[right]
+        found.append(left[keep].astype(np.int64) * n + right[keep])
+    codes = np.unique(np.concatenate(found)) if found else np.empty(0, np.int64)
+    return codes // max(n, 1), codes % max(n, 1)
+
+
+def _trigram_vectorizer():
+    # Character trigram counts, l2-normalized: the dot product of two rows is
+    # their cosine similarity. Hashing needs no fitted vocabulary, so new rows
+    # are vectorized on their own. sklearn is only imported once there are
+    # pairs to score; an unchanged sheet never gets here.
+    global _trigrams
+    if _trigrams is None:
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        _trigrams = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 3),
+            n_features=2**20,
+            alternate_sign=False,
+        )
+    return _trigrams
+
+
+def _similarity(values, left, right):
+    # Cosine similarity of the trigram vectors of each pair's two values;
+    # only the rows that appear in a pair are vectorized
+    rows = np.unique(np.concatenate([left, right]))
+    vectors = _trigram_vectorizer().transform(values.iloc[rows].fillna(""))
+    a = vectors[np.searchsorted(rows, left)]
+    b = vectors[np.searchsorted(rows, right)]
+    return np.asarray(a.multiply(b).sum(axis=1)).ravel()
+
+
+def score_pairs(keys, left, right):
+    """Match score in [0, 1] for each candidate pair."""
+    if not len(left):
+        return np.empty(0)
+    contact = np.zeros(len(left), dtype=bool)
+    for column in ["email", "phone"]:
+        values = keys[column].to_numpy()
+        a, b = values[left], values[right]
+        contact |= pd.notna(a) & (a == b)
+    return (
+        WEIGHTS["name"] * _similarity(keys["name"], left, right)
+        + WEIGHTS["company"] * _similarity(keys["company"], left, right)
+        + WEIGHTS["contact"] * contact
+    )
+
+
+# --- Persistent cluster map (crm.db) ---
+# person_clusters maps every Client ID seen to the Client ID of the row kept
+# for its person. Duplicates also share the canonical client's key in
+# client_keys, so their statuses, overrides and notes count for it. The
+# tables are created by init_db (see db.MIGRATIONS).
+
+
+def update_clusters(conn, people):
+    """Canonical Client ID for every row of ``people``, as a Series.
+
+    Rows whose Client ID is already in person_clusters keep their cluster;
+    only new rows are paired and scored, against all rows. A frame with
+    exactly the Client IDs of the last call reads the stored map back.
+    """
+    ids = people["Client ID"].reset_index(drop=True)
+    valid = ids.notna().to_numpy()
+    fingerprint = f"{int(pd.util.hash_pandas_object(ids, index=False).sum()):016x}"
+
+    seen = conn.execute("SELECT fingerprint FROM person_clusters_state").fetchone()
+    if seen and seen[0] == fingerprint:
+        merged = dict(
+            conn.execute(
+                "SELECT client_id, canonical_id FROM person_clusters "
+                "WHERE client_id != canonical_id"
+            ).fetchall()
+        )
+        return ids.map(merged).fillna(ids)
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    stored = pd.read_sql_query(
+        "SELECT client_id, canonical_id FROM person_clusters", conn
+    ).set_index("client_id")["canonical_id"]
+    stored_canonical = ids.map(stored)
+    new = valid & stored_canonical.isna().to_numpy()
+
+    keys = match_keys(people)
+    keys.loc[~valid] = None
+    left, right = candidate_pairs(keys, new)
+    scores = score_pairs(keys, left, right)
+    matched = scores >= MATCH_SCORE
+    left, right, scores = left[matched], right[matched], scores[matched]
+
+    # Known rows stay linked to their stored canonical row
+    n = len(ids)
+    position = pd.Index(ids)
+    canonical_pos = position.get_indexer(stored_canonical)
+    linked = (canonical_pos >= 0) & (canonical_pos != np.arange(n))
+    graph = coo_matrix(
+        (
+            np.ones(len(left) + linked.sum()),
+            (
+                np.concatenate([left, np.flatnonzero(linked)]),
+                np.concatenate([right, canonical_pos[linked]]),
+            ),
+        ),
+        shape=(n, n),
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    # Each cluster keeps its stored canonical row, else its first row
+    was_canonical = (stored_canonical == ids).to_numpy()
+    order = np.lexsort((np.arange(n), ~was_canonical, labels))
+    first = order[np.r_[True, labels[order][1:] != labels[order][:-1]]]
+    canonical = ids.iloc[first[np.searchsorted(labels[first], labels)]]
+    canonical = canonical.reset_index(drop=True)
+
+    best = np.full(n, np.nan)
+    np.fmax.at(best, left, scores)
+    np.fmax.at(best, right, scores)
+    changed = valid & (stored_canonical != canonical).to_numpy()
+    merged = changed & (canonical != ids).to_numpy()
+
+    # Canonical rows need a key for their duplicates to point at
+    client_keys(conn, canonical[merged].unique())
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO person_clusters (client_id, canonical_id, score)
+            VALUES (?, ?, ?)
+            ON CONFLICT(client_id) DO UPDATE SET
+                canonical_id = excluded.canonical_id,
+                score = COALESCE(excluded.score, score)
+            """,
+            zip(
+                ids[changed],
+                canonical[changed],
+                [None if np.isnan(s) else float(s) for s in best[changed]],
+            ),
+        )
+        if merged.any():
+            alias_clients(conn, zip(canonical[merged], ids[merged]))
+            # Contacts of the merged clients now count under their canonical one
+            rebuild_weekly_rollup(conn)
+        conn.execute(
+            "REPLACE INTO person_clusters_state (id, fingerprint) VALUES (1, ?)",
+            (fingerprint,),
+        )
+    return canonical
+
+
+def merge_duplicates(people, canonical):
+    """One row per person: the canonical row, gaps filled from its duplicates."""
+    people = people.reset_index(drop=True)
+    ids = people["Client ID"]
+    duplicate = (ids.notna() & (canonical != ids)).to_numpy()
+    if not duplicate.any():
+        return people
+
+    in_cluster = canonical.isin(canonical[duplicate]).to_numpy()
+    # Canonical rows first, so groupby().first() keeps their values and only
+    # takes what they are missing from the duplicates
+    rows = np.flatnonzero(in_cluster)
+    rows = rows[np.argsort(duplicate[rows], kind="stable")]
+    filled = people.iloc[rows].groupby(canonical.iloc[rows].to_numpy()).first()
+
+    result = people[~duplicate].reset_index(drop=True)
+    target = result["Client ID"].isin(filled.index).to_numpy()
+    for column in filled.columns:
+        result.loc[target, column] = (
+            filled[column].reindex(result.loc[target, "Client ID"]).to_numpy()
+        )
+    return result
+
+
+def resolve_people(conn, people):
+    """``people`` with every duplicate person merged into its canonical row."""
+    return merge_duplicates(people, update_clusters(conn, people))
+
+
+if __name__ == "__main__":
+    # Run from the repository root:
+    #   python -m modules.entity_resolution           (resolve new rows)
+    #   python -m modules.entity_resolution --rebuild (re-pair every row)
+    from modules.load_data import PEOPLE_PATH, people_snapshot
+
+    parser = argparse.ArgumentParser(description="Merge duplicate people")
+    parser.add_argument("--path", default=PEOPLE_PATH)
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="forget the stored clusters first (keys already shared stay shared)",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    if args.rebuild:
+        with transaction() as conn:
+            conn.execute("DELETE FROM person_clusters")
+            conn.execute("DELETE FROM person_clusters_state")
+    start = time.perf_counter()
+    people = people_snapshot(args.path).people
+    with connection() as conn:
+        rows, duplicates = conn.execute(
+            "SELECT COUNT(*), SUM(client_id != canonical_id) FROM person_clusters"
+        ).fetchone()
+    print(
+        f"{len(people)} people from {rows} Client IDs, {duplicates or 0} merged "
+        f"as duplicates ({time.perf_counter() - start:.1f}s)"
+    )
@@ -0,0 +1,153 @@
+### Precomputed filter indexes for the Clients tab ###
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ["LLM_Industry", "Status", "Company"]
+CACHE_SIZE = 64
+
+
+def _codes(values):
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    return values.cat.codes.to_numpy(), values.cat.categories
+
+
+def _counts(codes, categories):
+    # Rows per category, largest first like value_counts, empty ones dropped
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    counts = pd.Series(counts, index=categories, name="count")
+    return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+
+class ClientFilterIndex:
+    """Sorted row positions per industry and status of one people frame.
+
+    A filter is resolved from these arrays instead of boolean masks over the
+    whole frame, and its counts are memoized per filter key. The index only
+    keeps integer codes, so pass the same frame it was built from to
+    ``select``.
+    """
+
+    def __init__(self, people):
+        self.size = len(people)
+        self._codes = {}
+        self._categories = {}
+        self._order = {}
+        for col in INDEXED_COLUMNS:
+            self._codes[col], self._categories[col] = _codes(people[col])
+            # Values in order of first appearance, as Series.unique() gives them
+            codes = pd.unique(self._codes[col])
+            self._order[col] = self._categories[col].take(codes[codes >= 0])
+
+        # A stable argsort groups positions by code and keeps each group sorted
+        self._positions = {}
+        for col in ["LLM_Industry", "Status"]:
+            codes = self._codes[col]
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(
+                codes[order], np.arange(len(self._categories[col]) + 1)
+            )
+            self._positions[col] = {
+                value: order[start:stop]
+                for value, start, stop in zip(
+                    self._categories[col], bounds[:-1], bounds[1:]
+                )
+            }
+
+        self._cache = OrderedDict()
+        self._last = None
+        self._lock = threading.Lock()
+
+    def values(self, column):
+        """Values present in ``column``, in order of first appearance."""
+        return self._order[column].tolist()
+
+    def rows(self, industry=None, statuses=None):
+        """Sorted row positions matching the filter, ``None`` for all rows."""
+        statuses = [s for s in statuses or [] if s in self._positions["Status"]]
+        if industry is None:
+            if not statuses or len(statuses) == len(self._positions["Status"]):
+                return None
+            return np.sort(
+                np.concatenate([self._positions["Status"][s] for s in statuses])
+            )
+
+        empty = np.empty(0, dtype=np.intp)
+        pos = self._positions["LLM_Industry"].get(industry, empty)
+        if statuses and len(statuses) < len(self._positions["Status"]):
+            # Look the status of each industry row up instead of intersecting
+            allowed = np.zeros(len(self._categories["Status"]) + 1, dtype=bool)
+            allowed[self._categories["Status"].get_indexer(statuses)] = True
+            pos = pos[allowed[self._codes["Status"][pos]]]
+        return pos
+
+    def summary(self, industry=None, statuses=None):
+        """Positions and counts for one filter, computed once per filter key."""
+        key = (industry, frozenset(statuses or []))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        pos = self.rows(industry, statuses)
+
+        def codes(col):
+            return self._codes[col] if pos is None else self._codes[col][pos]
+
+        company_counts = _counts(codes("Company"), self._categories["Company"])
+        result = {
+            "rows": pos,
+            "clients": self.size if pos is None else len(pos),
+            "companies": len(company_counts),
+            "status_counts": _counts(codes("Status"), self._categories["Status"]),
+            "company_counts": company_counts,
+        }
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def select(self, people, industry=None, statuses=None):
+        """Filtered rows of ``people`` and the memoized summary of the filter.
+
+        An empty filter returns ``people`` itself rather than a copy, and a
+        rerun with an unchanged filter gets the previous frame back. Treat the
+        returned frame as read-only.
+        """
+        summary = self.summary(industry, statuses)
+        if summary["rows"] is None:
+            return people, summary
+        last = self._last
+        if last is not None and last[0] is summary:
+            return last[1], summary
+        filtered = people.take(summary["rows"])
+        self._last = (summary, filtered)
+        return filtered, summary
+
+
+# One index per live frame. load_people hands out the same frame until crm.db
+# or the source files change, so reruns reuse the index and its memoized counts.
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def filter_index(people):
+    key = id(people)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is not None and entry[0]() is people:
+            return entry[1]
+
+    index = ClientFilterIndex(people)
+    with _indexes_lock:
+        _indexes[key] = (
+            weakref.ref(people, lambda _: _indexes.pop(key, None)),
+            index,
+        )
+    return index
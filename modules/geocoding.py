@@ -0,0 +1,195 @@
+### Address -> (lat, lon) with a persistent cache and incremental updates ###
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from modules.db import DB_PATH, connection, init_db, transaction
+from modules.paths import GEOCODED_PATH
+from modules.throttle import RateLimiter, retry
+
+# Lookups committed to the cache together; an interrupted run keeps them
+STORE_BATCH = 20
+
+_log = logging.getLogger("crm.geocoding")
+
+
+class NominatimBackend:
+    """OpenStreetMap Nominatim through geopy, at most one request per second."""
+
+    name = "nominatim"
+    rate = 1.0
+
+    def __init__(self, user_agent="crm-territory-mapper", **kwargs):
+        from geopy.exc import GeocoderServiceError, GeocoderTimedOut
+        from geopy.geocoders import Nominatim
+
+        self.retry_on = (GeocoderTimedOut, GeocoderServiceError)
+        self._geolocator = Nominatim(user_agent=user_agent, **kwargs)
+
+    def geocode(self, address):
+        loc = self._geolocator.geocode(address)
+        if loc:
+            return loc.latitude, loc.longitude
+        return None
+
+
+# One limiter per provider, shared by every pool that talks to it
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter(backend):
+    with _limiters_lock:
+        if backend.name not in _limiters:
+            _limiters[backend.name] = RateLimiter(backend.rate)
+        return _limiters[backend.name]
+
+
+def normalize_address(address):
+    if pd.isna(address):
+        return ""
+    return re.sub(r"\s+", " ", str(address)).strip().lower()
+
+
+# --- Persistent cache (crm.db geocode_cache, see db.MIGRATIONS) ---
+def load_cache(conn, addresses):
+    found = {}
+    keys = list(addresses)
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(keys), 500):
+        chunk = keys[start : start + 500]
+        rows = conn.execute(
+            "SELECT address, latitude, longitude FROM geocode_cache "
+            f"WHERE address IN ({','.join('?' * len(chunk))})",
+            chunk,
+        ).fetchall()
+        for address, lat, lon in rows:
+            found[address] = None if lat is None else (lat, lon)
+    return found
+
+
+def store_cache(conn, coords, provider):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        """
+        INSERT INTO geocode_cache (address, latitude, longitude, provider, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(address) DO UPDATE SET
+            latitude=excluded.latitude,
+            longitude=excluded.longitude,
+            provider=excluded.provider,
+            updated_at=excluded.updated_at
+        """,
+        [
+            (address, *(point or (None, None)), provider, now)
+            for address, point in coords.items()
+        ],
+    )
+
+
+def geocode_addresses(
+    addresses, backend=None, db_path=DB_PATH, max_workers=4, retry_missing=False
+):
+    """Return a dict of normalized address -> (lat, lon) or None.
+
+    Cached addresses are not looked up again; addresses the provider could not
+    resolve are cached as None and only retried with ``retry_missing``.
+    Results are stored every ``STORE_BATCH`` lookups. An address whose lookup
+    still fails after the retries is logged and left out (and uncached), so
+    the next run tries it again.
+    """
+    backend = backend or NominatimBackend()
+    keys = {normalize_address(a) for a in addresses} - {""}
+
+    init_db(db_path)
+    with connection(db_path) as conn:
+        coords = load_cache(conn, keys)
+    if retry_missing:
+        coords = {k: v for k, v in coords.items() if v is not None}
+    pending = sorted(keys - set(coords))
+
+    limiter = _limiter(backend)
+
+    def lookup(address):
+        def call():
+            limiter.acquire()
+            return backend.geocode(address)
+
+        return retry(call, getattr(backend, "retry_on", ()), attempts=3)
+
+    batch = {}
+
+    def store():
+        with transaction(db_path) as conn:
+            store_cache(conn, batch, backend.name)
+        coords.update(batch)
+        batch.clear()
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {pool.submit(lookup, address): address for address in pending}
+        for future in as_completed(futures):
+            address = futures[future]
+            try:
+                batch[address] = future.result()
+            except Exception as e:
+                _log.warning("geocoding %r failed: %r", address, e)
+                continue
+            if len(batch) >= STORE_BATCH:
+                store()
+    finally:
+        # On an error or Ctrl-C, drop the lookups not started yet and keep
+        # the ones already done
+        pool.shutdown(cancel_futures=True)
+        if batch:
+            store()
+    return coords
+
+
+def geocode_companies(
+    companies, previous_path=GEOCODED_PATH, db_path=DB_PATH, **kwargs
+):
+    """Add Latitude/Longitude to the Companies sheet, resolving only new addresses.
+
+    Coordinates already in ``previous_path`` seed the cache, so only companies
+    that were added or whose address changed since the last run are geocoded.
+    """
+    init_db(db_path)
+    try:
+        previous = pd.read_csv(previous_path).dropna(subset=["Latitude", "Longitude"])
+    except FileNotFoundError:
+        previous = None
+
+    if previous is not None and not previous.empty:
+        with transaction(db_path) as conn:
+            known = load_cache(conn, previous["Address"].map(normalize_address))
+            seed = {
+                key: (lat, lon)
+                for key, lat, lon in zip(
+                    previous["Address"].map(normalize_address),
+                    previous["Latitude"],
+                    previous["Longitude"],
+                )
+                if key not in known
+            }
+            store_cache(conn, seed, "previous")
+
+    coords = geocode_addresses(companies["Address"], db_path=db_path, **kwargs)
+    points = companies["Address"].map(normalize_address).map(coords)
+
+    df = companies.copy()
+    df["Latitude"] = points.map(lambda p: p[0] if p else None)
+    df["Longitude"] = points.map(lambda p: p[1] if p else None)
+    return df
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m modules.geocoding
+    df = pd.read_excel("data/crm_test_case_data.xlsx", sheet_name="Companies")
+    df = geocode_companies(df)
+    df.to_csv(GEOCODED_PATH, index=False)
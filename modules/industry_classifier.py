@@ -0,0 +1,210 @@
+### Offline title -> industry classification and its persistent cache ###
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from modules.db import DB_PATH, connection, init_db
+from modules.paths import PEOPLE_PATH
+
+CATEGORIES = [
+    "Technology",
+    "Healthcare",
+    "Education",
+    "Transportation",
+    "Finance",
+    "Construction",
+    "Retail",
+    "Hospitality",
+    "Energy",
+    "Manufacturing",
+]
+_CATEGORY_LOOKUP = {c.lower(): c for c in CATEGORIES}
+
+
+def normalize_title(title):
+    # "  Nurse, Children's " and "nurse, children's" are the same request
+    if pd.isna(title):
+        return ""
+    return re.sub(r"\s+", " ", str(title)).strip().lower()
+
+
+def canonical_industry(label):
+    # The LLM answers "finance", "Finance" or "Finance." for the same thing;
+    # anything that is not one of the categories is left out of training.
+    if pd.isna(label):
+        return None
+    return _CATEGORY_LOOKUP.get(str(label).strip().rstrip(".").lower())
+
+
+# --- Persistent cache (crm.db industry_cache, see db.MIGRATIONS) ---
+def load_cache(conn):
+    return dict(conn.execute("SELECT title, industry FROM industry_cache").fetchall())
+
+
+def store_cache(conn, industries, source):
+    conn.executemany(
+        """
+        INSERT INTO industry_cache (title, industry, source) VALUES (?, ?, ?)
+        ON CONFLICT(title) DO UPDATE SET
+            industry=excluded.industry, source=excluded.source
+        """,
+        [(title, industry, source) for title, industry in industries.items()],
+    )
+
+
+# --- Local classifier ---
+def training_data(conn, path=PEOPLE_PATH):
+    """Labelled (title, industry) pairs from the people sheet and overrides."""
+    people = pd.read_csv(path)
+    labelled = pd.DataFrame(
+        {
+            "title": people["Title"].map(normalize_title),
+            "industry": people["LLM_Industry"].map(canonical_industry),
+        }
+    )
+
+    # Overrides are keyed by Client ID, the title comes from the people sheet
+    overrides = pd.read_sql_query("SELECT * FROM industry_overrides", conn)
+    client_ids = people["Name"].str.strip() + " @ " + people["Company"].str.strip()
+    titles = pd.Series(people["Title"].to_numpy(), index=client_ids)
+    titles = titles[~titles.index.duplicated()]
+    corrected = pd.DataFrame(
+        {
+            "title": overrides["client_id"].map(titles).map(normalize_title),
+            "industry": overrides["overridden_industry"].map(canonical_industry),
+        }
+    )
+
+    # A human correction wins over the LLM label for the same title
+    data = pd.concat([labelled, corrected], ignore_index=True)
+    data = data[(data["title"] != "") & data["industry"].notna()]
+    return data.drop_duplicates(subset="title", keep="last").reset_index(drop=True)
+
+
+class TitleClassifier:
+    """TF-IDF (character n-gram) nearest-neighbour classifier for job titles.
+
+    ``predict`` returns a label and a confidence in [0, 1] for each title. The
+    confidence is the cosine similarity of the closest labelled title scaled by
+    the share of the k neighbours' similarity that voted for the label, so an
+    exact match with agreeing neighbours scores close to 1.
+    """
+
+    def __init__(self, k=5, chunk_size=4096):
+        self.k = k
+        self.chunk_size = chunk_size
+        self.vectorizer = TfidfVectorizer(
+            analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True
+        )
+
+    def fit(self, titles, industries):
+        self.labels, codes = np.unique(np.asarray(industries), return_inverse=True)
+        self.codes = codes
+        self.matrix = self.vectorizer.fit_transform(titles)
+        return self
+
+    def predict(self, titles):
+        titles = list(titles)
+        labels = np.empty(len(titles), dtype=object)
+        confidence = np.zeros(len(titles))
+        k = min(self.k, self.matrix.shape[0])
+
+        for start in range(0, len(titles), self.chunk_size):
+            chunk = self.vectorizer.transform(titles[start : start + self.chunk_size])
+            sims = (chunk @ self.matrix.T).toarray()
+
+            # k most similar labelled titles per row, best first
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_sims, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+            # Similarity-weighted vote over the neighbours' labels
+            votes = np.zeros((len(sims), len(self.labels)))
+            rows = np.repeat(np.arange(len(sims)), k)
+            np.add.at(votes, (rows, self.codes[top].ravel()), top_sims.ravel())
+            best = votes.argmax(axis=1)
+            total = top_sims.sum(axis=1)
+            share = np.divide(
+                votes[np.arange(len(sims)), best],
+                total,
+                out=np.zeros(len(sims)),
+                where=total > 0,
+            )
+
+            end = start + len(sims)
+            labels[start:end] = self.labels[best]
+            confidence[start:end] = share * top_sims[:, 0]
+
+        return labels, confidence
+
+
+def train_classifier(conn, path=PEOPLE_PATH, **kwargs):
+    # None when there is nothing labelled to learn from
+    data = training_data(conn, path)
+    if data.empty:
+        return None
+    return TitleClassifier(**kwargs).fit(data["title"], data["industry"])
+
+
+_classifiers = {}
+
+
+def _training_version(conn, path):
+    # The people sheet as it is on disk and the newest status/override change
+    # (client_changes, see db.MIGRATIONS)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    change = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM client_changes")
+    return stat.st_mtime_ns, stat.st_size, change.fetchone()[0]
+
+
+def cached_classifier(conn, db_path=DB_PATH, path=PEOPLE_PATH):
+    """The classifier for the current labels and overrides of ``db_path``.
+
+    It is refit only when the people sheet or an override changed since the
+    last fit. None without a people sheet or labelled titles.
+    """
+    version = _training_version(conn, path)
+    cached = _classifiers.get((db_path, path))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    classifier = None if version is None else train_classifier(conn, path)
+    _classifiers[(db_path, path)] = (version, classifier)
+    return classifier
+
+
+def classify_offline(titles, db_path=DB_PATH, min_confidence=0.6, classifier=None):
+    """Resolve titles from the cache and the local classifier.
+
+    Returns ``(industries, ambiguous)``: a dict of normalized title -> industry
+    for everything answered from the cache or locally, and the normalized
+    titles that still need the LLM. Local answers are not cached, so a weak
+    guess never keeps a title from the LLM once the model has changed.
+    """
+    keys = pd.unique(pd.Series([normalize_title(t) for t in titles], dtype=object))
+    keys = [k for k in keys if k]
+
+    init_db(db_path)
+    with connection(db_path) as conn:
+        cache = load_cache(conn)
+        industries = {k: cache[k] for k in keys if k in cache}
+        misses = [k for k in keys if k not in cache]
+        if not misses:
+            return industries, []
+
+        classifier = classifier or cached_classifier(conn, db_path)
+    if classifier is None:
+        return industries, misses
+
+    labels, confidence = classifier.predict(misses)
+    confident = confidence >= min_confidence
+    industries.update(zip(np.asarray(misses)[confident], labels[confident]))
+    return industries, list(np.asarray(misses)[~confident])
@@ -1,39 +1,152 @@
 ### To obtain industry from person's job tile ###
 
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
 import pandas as pd
 from openai import OpenAI
-from local_settings import (
-    OPENAI_KEY,
-)  # Assumes you have a local_settings.py file in your folder with your OpenAI key
 
-# Initialize the OpenAI client
-client = OpenAI(api_key=OPENAI_KEY)
+from modules.industry_classifier import (
+    canonical_industry,
+    classify_offline,
+    normalize_title,
+    store_cache,
+)
+from modules.db import DB_PATH, transaction
+from modules.throttle import RateLimiter, retry
+
+MODEL = "gpt-4o-mini"
+CHECKPOINT_PATH = "data/industry_checkpoint.jsonl"
+NO_TITLE = "No job title provided"
+
+# Errors worth another attempt; anything else (bad key, bad request) is fatal
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
 
+def make_client(base_url=None, api_key=None):
+    if api_key is None:
+        try:
+            # Assumes you have a local_settings.py file in your folder with your OpenAI key
+            from local_settings import OPENAI_KEY as api_key
+        except ImportError:
+            api_key = os.environ.get("OPENAI_API_KEY")
 
-def llm_chat(message):
+    # Retries are handled by classify_titles so they share the rate limit
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+
+def llm_chat(message, client):
     response = client.chat.completions.create(
-        model="gpt-4o-mini", messages=[{"role": "user", "content": message}]
+        model=MODEL, messages=[{"role": "user", "content": message}]
     )
     return response.choices[0].message.content
 
 
 # Function to review an article
-def get_industry(job_title):
+def get_industry(job_title, client):
     prompt = f"As an expert, your task is to classify a job title as one of the ten industry categories: technology, healthcare, education, transportation, finance, construction, retail, hospitality, energy and manufacuring. No explanation. are an AI assistant reviewing research articles. Classify this title: {job_title} "
 
-    return llm_chat(prompt)
+    return llm_chat(prompt, client).strip()
 
 
-# Apply the function to each article (assuming "Abstract" is the column name)
-# people["industry"] = people["title"].apply(lambda text: get_industry(text) if pd.notna(text) else "No job title provided")
+def _load_checkpoint(path):
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                done[row["title"]] = row["industry"]
+    return done
 
-# Load data
-people = pd.read_excel("data/crm_test_case_data.xlsx", sheet_name="People")
 
+def classify_titles(
+    titles,
+    client=None,
+    max_workers=8,
+    requests_per_second=5,
+    attempts=5,
+    checkpoint_path=CHECKPOINT_PATH,
+):
+    """Classify job titles concurrently, once per normalized title.
 
-# Apply the function to each article (assuming "Abstract" is the column name)
-people["LLM_Industry"] = people["Title"].apply(
-    lambda text: get_industry(text) if pd.notna(text) else "No job title provided"
-)
+    Returns a dict of normalized title -> industry. Every answer is appended to
+    ``checkpoint_path`` as soon as it arrives, and titles already present there
+    are not sent again, so an interrupted run picks up where it stopped.
+    """
+    client = client or make_client()
+    results = _load_checkpoint(checkpoint_path)
+    pending = {normalize_title(t) for t in titles} - set(results) - {""}
+
+    limiter = RateLimiter(requests_per_second, burst=max_workers)
+
+    def classify(title):
+        def call():
+            limiter.acquire()
+            return get_industry(title, client)
+
+        return retry(call, RETRYABLE_ERRORS, attempts=attempts)
+
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {pool.submit(classify, title): title for title in pending}
+        for future in as_completed(futures):
+            title = futures[future]
+            results[title] = future.result()
+            if checkpoint:
+                row = {"title": title, "industry": results[title]}
+                checkpoint.write(json.dumps(row) + "\n")
+                checkpoint.flush()
+    finally:
+        # Drop queued titles if a call failed for good or we were interrupted
+        pool.shutdown(cancel_futures=True)
+        if checkpoint:
+            checkpoint.close()
+
+    return results
+
+
+def classify_cached(titles, db_path=DB_PATH, min_confidence=0.6, **kwargs):
+    """Cache first, then the local classifier, then the LLM for what is left.
+
+    Returns a dict of normalized title -> industry. LLM answers are added to
+    the persistent cache so the same title is never sent twice.
+    """
+    industries, ambiguous = classify_offline(titles, db_path, min_confidence)
+    if ambiguous:
+        answers = classify_titles(ambiguous, **kwargs)
+        answers = {
+            title: canonical_industry(answers[title]) or answers[title]
+            for title in ambiguous
+        }
+        with transaction(db_path) as conn:
+            store_cache(conn, answers, "llm")
+        industries.update(answers)
+    return industries
+
+
+def classify_people(people, **kwargs):
+    industries = classify_cached(people["Title"].dropna().unique(), **kwargs)
+    return people["Title"].map(normalize_title).map(industries).fillna(NO_TITLE)
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m modules.llm_industry
+    # Load data
+    people = pd.read_excel("data/crm_test_case_data.xlsx", sheet_name="People")
+
+    people["LLM_Industry"] = classify_people(people)
 
-people.to_csv("data/people_industry.csv", index=False)
+    people.to_csv("data/people_industry.csv", index=False)
@@ -1,16 +1,60 @@
+import json
 import pandas as pd
 import os
-import sqlite3
+import pyarrow as pa
+import pyarrow.feather as feather
+import tempfile
+import threading
 
+from modules.db import (
+    DB_PATH,
+    client_keys,
+    connect,
+    connection,
+    from_epoch,
+    init_db,
+)
+from modules.entity_resolution import resolve_people
+from modules.paths import GEOCODED_PATH, PEOPLE_PATH, SNAPSHOT_PATH, UPDATED_PATH
+from modules.rollups import sync_client_dims
 
-def load_people(path="data/people_industry.csv"):
-    updated_path = "data/updated_people.xlsx"
+# Low-cardinality columns kept as pandas categoricals in the loaded frame
+CATEGORICAL_COLUMNS = ["Status", "LLM_Industry", "Company"]
+
+
+def _file_signature(path):
+    # (mtime, size) is enough to notice an edited or replaced source file
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _replace_file(path, write):
+    # Write a temporary file next to the target and swap it in: readers never
+    # see a partial file, and concurrent writers never share a temporary file
+    root, ext = os.path.splitext(path)
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path) or ".",
+        prefix=os.path.basename(root) + ".",
+        suffix=ext,
+        delete=False,
+    ) as tmp:
+        tmp_path = tmp.name
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
-    if os.path.exists(updated_path):
-        df = pd.read_excel(updated_path, sheet_name="People")
-    else:
-        df = pd.read_csv(path)
 
+def _people_source(path):
+    return UPDATED_PATH if os.path.exists(UPDATED_PATH) else path
+
+
+def _prepare_people(df):
     # Ensure 'Status' column exists, default to "open"
     if "Status" not in df.columns:
         df["Status"] = "open"
@@ -21,24 +65,156 @@ def load_people(path="data/people_industry.csv"):
     df["Client ID"] = df["Name"].str.strip() + " @ " + df["Company"].str.strip()
     df = df.drop_duplicates(subset="Client ID", keep="first")
 
-    conn = sqlite3.connect("crm.db")
+    # Columns below are derived from crm.db on every load, drop stale copies
+    df = df.drop(
+        columns=["Last Contacted", "Latest Contacted", "Contact Count", "Client Key"],
+        errors="ignore",
+    )
 
-    overrides_df = pd.read_sql_query("SELECT * FROM industry_overrides", conn)
+    # Arrow needs one type per column; phone numbers mix ints and strings
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str))
+    return df.reset_index(drop=True)
 
-    # --- Load status + last contacted ---
-    status_df = pd.read_sql("SELECT * FROM client_status", conn)
-    status_df.rename(
-        columns={
-            "client_id": "Client ID",
-            "status": "Client Status",
-            "last_contacted": "Last Contacted",
-        },
-        inplace=True,
+
+# --- Columnar snapshot ---
+# Parsing the Excel/CSV source is by far the slowest part of a cold load, so
+# the prepared frame is kept as an uncompressed Arrow IPC (Feather v2) file
+# that is memory-mapped on read. The schema metadata records which source
+# file (and which version of it) the snapshot was built from.
+_SNAPSHOT_KEY = b"crm_source"
+
+
+def _source_stamp(source):
+    mtime_ns, size = _file_signature(source)
+    return json.dumps({"path": source, "mtime_ns": mtime_ns, "size": size})
+
+
+def _read_snapshot(stamp, path=SNAPSHOT_PATH):
+    try:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            if (reader.schema.metadata or {}).get(_SNAPSHOT_KEY) != stamp.encode():
+                return None
+            return reader.read_all().to_pandas()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+
+
+def _write_snapshot(df, stamp, path=SNAPSHOT_PATH):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _SNAPSHOT_KEY: stamp.encode()}
     )
-    status_df["Client ID"] = status_df["Client ID"].astype(str)
+    _replace_file(
+        path,
+        lambda tmp_path: feather.write_feather(
+            table, tmp_path, compression="uncompressed"
+        ),
+    )
+
+
+def _read_people_source(path):
+    source = _people_source(path)
+    stamp = _source_stamp(source)
+
+    df = _read_snapshot(stamp)
+    if df is not None:
+        return df
+
+    if source == UPDATED_PATH:
+        df = pd.read_excel(UPDATED_PATH, sheet_name="People")
+    else:
+        df = pd.read_csv(path)
+
+    df = _prepare_people(df)
+    _write_snapshot(df, stamp)
+    return df
+
+
+# The tables below are keyed by the legacy Client ID string; joining through
+# client_keys in SQLite hands pandas integer keys to merge on.
+def _read_keyed(conn, query, keys=None):
+    # ``query`` has a {where} slot for a filter on k.client_key; None reads
+    # every client
+    if keys is None:
+        return pd.read_sql_query(query.format(where=""), conn)
+    keys = [int(k) for k in keys]
+    # Stay under SQLite's bound-parameter limit
+    chunks = [keys[i : i + 500] for i in range(0, len(keys), 500)]
+    return pd.concat(
+        [
+            pd.read_sql_query(
+                query.format(
+                    where=f"WHERE k.client_key IN ({','.join('?' * len(chunk))})"
+                ),
+                conn,
+                params=chunk,
+            )
+            for chunk in chunks or [[-1]]
+        ],
+        ignore_index=True,
+    )
+
+
+def _dedupe_keys(df):
+    # A renamed client has rows under both ID strings, keep one per key
+    return df[~df.index.duplicated(keep="last")]
+
+
+def _read_status(conn, keys=None):
+    status_df = _read_keyed(
+        conn,
+        """
+        SELECT k.client_key AS "Client Key", s.status AS "Client Status"
+        FROM client_status s JOIN client_keys k ON k.legacy_id = s.client_id
+        {where}
+        ORDER BY s.rowid
+        """,
+        keys,
+    )
+    return _dedupe_keys(status_df.set_index("Client Key"))
+
+
+def _read_overrides(conn, keys=None):
+    overrides_df = _read_keyed(
+        conn,
+        """
+        SELECT k.client_key AS "Client Key", o.overridden_industry
+        FROM industry_overrides o JOIN client_keys k ON k.legacy_id = o.client_id
+        {where}
+        ORDER BY o.rowid
+        """,
+        keys,
+    )
+    return _dedupe_keys(overrides_df.set_index("Client Key"))["overridden_industry"]
+
+
+def _read_contacts(conn, keys=None):
+    # Latest contact per client, maintained by a trigger on logs
+    contacts_df = _read_keyed(
+        conn,
+        """
+        SELECT k.client_key AS "Client Key",
+               MAX(c.last_contacted) AS "Last Contacted",
+               SUM(c.contact_count) AS "Contact Count"
+        FROM client_contact c JOIN client_keys k ON k.legacy_id = c.client_id
+        {where}
+        GROUP BY k.client_key
+        """,
+        keys,
+    )
+    contacts_df["Last Contacted"] = from_epoch(contacts_df["Last Contacted"])
+    return contacts_df.set_index("Client Key")
+
 
-    # --- Load call logs ---
-    logs_df = pd.read_sql_query("SELECT * FROM logs", conn)
+def _read_logs(conn, since_id=0, until_id=None):
+    logs_df = pd.read_sql_query(
+        "SELECT * FROM logs WHERE id > ? AND id <= ? ORDER BY id",
+        conn,
+        params=(since_id, 2**63 - 1 if until_id is None else until_id),
+    )
     logs_df.rename(
         columns={
             "client_id": "Client ID",
@@ -48,46 +224,292 @@ def load_people(path="data/people_industry.csv"):
         inplace=True,
     )
     logs_df["Client ID"] = logs_df["Client ID"].astype(str)
+    logs_df["Client Key"] = client_keys(conn, logs_df["Client ID"])
+    logs_df["Call Timestamp"] = from_epoch(logs_df["Call Timestamp"])
+    return logs_df
+
+
+class Snapshot:
+    """One published version of the people frame and the logs behind it.
+
+    Snapshots are shared by every session in the process and never change;
+    a write publishes a new one with a higher ``version``. Columns the write
+    did not touch are the same arrays in both versions. The logs frame is
+    only read from crm.db if someone asks for it.
+    """
+
+    def __init__(self, version, people, db_path, last_log_id):
+        self.version = version
+        self.people = people
+        self._db_path = db_path
+        self._last_log_id = last_log_id
+        self._logs = None
+        self._lock = threading.Lock()
+
+    @property
+    def logs(self):
+        with self._lock:
+            if self._logs is None:
+                with connection(self._db_path) as conn:
+                    self._logs = _read_logs(conn, until_id=self._last_log_id)
+            return self._logs
+
+
+class PeopleStore:
+    """Process-wide people snapshots that follow the source files and crm.db.
+
+    A full rebuild only happens when a source file changes. Otherwise the
+    SQLite ``data_version`` tells us whether anything was committed since the
+    last call (by any session or process). If so, only log rows past the last
+    id seen and the clients listed in ``client_changes`` past the last seq
+    seen are read and merged into a new snapshot, copy-on-write per column.
+    Callers must not modify the frames in place.
+    """
+
+    def __init__(self, path, db_path=DB_PATH):
+        self.path = path
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._db_inode = None
+        self._source_sig = None
+        self._data_version = None
+        self.version = 0
+        self.people = None
+        self.snapshot = None
+
+    def get(self):
+        with self._lock:
+            self._refresh()
+            return self.snapshot
 
-    conn.close()
-
-    overrides_df.rename(columns={"client_id": "Client ID"}, inplace=True)
-
-    # Merge override if any
-    if not overrides_df.empty:
-        df = df.merge(overrides_df, on="Client ID", how="left")
-        # Use override if available, else fallback to auto-assigned
-        df["LLM_Industry"] = df["overridden_industry"].combine_first(df["LLM_Industry"])
-        df.drop(columns=["overridden_industry"], inplace=True, errors="ignore")
-
-    # --- Merge in status ---
-    if not status_df.empty:
-        df = df.merge(status_df, on="Client ID", how="left")
-        df["Status"] = df["Client Status"].combine_first(df["Status"])
-        df.drop(columns=["Client Status"], inplace=True, errors="ignore")
-    # --- Merge in latest contact date from logs (optional alternative to status table) ---
-    if not logs_df.empty:
-        latest_contact = (
-            logs_df.groupby("Client ID")["Call Timestamp"]
-            .max()
-            .reset_index()
-            .rename(columns={"Call Timestamp": "Latest Contacted"})
+    def _publish(self, people):
+        self.version += 1
+        self.people = people
+        self.snapshot = Snapshot(self.version, people, self.db_path, self._last_log_id)
+
+    # --- change detection ---
+    def _source_signature(self):
+        return (
+            _file_signature(UPDATED_PATH),
+            _file_signature(self.path),
+            _file_signature(SNAPSHOT_PATH),
+        )
+
+    def _connection(self):
+        # data_version is per connection, so keep one open for the store. A
+        # replaced database file (new inode) needs a fresh connection.
+        try:
+            inode = os.stat(self.db_path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self._conn is None or inode != self._db_inode:
+            if self._conn is not None:
+                self._conn.close()
+            init_db(self.db_path)
+            self._conn = connect(self.db_path)
+            self._db_inode = inode
+            self._data_version = None
+        return self._conn
+
+    def _refresh(self):
+        conn = self._connection()
+        source_sig = self._source_signature()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+        if self.people is None or source_sig != self._source_sig:
+            self._full_load(conn)
+            # Loading may have (re)written the snapshot
+            source_sig = self._source_signature()
+        elif data_version != self._data_version:
+            self._apply_deltas(conn)
+        else:
+            return
+
+        self._source_sig = source_sig
+        self._data_version = data_version
+
+    # --- loading ---
+    def _full_load(self, conn):
+        df = _read_people_source(self.path)
+        # The same person under a differently spelled ID is one row, see
+        # modules/entity_resolution.py
+        df = resolve_people(conn, df)
+        df["Client Key"] = client_keys(conn, df["Client ID"])
+        self._base_status = df["Status"].astype(object)
+        self._base_industry = df["LLM_Industry"].astype(object)
+        self._positions = pd.Index(df["Client Key"])
+
+        # One read transaction, so the change and log positions match the rows
+        with conn:
+            conn.execute("BEGIN")
+            overrides = _read_overrides(conn)
+            status = _read_status(conn)
+            contacts = _read_contacts(conn)
+            self._last_change = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM client_changes"
+            ).fetchone()[0]
+            self._last_log_id, self._log_count = conn.execute(
+                "SELECT COALESCE(MAX(id), 0), COUNT(*) FROM logs"
+            ).fetchone()
+
+        # Merge override if any
+        df["LLM_Industry"] = (
+            df["Client Key"].map(overrides).combine_first(self._base_industry)
         )
-        df = df.merge(latest_contact, on="Client ID", how="left")
 
-    return df, logs_df
+        # --- Merge in status ---
+        status = status.reindex(df["Client Key"])
+        df["Status"] = pd.Series(
+            status["Client Status"].to_numpy(), index=df.index
+        ).combine_first(self._base_status)
+
+        # --- Merge in latest contact date and contact count ---
+        contacts = contacts.reindex(df["Client Key"])
+        df["Last Contacted"] = contacts["Last Contacted"].to_numpy()
+        df["Contact Count"] = contacts["Contact Count"].fillna(0).astype(int).to_numpy()
+
+        # The weekly rollup counts contacts under each client's current values
+        sync_client_dims(conn, df["Client Key"], df["Status"], df["LLM_Industry"])
+
+        for col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype("category")
+        self._publish(df)
+
+    def _apply_deltas(self, conn):
+        new_logs = _read_logs(conn, self._last_log_id)
+        log_count = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        if log_count != self._log_count + len(new_logs):
+            # Rows were deleted or rewritten, deltas cannot describe that
+            self._full_load(conn)
+            return
+
+        # Clients whose status or override changed since the last read, from
+        # the trigger-maintained client_changes log
+        changes = conn.execute(
+            "SELECT seq, client_key FROM client_changes WHERE seq > ? ORDER BY seq",
+            (self._last_change,),
+        ).fetchall()
+        if new_logs.empty and not changes:
+            return
+
+        # Earlier snapshots stay untouched: _set_rows gives each changed column
+        # a new array and every other column is shared with them
+        df = self.people.copy(deep=False)
+        updated = False
+
+        if changes:
+            pos = self._rows_for(pd.unique(pd.Series([key for _, key in changes])))
+            keys = df["Client Key"].iloc[pos]
+            industry = (
+                _read_overrides(conn, keys)
+                .reindex(keys)
+                .combine_first(self._base_industry.iloc[pos].set_axis(keys))
+            )
+            status = (
+                _read_status(conn, keys)["Client Status"]
+                .reindex(keys)
+                .combine_first(self._base_status.iloc[pos].set_axis(keys))
+            )
+            for column, values in [("LLM_Industry", industry), ("Status", status)]:
+                current = df[column].iloc[pos].astype(object).set_axis(keys)
+                if not current.equals(values):
+                    _set_rows(df, pos, column, values.to_numpy())
+                    updated = True
+            self._last_change = changes[-1][0]
+
+        if not new_logs.empty:
+            pos = self._rows_for(new_logs["Client Key"].unique())
+            keys = df["Client Key"].iloc[pos]
+            contacts = _read_contacts(conn, keys).reindex(keys)
+            _set_rows(df, pos, "Last Contacted", contacts["Last Contacted"].to_numpy())
+            _set_rows(
+                df,
+                pos,
+                "Contact Count",
+                contacts["Contact Count"].fillna(0).astype(int).to_numpy(),
+            )
+            self._last_log_id = int(new_logs["id"].max())
+            self._log_count = log_count
+            updated = True
+
+        # A rewrite to the same value, or of a client not in the frame, keeps
+        # the current snapshot (and every cache keyed on its frame)
+        if updated:
+            self._publish(df)
+
+    def _rows_for(self, keys):
+        pos = self._positions.get_indexer(keys)
+        return pos[pos >= 0]
+
+
+def _set_rows(df, pos, column, values):
+    # Replaces the column with an edited copy instead of writing into it, the
+    # old array may belong to a published snapshot
+    updated = df[column].copy()
+    # Categorical columns only accept known values, add new ones first
+    if isinstance(updated.dtype, pd.CategoricalDtype):
+        new = pd.Index(pd.unique(values)).dropna().difference(updated.cat.categories)
+        if len(new):
+            updated = updated.cat.add_categories(new)
+    updated.iloc[pos] = values
+    df[column] = updated
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def people_snapshot(path=PEOPLE_PATH):
+    """The current Snapshot, shared by all sessions of this process."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = PeopleStore(path)
+    return store.get()
+
+
+def load_people(path=PEOPLE_PATH):
+    # (people, logs) as before; reads the logs frame on first use
+    snapshot = people_snapshot(path)
+    return snapshot.people, snapshot.logs
+
+
+def __getattr__(name):
+    # Older scripts read ``load_data.df`` / ``load_data.logs``; load them on first
+    # access instead of at import so importing this module stays free.
+    if name == "df":
+        return people_snapshot().people
+    if name == "logs":
+        return people_snapshot().logs
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def save_people(df, path=UPDATED_PATH):
+    def write(tmp_path):
+        with pd.ExcelWriter(tmp_path, engine="openpyxl", mode="w") as writer:
+            df.to_excel(writer, sheet_name="People", index=False)
 
+    # The workbook is the durable copy; the snapshot only saves the next load
+    # from parsing it again, and is stamped with the file just written
+    _replace_file(path, write)
+    if path == UPDATED_PATH:
+        _write_snapshot(_prepare_people(df.copy()), _source_stamp(path))
 
-df, logs = load_people()  # .columns
 
+_companies = {}
 
-def save_people(df, path="data/updated_people.xlsx"):
-    with pd.ExcelWriter(path, engine="openpyxl", mode="w") as writer:
-        df.to_excel(writer, sheet_name="People", index=False)
 
+def load_companies(path=GEOCODED_PATH):
+    # Reruns get the same frame until the CSV changes, which keeps the company
+    # search index (keyed on the frame) valid. Do not modify it in place.
+    signature = _file_signature(path)
+    cached = _companies.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
 
-def load_companies(path="data/companies_geocoded.csv"):
     com_df = pd.read_csv(path)
     com_df = com_df.rename(columns={"Revenue (in Millions)": "Revenue"})
 
+    _companies[path] = (signature, com_df)
     return com_df
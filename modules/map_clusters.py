@@ -0,0 +1,163 @@
+### Grid clustering of company locations for the Companies map ###
+
+import math
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 5000  # markers per render, individual companies or clusters
+MAX_LEVEL = 18
+# Cells are web-mercator tiles this many levels below the map zoom, i.e.
+# about 32 px wide on screen
+LEVEL_OFFSET = 3
+CACHE_SIZE = 16
+MAP_WIDTH_PX = 1200
+MAP_HEIGHT_PX = 500
+MAX_LATITUDE = 85.0511
+
+
+def _tile_xy(lat, lon, level):
+    n = 2**level
+    x = np.clip(((lon + 180.0) / 360.0 * n).astype(np.int64), 0, n - 1)
+    lat = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * n
+    return x, np.clip(y.astype(np.int64), 0, n - 1)
+
+
+def viewport(center, zoom, width_px=MAP_WIDTH_PX, height_px=MAP_HEIGHT_PX):
+    """(lat_min, lat_max, lon_min, lon_max) visible around ``center`` at ``zoom``."""
+    lat, lon = center
+    # 256 px tiles: the world is 256 * 2**zoom px wide in mercator space
+    world = 256 * 2**zoom
+    half_lon = width_px / world * 180.0
+    y = math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+    half_y = height_px / world * math.pi
+    lat_min = math.degrees(2 * math.atan(math.exp(y - half_y)) - math.pi / 2)
+    lat_max = math.degrees(2 * math.atan(math.exp(y + half_y)) - math.pi / 2)
+    if half_lon >= 180:
+        return lat_min, lat_max, -180.0, 180.0
+    return lat_min, lat_max, lon - half_lon, lon + half_lon
+
+
+def _in_view(lat, lon, bbox):
+    lat_min, lat_max, lon_min, lon_max = bbox
+    inside = (lat >= lat_min) & (lat <= lat_max)
+    if lon_min < -180:
+        return inside & ((lon >= lon_min + 360) | (lon <= lon_max))
+    if lon_max > 180:
+        return inside & ((lon >= lon_min) | (lon <= lon_max - 360))
+    return inside & (lon >= lon_min) & (lon <= lon_max)
+
+
+class MapClusters:
+    """Multi-resolution grid clusters of one filtered set of companies.
+
+    Each level groups the companies by web-mercator tile and keeps the
+    centroid, company count, revenue sum and most common industry per tile.
+    Levels are computed with NumPy on first use and then kept.
+    """
+
+    def __init__(self, companies):
+        self.points = companies.dropna(subset=["Latitude", "Longitude"])
+        self._lat = self.points["Latitude"].to_numpy(dtype=float)
+        self._lon = self.points["Longitude"].to_numpy(dtype=float)
+        self._revenue = self.points["Revenue"].fillna(0).to_numpy(dtype=float)
+        industry = self.points["Industry"].astype("category")
+        self._industry_codes = industry.cat.codes.to_numpy()
+        self._industries = industry.cat.categories
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.points)
+
+    def center(self):
+        if not len(self):
+            return 0.0, 0.0
+        return float(np.median(self._lat)), float(np.median(self._lon))
+
+    def level(self, level):
+        with self._lock:
+            if level not in self._levels:
+                self._levels[level] = self._cluster(level)
+            return self._levels[level]
+
+    def _cluster(self, level):
+        x, y = _tile_xy(self._lat, self._lon, level)
+        cells, inverse = np.unique(x * 2**level + y, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(cells))
+
+        # Most common industry per cell from a cells x industries count table
+        n_industries = len(self._industries)
+        if n_industries:
+            codes = np.where(self._industry_codes < 0, 0, self._industry_codes)
+            table = np.bincount(
+                inverse * n_industries + codes, minlength=len(cells) * n_industries
+            ).reshape(len(cells), n_industries)
+            industry = self._industries.take(table.argmax(axis=1))
+        else:
+            industry = [None] * len(cells)
+
+        return pd.DataFrame(
+            {
+                "Latitude": np.bincount(inverse, self._lat, len(cells)) / counts,
+                "Longitude": np.bincount(inverse, self._lon, len(cells)) / counts,
+                "Companies": counts,
+                "Revenue": np.bincount(inverse, self._revenue, len(cells)),
+                "Industry": np.asarray(industry, dtype=object),
+            }
+        )
+
+    def view(self, zoom, bbox=None, max_points=MAX_POINTS):
+        """Markers for one render: the companies themselves or grid clusters.
+
+        All companies are returned when there are at most ``max_points``, so
+        the map can be panned freely. Only larger sets are culled to ``bbox``:
+        the companies in it if few enough, else clusters at the finest level
+        that fits the cap.
+        """
+        points = self.points
+        if len(points) > max_points and bbox is not None:
+            points = points[_in_view(self._lat, self._lon, bbox)]
+        if len(points) <= max_points:
+            return {"data": points, "clustered": False, "level": None}
+
+        for level in range(min(zoom + LEVEL_OFFSET, MAX_LEVEL), -1, -1):
+            clusters = self.level(level)
+            if bbox is not None:
+                clusters = clusters[
+                    _in_view(
+                        clusters["Latitude"].to_numpy(),
+                        clusters["Longitude"].to_numpy(),
+                        bbox,
+                    )
+                ]
+            if len(clusters) <= max_points:
+                break
+        return {"data": clusters, "clustered": True, "level": level}
+
+
+# Clusters per filter state of a loaded companies frame, most recent kept.
+_clusters = OrderedDict()
+_clusters_lock = threading.Lock()
+
+
+def map_clusters(companies, filter_key, filtered):
+    """Cached MapClusters for ``filtered``, the rows of ``companies`` selected
+    by the filters in ``filter_key`` (any hashable)."""
+    key = (id(companies), filter_key)
+    with _clusters_lock:
+        entry = _clusters.get(key)
+        if entry is not None and entry[0]() is companies:
+            _clusters.move_to_end(key)
+            return entry[1]
+
+    clusters = MapClusters(filtered)
+    with _clusters_lock:
+        _clusters[key] = (weakref.ref(companies), clusters)
+        if len(_clusters) > CACHE_SIZE:
+            _clusters.popitem(last=False)
+    return clusters
@@ -0,0 +1,98 @@
+### Server-side paging and sorting for the dashboard tables ###
+
+import math
+import threading
+import weakref
+
+import numpy as np
+
+PAGE_SIZE = 50
+
+
+class PagedTable:
+    """Pages of one loaded frame, sorted and projected before they are sent.
+
+    Sort orders are computed once per column and direction and kept, so a
+    page request is a filter of a cached order plus a slice; only the rows
+    on the page are ever copied.
+    """
+
+    def __init__(self, frame):
+        self._frame = weakref.ref(frame)
+        self.size = len(frame)
+        self._orders = {}
+        self._last = None
+        self._lock = threading.Lock()
+
+    def order(self, column, ascending=True):
+        """Row positions sorted by ``column``, missing values last."""
+        key = (column, ascending)
+        with self._lock:
+            if key not in self._orders:
+                values = self._frame()[column].reset_index(drop=True)
+                self._orders[key] = values.sort_values(
+                    ascending=ascending, kind="stable", na_position="last"
+                ).index.to_numpy()
+            return self._orders[key]
+
+    def rows(self, positions=None, sort=None, ascending=True):
+        """Positions to show: ``positions`` (all rows if None) in display order.
+
+        Without ``sort`` the given order is kept, e.g. search rank.
+        """
+        if sort is None:
+            return np.arange(self.size) if positions is None else positions
+        order = self.order(sort, ascending)
+        if positions is None:
+            return order
+
+        last = self._last
+        if last is not None and last[0] is positions and last[1] == (sort, ascending):
+            return last[2]
+        keep = np.zeros(self.size, dtype=bool)
+        keep[positions] = True
+        rows = order[keep[order]]
+        self._last = (positions, (sort, ascending), rows)
+        return rows
+
+    def page(
+        self,
+        positions=None,
+        sort=None,
+        ascending=True,
+        page=0,
+        page_size=PAGE_SIZE,
+        columns=None,
+    ):
+        """(rows of the page, total row count, page count)."""
+        rows = self.rows(positions, sort, ascending)
+        pages = max(1, math.ceil(len(rows) / page_size))
+        page = min(max(page, 0), pages - 1)
+        shown = self._frame().take(rows[page * page_size : (page + 1) * page_size])
+        if columns is not None:
+            shown = shown[columns]
+        # A categorical column would otherwise ship every category with the page
+        for col in shown.columns[shown.dtypes == "category"]:
+            shown[col] = shown[col].cat.remove_unused_categories()
+        return shown, len(rows), pages
+
+
+# One table per live frame, like the filter index
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def paged_table(frame):
+    key = id(frame)
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is not None and entry[0]() is frame:
+            return entry[1]
+
+    table = PagedTable(frame)
+    with _tables_lock:
+        _tables[key] = (
+            weakref.ref(frame, lambda _: _tables.pop(key, None)),
+            table,
+        )
+    return table
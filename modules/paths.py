@@ -0,0 +1,8 @@
+### Data file locations shared by the loaders and the offline jobs ###
+
+PEOPLE_PATH = "data/people_industry.csv"
+# Written by save_people, and read instead of PEOPLE_PATH once it exists
+UPDATED_PATH = "data/updated_people.xlsx"
+# Parsed copy of the people source, see modules/load_data.py
+SNAPSHOT_PATH = "data/people_snapshot.arrow"
+GEOCODED_PATH = "data/companies_geocoded.csv"
@@ -0,0 +1,164 @@
+### Per-rerun stage timings: wall time, rows and memory, JSONL log, cProfile ###
+
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import logging.handlers
+import os
+import pstats
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PERF_DIR = "perf"
+PERF_LOG = os.path.join(PERF_DIR, "reruns.jsonl")
+LOG_BYTES = 5 * 2**20
+LOG_BACKUPS = 3
+# Share of reruns logged while nobody asked for timings (debug panel closed)
+LOG_SAMPLE = 0.02
+
+_current = contextvars.ContextVar("crm_rerun", default=None)
+_logger = None
+
+
+def _rss_bytes():
+    # Resident set size from /proc; None where that does not exist
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _perf_logger(path=PERF_LOG):
+    # One rotating file handler per process, a line of JSON per rerun
+    global _logger
+    if _logger is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("crm.perf")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+class Stage:
+    """One timed block; set ``rows`` inside it to record how many it processed."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.ms = None
+        self.rss_delta_mb = None
+
+    def record(self):
+        return {
+            "stage": self.name,
+            "ms": self.ms,
+            "rows": self.rows,
+            "rss_delta_mb": self.rss_delta_mb,
+        }
+
+
+class Rerun:
+    """Stages timed during one script run, in the order they finished."""
+
+    def __init__(self, profile=False, log=True):
+        self.started = datetime.now()
+        self.log = log
+        self._start = time.perf_counter()
+        self.stages = []
+        self._path = []
+        self.profile = None
+        self._profiler = None
+        if profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self.profile, self._profiler = self._profiler, None
+
+    def finish(self, log_path=PERF_LOG):
+        """Stop timing; returns the record, appended to the JSONL log if ``log``."""
+        self.stop_profile()
+        record = {
+            "time": self.started.isoformat(timespec="seconds"),
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "stages": [stage.record() for stage in self.stages],
+        }
+        if log_path and self.log:
+            _perf_logger(log_path).info(json.dumps(record))
+        if _current.get() is self:
+            _current.set(None)
+        return record
+
+    def profile_text(self, limit=25, sort="cumulative"):
+        """The profiled rerun's top functions, as pstats prints them."""
+        if self.profile is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump_profile(self, directory=PERF_DIR):
+        """Save the profile for snakeviz/pstats; returns the file path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory, f"rerun-{self.started:%Y%m%d-%H%M%S}.prof"
+        )
+        self.profile.dump_stats(path)
+        return path
+
+
+def start_rerun(profile=False, log=False):
+    """Begin recording a rerun; stages run afterwards in this thread join it.
+
+    Profiled reruns and those started with ``log`` are written to the JSONL
+    log, of the others only a LOG_SAMPLE share.
+    """
+    previous = _current.get()
+    if previous is not None:
+        # The last run never reached finish(); it is not logged
+        previous.stop_profile()
+    rerun = Rerun(profile, log=log or profile or random.random() < LOG_SAMPLE)
+    _current.set(rerun)
+    return rerun
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Time a block as a named stage of the current rerun.
+
+    Nested stages are recorded as "outer/inner". Outside a rerun the block
+    still runs, untimed.
+    """
+    rerun = _current.get()
+    if rerun is None:
+        yield Stage(name)
+        return
+
+    rerun._path.append(name)
+    current = Stage("/".join(rerun._path))
+    current.rows = rows
+    rss = _rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.ms = round((time.perf_counter() - start) * 1000, 2)
+        after = _rss_bytes()
+        if rss is not None and after is not None:
+            current.rss_delta_mb = round((after - rss) / 2**20, 2)
+        rerun._path.pop()
+        rerun.stages.append(current)
+
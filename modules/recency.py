@@ -0,0 +1,135 @@
+### Contact recency of the clients in a filter: windows, buckets, stale clients ###
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+BUCKET_DAYS = (7, 30, 90)
+STALE_DAYS = 90
+
+
+def _cutoff(now, days):
+    return np.datetime64(now - pd.Timedelta(days=days), "ns")
+
+
+class RecencyIndex:
+    """Latest contact per client of one people frame, sorted once.
+
+    Contact dates are parsed a single time when the index is built. For a
+    filter (row positions as ``ClientFilterIndex`` gives them, None for all
+    rows) each client's latest contact is kept in ascending order, so any
+    number of windows is counted with one ``searchsorted`` call.
+    """
+
+    def __init__(self, people, column="Last Contacted"):
+        self.size = len(people)
+        times = pd.to_datetime(people[column], errors="coerce")
+        self.times = times.to_numpy(dtype="datetime64[ns]")
+        self._clients, ids = pd.factorize(people["Client ID"])
+        # One row per client is the usual case and skips de-duplication
+        self._one_row_each = len(ids) == self.size
+
+        missing = np.isnat(self.times)
+        self._never = np.flatnonzero(missing)
+        known = np.flatnonzero(~missing)
+        self._known = known[np.argsort(self.times[known], kind="stable")]
+        self._last = None
+
+    def _latest_rows(self, rows):
+        # Row holding each client's latest contact, contacted clients oldest
+        # first, and one row per client that was never contacted
+        if rows is None:
+            known, never = self._known, self._never
+        else:
+            keep = np.zeros(self.size, dtype=bool)
+            keep[rows] = True
+            known = self._known[keep[self._known]]
+            never = self._never[keep[self._never]]
+        if self._one_row_each:
+            return known, never
+
+        # The last occurrence of a client in ascending order is its latest
+        reverse = self._clients[known][::-1]
+        _, first = np.unique(reverse, return_index=True)
+        known = known[np.sort(len(known) - 1 - first)]
+        contacted = np.zeros(self._clients.max() + 1, dtype=bool)
+        contacted[self._clients[known]] = True
+        never = never[~contacted[self._clients[never]]]
+        _, first = np.unique(self._clients[never], return_index=True)
+        return known, never[np.sort(first)]
+
+    def latest(self, rows=None):
+        """(rows of contacted clients oldest first, their dates, rows never contacted)."""
+        last = self._last
+        if last is not None and last[0] is rows:
+            return last[1]
+        known, never = self._latest_rows(rows)
+        self._last = (rows, (known, self.times[known], never))
+        return self._last[1]
+
+    def counts(self, rows=None, windows=(7, 30), now=None):
+        """Clients whose latest contact falls in each window, keyed by window.
+
+        A window is a number of days back from ``now`` (today by default) or
+        a ``(start, end)`` pair of dates, ``end`` exclusive.
+        """
+        now = pd.Timestamp.today() if now is None else pd.Timestamp(now)
+        _, times, _ = self.latest(rows)
+        bounds = []
+        for window in windows:
+            if isinstance(window, tuple):
+                start, end = (np.datetime64(pd.Timestamp(v), "ns") for v in window)
+            else:
+                start, end = _cutoff(now, window), np.datetime64("NaT")
+            bounds += [start, end]
+        # NaT sorts after every date, so an open end counts to the last contact
+        found = np.searchsorted(times, np.array(bounds, dtype="datetime64[ns]"))
+        return {
+            window: int(stop - start)
+            for window, start, stop in zip(windows, found[::2], found[1::2])
+        }
+
+    def buckets(self, rows=None, days=BUCKET_DAYS, now=None):
+        """Clients per time since their latest contact, newest bucket first."""
+        now = pd.Timestamp.today() if now is None else pd.Timestamp(now)
+        _, times, never = self.latest(rows)
+        cutoffs = np.array([_cutoff(now, d) for d in days], dtype="datetime64[ns]")
+        edges = np.concatenate([[len(times)], np.searchsorted(times, cutoffs), [0]])
+        labels = [f"≤ {days[0]} days"]
+        labels += [f"{lo + 1}–{hi} days" for lo, hi in zip(days, days[1:])]
+        labels += [f"> {days[-1]} days", "Never"]
+        return pd.Series(
+            np.append(edges[:-1] - edges[1:], len(never)),
+            index=labels,
+            name="Clients",
+        )
+
+    def stale(self, rows=None, days=STALE_DAYS, now=None):
+        """Rows of clients not contacted in ``days``: never contacted, then oldest."""
+        now = pd.Timestamp.today() if now is None else pd.Timestamp(now)
+        known, times, never = self.latest(rows)
+        older = np.searchsorted(times, _cutoff(now, days))
+        return np.concatenate([never, known[:older]])
+
+
+# One index per loaded people frame, like the filter index
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def recency_index(people):
+    key = id(people)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is not None and entry[0]() is people:
+            return entry[1]
+
+    index = RecencyIndex(people)
+    with _indexes_lock:
+        _indexes[key] = (
+            weakref.ref(people, lambda _: _indexes.pop(key, None)),
+            index,
+        )
+    return index
@@ -0,0 +1,119 @@
+### Weekly contact rollup: client dimension sync, reads and backfill ###
+
+import argparse
+
+import pandas as pd
+
+from modules.db import (
+    DB_PATH,
+    connection,
+    init_db,
+    init_dims_changes,
+    move_contacts,
+    rebuild_weekly_rollup,
+    transaction,
+)
+
+
+def sync_client_dims(conn, keys, statuses, industries):
+    """Bring client_dims in line with a loaded people frame.
+
+    Only clients whose status or industry differs from the stored one are
+    moved; returns how many that were. Writes in between (update_status,
+    save_industry_override) keep client_dims current themselves, so a frame
+    identical to the last one synced is skipped.
+    """
+    dims = pd.DataFrame(
+        {
+            "client_key": keys,
+            "status": pd.Series(statuses, dtype=object).fillna("").to_numpy(),
+            "industry": pd.Series(industries, dtype=object).fillna("").to_numpy(),
+        }
+    )
+    # Rows without an ID have key -1; a client listed twice keeps its first row
+    dims = dims[dims["client_key"] >= 0].drop_duplicates("client_key")
+    fingerprint = f"{int(pd.util.hash_pandas_object(dims, index=False).sum()):016x}"
+
+    with conn:
+        seen = conn.execute("SELECT fingerprint FROM client_dims_state").fetchone()
+        if seen and seen[0] == fingerprint:
+            return 0
+        conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS dims_staging (
+                client_key INTEGER PRIMARY KEY, status TEXT, industry TEXT
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO dims_staging (client_key, status, industry) VALUES (?, ?, ?)",
+            zip(
+                dims["client_key"].astype(int),
+                dims["status"].astype(str),
+                dims["industry"].astype(str),
+            ),
+        )
+        init_dims_changes(conn)
+        changed = conn.execute(
+            """
+            INSERT INTO dims_changes (client_key, status, industry)
+            SELECT s.client_key, s.status, s.industry
+            FROM dims_staging s LEFT JOIN client_dims d USING (client_key)
+            WHERE d.client_key IS NULL
+               OR d.status != s.status OR d.industry != s.industry
+            """
+        ).rowcount
+        conn.execute("DELETE FROM dims_staging")
+        move_contacts(conn)
+        conn.execute(
+            "REPLACE INTO client_dims_state (id, fingerprint) VALUES (1, ?)",
+            (fingerprint,),
+        )
+    return changed
+
+
+def weekly_contacts(statuses=None, industry=None, db_path=DB_PATH):
+    """Contacts per week (Monday start) and current client status.
+
+    ``statuses`` and ``industry`` restrict the clients counted the way the
+    sidebar filters do; None (or no statuses selected) means all of them.
+    """
+    where = []
+    params = []
+    if statuses:
+        where.append(f"status IN ({','.join('?' * len(statuses))})")
+        params += list(statuses)
+    if industry is not None:
+        where.append("industry = ?")
+        params.append(industry)
+
+    init_db(db_path)
+    with connection(db_path) as conn:
+        weekly = pd.read_sql_query(
+            f"""
+            SELECT week AS "Week", status AS "Status", SUM(contacts) AS "Contacts"
+            FROM contact_weekly
+            {"WHERE " + " AND ".join(where) if where else ""}
+            GROUP BY week, status
+            ORDER BY week, status
+            """,
+            conn,
+            params=params,
+        )
+    weekly["Week"] = pd.to_datetime(weekly["Week"])
+    return weekly
+
+
+if __name__ == "__main__":
+    # Run from the repository root:
+    #   python -m modules.rollups    (recount contact_weekly from all logs)
+    parser = argparse.ArgumentParser(description="Backfill the weekly contact rollup")
+    parser.parse_args()
+
+    init_db()
+    with transaction() as conn:
+        rebuild_weekly_rollup(conn)
+        weeks = conn.execute(
+            "SELECT COUNT(DISTINCT week), SUM(contacts) FROM contact_weekly"
+        ).fetchone()
+    print(f"Counted {weeks[1] or 0} contacts over {weeks[0]} weeks")
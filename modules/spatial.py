@@ -0,0 +1,169 @@
+### Spatial index over geocoded companies: radius, nearest, box and territory queries ###
+
+import threading
+import weakref
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def _unit_xyz(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack(
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)]
+    )
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles, vectorized over any of the arguments."""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _chord(miles):
+    # Straight-line distance between two points on the unit sphere that are
+    # ``miles`` apart along the surface; the KD tree works in these units.
+    return 2 * np.sin(np.minimum(miles / EARTH_RADIUS_MILES, np.pi) / 2)
+
+
+def _arc_miles(chord):
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def _in_polygon(lat, lon, polygon):
+    # Even-odd ray casting, one vectorized pass per polygon edge
+    poly_lat, poly_lon = np.asarray(polygon, dtype=float).T
+    inside = np.zeros(len(lat), dtype=bool)
+    for i in range(len(poly_lat)):
+        lat1, lon1 = poly_lat[i - 1], poly_lon[i - 1]
+        lat2, lon2 = poly_lat[i], poly_lon[i]
+        crosses = (lat1 > lat) != (lat2 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            edge_lon = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+        inside ^= crosses & (lon < edge_lon)
+    return inside
+
+
+class SpatialIndex:
+    """KD tree over unit-sphere coordinates of the companies with a location.
+
+    Queries return row positions into the frame the index was built from,
+    nearest first where a distance applies and in no particular order for
+    box and polygon queries.
+    """
+
+    def __init__(self, companies, leaf_size=40):
+        lat = companies["Latitude"].to_numpy(dtype=float)
+        lon = companies["Longitude"].to_numpy(dtype=float)
+        located = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        self.size = len(companies)
+        self.positions = located
+        self.lat = lat[located]
+        self.lon = lon[located]
+        self._tree = (
+            KDTree(_unit_xyz(self.lat, self.lon), leaf_size=leaf_size)
+            if len(located)
+            else None
+        )
+        # Latitude-sorted order for box queries
+        self._by_lat = np.argsort(self.lat, kind="stable")
+        self._sorted_lat = self.lat[self._by_lat]
+        self._lon_by_lat = self.lon[self._by_lat]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def within(self, lat, lon, miles):
+        """(positions, miles) of companies within ``miles`` of a point."""
+        if not len(self):
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        found, chords = self._tree.query_radius(
+            _unit_xyz([lat], [lon]),
+            r=_chord(miles),
+            return_distance=True,
+            sort_results=True,
+        )
+        return self.positions[found[0]], _arc_miles(chords[0])
+
+    def nearest(self, lat, lon, k=10, allowed=None):
+        """(positions, miles) of the ``k`` companies closest to a point.
+
+        ``allowed`` is an optional boolean mask over the frame's rows, e.g. the
+        rows left by other filters; the search widens until ``k`` of them
+        are found.
+        """
+        n = min(k if allowed is None else 4 * k, len(self))
+        while True:
+            if not n:
+                return np.empty(0, dtype=np.intp), np.empty(0)
+            chords, found = self._tree.query(_unit_xyz([lat], [lon]), k=n)
+            positions, miles = self.positions[found[0]], _arc_miles(chords[0])
+            if allowed is not None:
+                keep = allowed[positions]
+                positions, miles = positions[keep], miles[keep]
+            if len(positions) >= k or n == len(self):
+                return positions[:k], miles[:k]
+            n = min(4 * n, len(self))
+
+    def _box_rows(self, lat_min, lat_max, lon_min, lon_max):
+        start = np.searchsorted(self._sorted_lat, lat_min, "left")
+        stop = np.searchsorted(self._sorted_lat, lat_max, "right")
+        # Contiguous slices of the latitude band, only the hits are gathered
+        lon = self._lon_by_lat[start:stop]
+        if lon_min <= lon_max:
+            inside = (lon >= lon_min) & (lon <= lon_max)
+        else:
+            inside = (lon >= lon_min) | (lon <= lon_max)
+        return self._by_lat[start:stop][inside]
+
+    def in_box(self, lat_min, lat_max, lon_min, lon_max):
+        """Positions inside a lat/lon box; lon_min > lon_max wraps the antimeridian."""
+        return self.positions[self._box_rows(lat_min, lat_max, lon_min, lon_max)]
+
+    def in_polygon(self, polygon):
+        """Positions inside ``polygon``, a sequence of (lat, lon) vertices."""
+        lats, lons = np.asarray(polygon, dtype=float).T
+        rows = self._box_rows(lats.min(), lats.max(), lons.min(), lons.max())
+        inside = _in_polygon(self.lat[rows], self.lon[rows], polygon)
+        return self.positions[rows[inside]]
+
+    def assign_territories(self, territories):
+        """Territory name for every row of the frame (None outside all of them).
+
+        ``territories`` maps a name to its polygon; where polygons overlap
+        the first one listed wins.
+        """
+        assigned = np.full(self.size, None, dtype=object)
+        for name, polygon in reversed(list(territories.items())):
+            assigned[self.in_polygon(polygon)] = name
+        return assigned
+
+
+# One index per loaded companies frame, like the company search
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def spatial_index(companies):
+    key = id(companies)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is not None and entry[0]() is companies:
+            return entry[1]
+
+    index = SpatialIndex(companies)
+    with _indexes_lock:
+        _indexes[key] = (
+            weakref.ref(companies, lambda _: _indexes.pop(key, None)),
+            index,
+        )
+    return index
@@ -0,0 +1,44 @@
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket shared by worker threads.
+
+    ``rate`` is the sustained number of calls per second and ``burst`` how many
+    calls may go out back to back after an idle period.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry(func, retry_on, attempts=5, base_delay=0.5, max_delay=30.0):
+    """Call ``func()`` and retry on ``retry_on`` errors with jittered backoff."""
+    for attempt in range(attempts):
+        try:
+            return func()
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * 2**attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
@@ -0,0 +1,293 @@
+### Write-behind queue: status, override and note writes off the script thread ###
+
+import atexit
+import queue
+import threading
+import time
+
+from modules.db import DB_PATH, apply_writes, client_aliases, connect, connection
+
+QUEUE_SIZE = 1000  # writes waiting at most; submitting blocks beyond that
+BATCH_SIZE = 500  # writes per transaction at most
+LINGER = 0.05  # seconds a batch waits for more writes after its first one
+PUT_TIMEOUT = 5.0
+RETRIES = 3
+
+STATUS, OVERRIDE, NOTE, FLUSH, STOP = "status", "override", "note", "flush", "stop"
+
+
+class Ticket:
+    """Acknowledgement for one queued write.
+
+    ``done()`` turns true once the write's transaction committed (or failed
+    for good, then ``error`` holds the exception). ``wait()`` blocks until
+    then and re-raises that error.
+    """
+
+    def __init__(self):
+        self.error = None
+        self._done = threading.Event()
+
+    def done(self):
+        return self._done.is_set()
+
+    def failed(self):
+        return self._done.is_set() and self.error is not None
+
+    def wait(self, timeout=None):
+        """True once committed, False if ``timeout`` ran out first."""
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+    def _finish(self, error=None):
+        self.error = error
+        self._done.set()
+
+
+class WriteBehind:
+    """One writer thread per database, fed by a bounded queue.
+
+    Writes queued within ``linger`` of each other are committed together:
+    the last status and override per client win, notes are all inserted.
+    The writer's connection runs with synchronous=FULL, so a ticket is only
+    acknowledged once its batch is on disk, and the fsync is paid once per
+    batch instead of once per click. Until then ``pending()`` returns the
+    queued values. The queue is shared by every session of the process, so
+    they are the values any session queued, not only the caller's.
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        maxsize=QUEUE_SIZE,
+        batch_size=BATCH_SIZE,
+        linger=LINGER,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue = queue.Queue(maxsize)
+        # _put_lock keeps queue order equal to sequence order; _lock guards
+        # the pending values, which the writer also takes, so it is never
+        # held while waiting for room in the queue
+        self._put_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._pending = {}
+        self._thread = None
+        self._closed = False
+
+    # --- submitting ---
+    def update_status(self, client_id, new_status, timeout=PUT_TIMEOUT):
+        return self._submit(STATUS, client_id, new_status, timeout)
+
+    def save_industry_override(self, client_id, industry, timeout=PUT_TIMEOUT):
+        return self._submit(OVERRIDE, client_id, industry, timeout)
+
+    def log_call(self, client_id, note, timestamp=None, timeout=PUT_TIMEOUT):
+        # Stamped now, not when the batch commits
+        if timestamp is None:
+            timestamp = int(time.time())
+        return self._submit(NOTE, client_id, (note, timestamp), timeout)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is committed; False on timeout."""
+        ticket = self._submit(FLUSH, None, None, timeout)
+        return ticket.wait(timeout)
+
+    def close(self, timeout=None):
+        """Commit what is queued and stop the writer thread."""
+        with self._put_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is None:
+                return
+            self._seq += 1
+            self._queue.put((self._seq, STOP, None, None, Ticket()))
+        self._thread.join(timeout)
+
+    def _submit(self, kind, client_id, value, timeout):
+        ticket = Ticket()
+        with self._put_lock:
+            if self._closed:
+                raise RuntimeError("write queue is closed")
+            self._start()
+            self._seq += 1
+            item = (self._seq, kind, client_id, value, ticket)
+            self._remember(item)
+            try:
+                # Blocks while the queue is full, queue.Full after timeout
+                self._queue.put(item, timeout=timeout)
+            except queue.Full:
+                self._forget([item])
+                raise
+        return ticket
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="crm-write-behind", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    # --- read your own writes ---
+    def pending(self, client_id):
+        """Queued, not yet committed values for one client, from any session.
+
+        A dict of "status" and "industry" (None unless one is queued) and
+        "notes", a list of (timestamp, note), oldest first. Writes queued
+        under IDs merged into this client count too, the latest one winning.
+        """
+        empty = {"status": None, "industry": None, "notes": []}
+        with self._lock:
+            if not self._pending:
+                return empty
+        with connection(self.db_path) as conn:
+            ids = client_aliases(conn, client_id)
+
+        with self._lock:
+            entries = [self._pending.get(i, {}) for i in ids]
+            latest = lambda kind: max(
+                (e[kind] for e in entries if kind in e), default=(None, None)
+            )
+            notes = sorted(n for e in entries for n in e.get(NOTE, []))
+            return {
+                "status": latest(STATUS)[1],
+                "industry": latest(OVERRIDE)[1],
+                "notes": [(ts, note) for _, (note, ts) in notes],
+            }
+
+    def _remember(self, item):
+        seq, kind, client_id, value, _ = item
+        if kind in (FLUSH, STOP):
+            return
+        with self._lock:
+            entry = self._pending.setdefault(client_id, {})
+            if kind == NOTE:
+                entry.setdefault(NOTE, []).append((seq, value))
+            else:
+                entry[kind] = (seq, value)
+
+    def _forget(self, items):
+        # Drop committed (or failed) values unless a newer one is queued
+        with self._lock:
+            for seq, kind, client_id, _, _ in items:
+                entry = self._pending.get(client_id)
+                if entry is None:
+                    continue
+                if kind == NOTE:
+                    notes = [n for n in entry.get(NOTE, []) if n[0] != seq]
+                    if notes:
+                        entry[NOTE] = notes
+                    else:
+                        entry.pop(NOTE, None)
+                elif entry.get(kind, (None,))[0] == seq:
+                    del entry[kind]
+                if not entry:
+                    del self._pending[client_id]
+
+    # --- writer thread ---
+    def _run(self):
+        try:
+            conn = connect(self.db_path)
+            conn.execute("PRAGMA synchronous=FULL")
+        except Exception as e:
+            self._abandon(e)
+            return
+        try:
+            while True:
+                batch = self._next_batch()
+                self._commit(conn, batch)
+                if any(item[1] == STOP for item in batch):
+                    return
+        finally:
+            conn.close()
+
+    def _abandon(self, error):
+        # No connection: fail everything queued instead of leaving its
+        # tickets waiting, and let the next write start a new writer thread.
+        # A submitter may hold _put_lock while blocked on a full queue, so
+        # the queue is drained before and while trying to take the lock.
+        while True:
+            self._settle(self._drain(), error)
+            if self._put_lock.acquire(timeout=self.linger):
+                break
+        try:
+            self._settle(self._drain(), error)
+            self._thread = None
+        finally:
+            self._put_lock.release()
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _settle(self, items, error=None):
+        self._forget(items)
+        for item in items:
+            item[4]._finish(error)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size and batch[-1][1] not in (FLUSH, STOP):
+            try:
+                batch.append(
+                    self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, conn, batch):
+        error = self._write(conn, batch)
+        if error is not None and len(batch) > 1:
+            # One bad write should not take the rest of its batch down
+            for item in batch:
+                self._commit(conn, [item])
+            return
+        self._settle(batch, error)
+
+    def _write(self, conn, batch):
+        statuses, overrides, notes = {}, {}, []
+        # Queue order is submission order, so later values overwrite earlier ones
+        for _, kind, client_id, value, _ in batch:
+            if kind == STATUS:
+                statuses[client_id] = value
+            elif kind == OVERRIDE:
+                overrides[client_id] = value
+            elif kind == NOTE:
+                notes.append((client_id, *value))
+
+        for attempt in range(RETRIES):
+            try:
+                with conn:
+                    apply_writes(conn, statuses, overrides, notes)
+                return None
+            except Exception as e:
+                # Usually a lock held past busy_timeout; retried a few times
+                if attempt + 1 == RETRIES:
+                    return e
+                time.sleep(0.1 * 2**attempt)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def write_behind(db_path=DB_PATH):
+    """The process-wide write queue for ``db_path``, shared by all sessions."""
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = _writers[db_path] = WriteBehind(db_path)
+    return writer